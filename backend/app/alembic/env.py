@@ -4,12 +4,13 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from config.settings import Settings
+from config.settings import settings
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", Settings.SQLALCHEMY_DATABASE_URL)
+# configparser treats % as interpolation, escape it for url-encoded passwords
+config.set_main_option("sqlalchemy.url", settings.SQLALCHEMY_DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -18,8 +19,9 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-from db import base
-target_metadata = base.APIBase.metadata
+from db.base_class import APIBase
+import db.init_models  # noqa: imports every model so they register on APIBase.metadata
+target_metadata = APIBase.metadata
 # target_metadata = None
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,57 @@
+"""store refresh tokens as sha-256 digests
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns() -> set:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("refresh_tokens", schema="public"):
+        return set()
+    return {column["name"] for column in inspector.get_columns("refresh_tokens", schema="public")}
+
+
+def upgrade() -> None:
+    columns = _columns()
+    if not columns or "token_hash" in columns:
+        # fresh database, init_tables creates the table with the new layout
+        return
+
+    # raw tokens cannot be turned into digests of new opaque tokens, everyone signs in again
+    op.execute("DELETE FROM public.refresh_tokens")
+    op.drop_column("refresh_tokens", "refresh_token", schema="public")
+    op.add_column("refresh_tokens", sa.Column("token_hash", sa.String(length=64), nullable=False), schema="public")
+    op.create_unique_constraint(
+        "refresh_tokens_token_hash_key", "refresh_tokens", ["token_hash"], schema="public"
+    )
+    op.create_index(
+        "ix_public_refresh_tokens_expiration_time", "refresh_tokens", ["expiration_time"], schema="public"
+    )
+
+
+def downgrade() -> None:
+    if "token_hash" not in _columns():
+        return
+
+    op.execute("DELETE FROM public.refresh_tokens")
+    op.drop_index("ix_public_refresh_tokens_expiration_time", table_name="refresh_tokens", schema="public")
+    op.drop_constraint("refresh_tokens_token_hash_key", "refresh_tokens", schema="public")
+    op.drop_column("refresh_tokens", "token_hash", schema="public")
+    op.add_column("refresh_tokens", sa.Column("refresh_token", sa.String(), nullable=True), schema="public")
+    op.create_unique_constraint(
+        "refresh_tokens_refresh_token_key", "refresh_tokens", ["refresh_token"], schema="public"
+    )
@@ -0,0 +1,55 @@
+"""indexes for email and phone lookups and foreign keys
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, expression, unique), names match the ones the models declare
+INDEXES = [
+    ("ux_users_email_lower", "users", "lower(email)", True),
+    ("ix_passengers_phone_digits", "passengers", "regexp_replace(phone, '[^0-9]', '', 'g')", False),
+    ("ix_public_ratings_to_user_id", "ratings", "to_user_id", False),
+    ("ix_public_transactions_driver_id", "transactions", "driver_id", False),
+    ("ix_public_notifications_user_id", "notifications", "user_id", False),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("users", schema="public"):
+        duplicates = op.get_bind().execute(sa.text(
+            "SELECT lower(email) FROM public.users GROUP BY lower(email) HAVING count(*) > 1 LIMIT 10"
+        )).scalars().all()
+        if duplicates:
+            raise RuntimeError(f"Merge the users whose emails differ only in case first: {', '.join(duplicates)}")
+
+    # built without blocking writes, which needs to run outside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, expression, unique in INDEXES:
+            if not inspector.has_table(table, schema="public"):
+                # fresh database, init_tables creates the indexes with the tables
+                continue
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON public.{table} ({expression})"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{name}")
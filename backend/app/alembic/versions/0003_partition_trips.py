@@ -0,0 +1,117 @@
+"""partition trips by month on created_date
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from config.settings import settings
+from db.partitions import ensure_monthly_partitions, is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# foreign keys to trips.id, which a partitioned trips table cannot back
+TRIP_REFERENCES = [
+    ("ratings", "ratings_trip_id_fkey"),
+    ("transactions", "transactions_trip_id_fkey"),
+    ("trip_cancellations", "trip_cancellations_trip_id_fkey"),
+]
+
+HISTORY_INCLUDE = "status, pickup_location, dropoff_location, estimated_fare, actual_fare, is_deleted"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("trips", schema="public") or is_partitioned(bind, "trips"):
+        # fresh database, init_tables creates the partitioned table
+        return
+
+    for table, constraint in TRIP_REFERENCES:
+        if inspector.has_table(table, schema="public"):
+            op.execute(f"ALTER TABLE public.{table} DROP CONSTRAINT IF EXISTS {constraint}")
+    for table in ("ratings", "transactions"):
+        if inspector.has_table(table, schema="public"):
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_public_{table}_trip_id ON public.{table} (trip_id)")
+
+    op.execute("ALTER TABLE public.trips RENAME TO trips_unpartitioned")
+    op.execute("ALTER INDEX public.trips_pkey RENAME TO trips_unpartitioned_pkey")
+    # frees the name for the partitioned table's index, the rows move over below
+    op.execute("DROP INDEX IF EXISTS public.ix_public_trips_id")
+    op.execute("""
+        UPDATE public.trips_unpartitioned SET created_date = coalesce(updated_date, now())
+        WHERE created_date IS NULL
+    """)
+
+    op.execute("""
+        CREATE TABLE public.trips (LIKE public.trips_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_date)
+    """)
+    op.execute("ALTER TABLE public.trips ALTER COLUMN created_date SET NOT NULL")
+    op.execute("ALTER TABLE public.trips ADD CONSTRAINT trips_pkey PRIMARY KEY (id, created_date)")
+    op.execute("""
+        ALTER TABLE public.trips
+        ADD CONSTRAINT trips_passenger_id_fkey FOREIGN KEY (passenger_id) REFERENCES public.passengers (id),
+        ADD CONSTRAINT trips_driver_id_fkey FOREIGN KEY (driver_id) REFERENCES public.drivers (id)
+    """)
+    op.execute("CREATE INDEX ix_public_trips_id ON public.trips (id)")
+    op.execute(f"""
+        CREATE INDEX ix_trips_passenger_history ON public.trips (passenger_id, created_date DESC, id DESC)
+        INCLUDE ({HISTORY_INCLUDE})
+    """)
+    op.execute(f"""
+        CREATE INDEX ix_trips_driver_history ON public.trips (driver_id, created_date DESC, id DESC)
+        INCLUDE ({HISTORY_INCLUDE})
+    """)
+
+    # after the backfill above, so every row, future-dated ones included, has a partition
+    since, until = bind.execute(
+        sa.text("SELECT min(created_date), max(created_date) FROM public.trips_unpartitioned")
+    ).one()
+    ensure_monthly_partitions(
+        bind, "trips", since=since, until=until, months_ahead=settings.TRIP_PARTITION_MONTHS_AHEAD
+    )
+    op.execute("INSERT INTO public.trips SELECT * FROM public.trips_unpartitioned")
+    op.execute("DROP TABLE public.trips_unpartitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not is_partitioned(bind, "trips"):
+        return
+
+    op.execute("ALTER TABLE public.trips RENAME TO trips_partitioned")
+    op.execute("ALTER INDEX public.trips_pkey RENAME TO trips_partitioned_pkey")
+    for index in ("ix_public_trips_id", "ix_trips_passenger_history", "ix_trips_driver_history"):
+        op.execute(f"DROP INDEX IF EXISTS public.{index}")
+
+    op.execute("CREATE TABLE public.trips (LIKE public.trips_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO public.trips SELECT * FROM public.trips_partitioned")
+    op.execute("DROP TABLE public.trips_partitioned CASCADE")
+    op.execute("ALTER TABLE public.trips ADD CONSTRAINT trips_pkey PRIMARY KEY (id)")
+    op.execute("""
+        ALTER TABLE public.trips
+        ADD CONSTRAINT trips_passenger_id_fkey FOREIGN KEY (passenger_id) REFERENCES public.passengers (id),
+        ADD CONSTRAINT trips_driver_id_fkey FOREIGN KEY (driver_id) REFERENCES public.drivers (id)
+    """)
+    op.execute("CREATE INDEX ix_public_trips_id ON public.trips (id)")
+
+    # trips deleted or detached meanwhile leave dangling references, NOT VALID keeps them
+    for table, constraint in TRIP_REFERENCES:
+        op.execute(
+            f"ALTER TABLE public.{table} ADD CONSTRAINT {constraint} "
+            f"FOREIGN KEY (trip_id) REFERENCES public.trips (id) NOT VALID"
+        )
+    for table in ("ratings", "transactions"):
+        op.execute(f"DROP INDEX IF EXISTS public.ix_public_{table}_trip_id")
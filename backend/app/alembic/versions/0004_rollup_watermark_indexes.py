@@ -0,0 +1,58 @@
+"""index updated_date of trips and transactions for the rollup watermark
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from db.partitions import is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _partitions(bind, table: str) -> list:
+    return bind.execute(sa.text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": f"public.{table}"}).scalars().all()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # the rollup tables themselves are created by init_tables
+
+    with op.get_context().autocommit_block():
+        if inspector.has_table("transactions", schema="public"):
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_updated_date "
+                "ON public.transactions (updated_date)"
+            )
+
+        if inspector.has_table("trips", schema="public") and is_partitioned(bind, "trips"):
+            # a partitioned parent cannot be indexed concurrently: index each partition
+            # concurrently, then attach them to an index created ON ONLY the parent
+            op.execute("CREATE INDEX IF NOT EXISTS ix_trips_updated_date ON ONLY public.trips (updated_date)")
+            for partition in _partitions(bind, "trips"):
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_updated_date_idx "
+                    f"ON public.{partition} (updated_date)"
+                )
+                op.execute(f"ALTER INDEX public.ix_trips_updated_date ATTACH PARTITION public.{partition}_updated_date_idx")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS public.ix_trips_updated_date")
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.ix_transactions_updated_date")
@@ -0,0 +1,44 @@
+"""gin index on appraisal_inputs.department_ids in every tenant schema
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _schemas() -> list:
+    """Tenant schemas, the template included, that have appraisal_inputs.department_ids."""
+    return op.get_bind().execute(sa.text(
+        "SELECT table_schema FROM information_schema.columns "
+        "WHERE table_name = 'appraisal_inputs' AND column_name = 'department_ids'"
+    )).scalars().all()
+
+
+def upgrade() -> None:
+    schemas = _schemas()
+    # new tenants are cloned from the template with its indexes
+    with op.get_context().autocommit_block():
+        for schema in schemas:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_appraisal_inputs_department_ids '
+                f'ON "{schema}".appraisal_inputs USING gin (department_ids)'
+            )
+
+
+def downgrade() -> None:
+    schemas = _schemas()
+    with op.get_context().autocommit_block():
+        for schema in schemas:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{schema}".ix_appraisal_inputs_department_ids')
@@ -0,0 +1,60 @@
+"""report_exports table for background report exports
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("report_exports", schema="public"):
+        # fresh database, init_tables creates the table
+        return
+
+    # the table as of this revision, tenant_schema comes with 0007
+    op.create_table(
+        "report_exports",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_date", sa.DateTime(), nullable=True),
+        sa.Column("updated_date", sa.DateTime(), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("format", sa.String(length=8), nullable=False),
+        sa.Column("filters", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("requested_by", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("rows", sa.Integer(), nullable=False),
+        sa.Column("storage", sa.String(length=8), nullable=True),
+        sa.Column("key", sa.String(), nullable=True),
+        sa.Column("content_type", sa.String(length=128), nullable=True),
+        sa.Column("size", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["requested_by"], ["public.users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        schema="public",
+    )
+    op.create_index("ix_public_report_exports_id", "report_exports", ["id"], schema="public")
+    op.create_index("ix_public_report_exports_requested_by", "report_exports", ["requested_by"], schema="public")
+    op.create_index(
+        "ix_report_exports_status_updated", "report_exports", ["status", "updated_date"], schema="public"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("report_exports", schema="public")
@@ -0,0 +1,29 @@
+"""tenant schema of each report export
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # on a fresh database init_tables has created the table with the column already
+    op.execute(
+        "ALTER TABLE public.report_exports "
+        "ADD COLUMN IF NOT EXISTS tenant_schema varchar(63) NOT NULL DEFAULT 'public'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE public.report_exports DROP COLUMN IF EXISTS tenant_schema")
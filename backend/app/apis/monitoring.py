@@ -0,0 +1,30 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import PlainTextResponse
+
+from config.metrics import registry
+from db.slow_queries import SlowQuery, slow_query_log
+from domains.auth.models import User
+from utils.rbac import check_if_is_system_admin
+
+monitoring_router = APIRouter(tags=["MONITORING"])
+
+
+@monitoring_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@monitoring_router.get("/monitoring/slow-queries", response_model=List[SlowQuery])
+def list_slow_queries(
+        limit: int = 50,
+        route: str = None,
+        current_user: User = Depends(check_if_is_system_admin)
+):
+    return slow_query_log.entries(limit=limit, route=route)
+
+
+@monitoring_router.delete("/monitoring/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(current_user: User = Depends(check_if_is_system_admin)):
+    slow_query_log.clear()
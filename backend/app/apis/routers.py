@@ -1,7 +1,9 @@
 from fastapi import APIRouter
+from apis.monitoring import monitoring_router
 from domains.auth.apis import auth_routers
 from domains.etransport.apis import etransport_router
 
 router = APIRouter()
 router.include_router(auth_routers)
-router.include_router(etransport_router)
\ No newline at end of file
+router.include_router(etransport_router)
+router.include_router(monitoring_router)
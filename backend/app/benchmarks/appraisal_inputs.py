@@ -0,0 +1,175 @@
+"""
+Per-staff form listing (appraisal inputs by department) benchmark.
+
+    python -m benchmarks.appraisal_inputs generate --inputs 5000
+    python -m benchmarks.appraisal_inputs run --inputs 5000 --output appraisal-inputs.json
+
+Mirrors the statements CRUDAppraisalInput.list_appraisal_input_for_staff issues,
+on synthetic staff and appraisal_inputs tables in the "benchmark" schema:
+
+    two_queries_no_gin  staff lookup, then department_ids @> ARRAY[...] without the
+                        GIN index (bitmap scans off, the only way GIN is read)
+    subselect_gin       one statement, the department resolved in a subselect
+    cached_gin          the department from the cache, one statement with a literal
+"""
+import argparse
+import hashlib
+import json
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, MetaData, String, desc, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, array
+from sqlalchemy.orm import declarative_base
+
+from benchmarks.crud import BENCHMARK_SCHEMA, measure
+from benchmarks.loadtest import git_commit
+from db.session import SessionLocal, engine
+
+AppraisalBenchmarkBase = declarative_base(metadata=MetaData(schema=BENCHMARK_SCHEMA))
+
+
+class BenchmarkStaff(AppraisalBenchmarkBase):
+    __tablename__ = "benchmark_staff"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    department_id = Column(UUID(as_uuid=True))
+
+
+class BenchmarkAppraisalInput(AppraisalBenchmarkBase):
+    __tablename__ = "benchmark_appraisal_inputs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    created_date = Column(DateTime, index=True)
+    name = Column(String(255))
+    department_ids = Column(ARRAY(UUID(as_uuid=True)))
+
+
+Index("ix_benchmark_appraisal_inputs_department_ids", BenchmarkAppraisalInput.department_ids, postgresql_using="gin")
+
+STAFF = 2_000
+PAGE_SIZE = 10
+
+# every input targets two departments, spread so each department sees a few dozen inputs
+GENERATE_INPUTS = f"""
+INSERT INTO {BENCHMARK_SCHEMA}.benchmark_appraisal_inputs (id, created_date, name, department_ids)
+SELECT
+    md5('input-' || i)::uuid,
+    timestamp '2024-01-01' + (i || ' minutes')::interval,
+    'input ' || i,
+    ARRAY[md5('department-' || (i % :departments))::uuid, md5('department-' || ((i * 7) % :departments))::uuid]
+FROM generate_series(1, :inputs) AS i
+"""
+
+GENERATE_STAFF = f"""
+INSERT INTO {BENCHMARK_SCHEMA}.benchmark_staff (id, department_id)
+SELECT md5('staff-' || i)::uuid, md5('department-' || (i % :departments))::uuid
+FROM generate_series(1, {STAFF}) AS i
+"""
+
+
+def staff_id(i: int) -> uuid.UUID:
+    """Id of a generated staff member, mirrors md5('staff-' || i)::uuid."""
+    return uuid.UUID(hashlib.md5(f"staff-{i % STAFF + 1}".encode()).hexdigest())
+
+
+def generate(inputs: int, departments: int) -> None:
+    """(Re)create the benchmark tables with `inputs` forms spread over `departments`."""
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {BENCHMARK_SCHEMA}"))
+        AppraisalBenchmarkBase.metadata.drop_all(conn)
+        AppraisalBenchmarkBase.metadata.create_all(conn)
+        conn.execute(text(GENERATE_INPUTS), {"inputs": inputs, "departments": departments})
+        conn.execute(text(GENERATE_STAFF), {"departments": departments})
+        conn.execute(text(f"ANALYZE {BENCHMARK_SCHEMA}.benchmark_appraisal_inputs"))
+        conn.execute(text(f"ANALYZE {BENCHMARK_SCHEMA}.benchmark_staff"))
+
+
+def listing(contains):
+    return (
+        select(BenchmarkAppraisalInput)
+        .where(BenchmarkAppraisalInput.department_ids.contains(contains))
+        .order_by(desc(BenchmarkAppraisalInput.created_date))
+        .limit(PAGE_SIZE)
+    )
+
+
+def benchmarks(db) -> dict:
+    departments = {
+        row.id: row.department_id for row in db.execute(select(BenchmarkStaff.id, BenchmarkStaff.department_id))
+    }
+
+    def two_queries(i):
+        # before: the staff member, then the inputs of their department
+        # a query every time, db.get would answer repeats from the identity map
+        staff = db.execute(select(BenchmarkStaff).where(BenchmarkStaff.id == staff_id(i))).scalar_one()
+        return db.execute(listing([staff.department_id])).scalars().all()
+
+    def subselect(i):
+        department = select(BenchmarkStaff.department_id).where(BenchmarkStaff.id == staff_id(i)).scalar_subquery()
+        query = listing(array([department])).add_columns(department.label("staff_department_id"))
+        return db.execute(query).all()
+
+    def cached(i):
+        return db.execute(listing([departments[staff_id(i)]])).scalars().all()
+
+    return {"two_queries_no_gin": two_queries, "subselect_gin": subselect, "cached_gin": cached}
+
+
+def run(inputs: int, iterations: int, warmup: int) -> dict:
+    with SessionLocal() as db:
+        actual = db.execute(select(func.count()).select_from(BenchmarkAppraisalInput)).scalar()
+        if actual != inputs:
+            raise SystemExit(f"expected {inputs} inputs, found {actual}: run `generate --inputs {inputs}` first")
+
+        results = {}
+        for name, case in benchmarks(db).items():
+            # GIN is only read through bitmap scans, turning them off plans as if it were missing
+            db.execute(text(f"SET enable_bitmapscan = {'off' if name.endswith('no_gin') else 'on'}"))
+            results[name] = measure(case, iterations, warmup)
+            print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+        db.rollback()
+
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "inputs": inputs,
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="per-staff appraisal input listing benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="create the synthetic data set")
+    generate_parser.add_argument("--inputs", type=int, default=5_000)
+    generate_parser.add_argument("--departments", type=int, default=200)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write a JSON result")
+    run_parser.add_argument("--inputs", type=int, default=5_000)
+    run_parser.add_argument("--iterations", type=int, default=500)
+    run_parser.add_argument("--warmup", type=int, default=50)
+    run_parser.add_argument("--output")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "generate":
+        generate(args.inputs, args.departments)
+
+    elif args.command == "run":
+        output = json.dumps(run(args.inputs, args.iterations, args.warmup), indent=2)
+        if args.output:
+            with open(args.output, "w") as file:
+                file.write(output + "\n")
+        else:
+            print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Micro-benchmarks for crud.base.CRUDBase.
+
+    python -m benchmarks.crud generate --rows 1000000
+    python -m benchmarks.crud run --rows 1000000 --output benchmarks/baselines/crud-1000000.json
+    python -m benchmarks.crud run --rows 1000000 --output current.json
+    python -m benchmarks.crud compare benchmarks/baselines/crud-1000000.json current.json --threshold 0.1
+
+No baseline is checked in, timings only compare on the same machine and database:
+record one with the first `run` on the reference commit, then run the change.
+
+The benchmarks run against a dedicated "benchmark" schema holding a synthetic
+table that mirrors the APIBase columns, so they never touch tenant data and the
+table is not part of the application metadata. Rows are generated server side
+with generate_series and derived deterministically from the row number, which
+makes a data set of a given size identical on every run.
+"""
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple, Union
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, MetaData, String, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import declarative_base
+from starlette.requests import Request
+
+from benchmarks.loadtest import git_commit, percentile
+from crud.base import CRUDBase
+from db.base_class import BaseMethodMixin
+from db.session import SessionLocal, engine
+
+BENCHMARK_SCHEMA = "benchmark"
+
+BenchmarkBase = declarative_base(metadata=MetaData(schema=BENCHMARK_SCHEMA))
+
+
+class BenchmarkRecord(BaseMethodMixin, BenchmarkBase):
+    __tablename__ = "benchmark_records"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_date = Column(DateTime, index=True)
+    updated_date = Column(DateTime)
+    is_deleted = Column(Boolean, default=False)
+    deleted_at = Column(DateTime, nullable=True)
+    name = Column(String(255), index=True)
+    email = Column(String(255), unique=True)
+    category = Column(String(50), index=True)
+    score = Column(Integer)
+    amount = Column(Float)
+
+
+benchmark_actions = CRUDBase[BenchmarkRecord, dict, dict](BenchmarkRecord)
+
+CATEGORIES = 20
+
+GENERATE_ROWS = f"""
+INSERT INTO {BENCHMARK_SCHEMA}.benchmark_records
+    (id, created_date, updated_date, is_deleted, name, email, category, score, amount)
+SELECT
+    md5('record-' || i)::uuid,
+    timestamp '2024-01-01' + (i || ' seconds')::interval,
+    timestamp '2024-01-01' + (i || ' seconds')::interval,
+    false,
+    'record ' || md5(i::text),
+    'record-' || i || '@example.com',
+    'category-' || (i % {CATEGORIES}),
+    (i * 7919) % 1000,
+    ((i * 104729) % 100000) / 100.0
+FROM generate_series(:start, :stop) AS i
+"""
+
+
+def generate(rows: int, batch_size: int = 500_000) -> None:
+    """(Re)create the benchmark table with exactly `rows` synthetic rows."""
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {BENCHMARK_SCHEMA}"))
+        BenchmarkBase.metadata.drop_all(conn)
+        BenchmarkBase.metadata.create_all(conn)
+
+    started = time.perf_counter()
+    for start in range(1, rows + 1, batch_size):
+        with engine.begin() as conn:
+            conn.execute(text(GENERATE_ROWS), {"start": start, "stop": min(start + batch_size - 1, rows)})
+        print(f"generated {min(start + batch_size - 1, rows)}/{rows} rows", file=sys.stderr)
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(
+            text(f"VACUUM ANALYZE {BENCHMARK_SCHEMA}.benchmark_records")
+        )
+    print(f"generated {rows} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def record_id(i: int) -> uuid.UUID:
+    """Id of the i-th generated row, mirrors md5('record-' || i)::uuid."""
+    return uuid.UUID(hashlib.md5(f"record-{i}".encode()).hexdigest())
+
+
+def make_request(query_string: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": query_string.encode()})
+
+
+def measure(func: Callable, iterations: int, warmup: int, setup: Callable = None) -> dict:
+    """Time func(i), or func(setup(i)) when setup is given; setup itself is not measured."""
+    for i in range(warmup):
+        func(setup(-1 - i) if setup else -1 - i)
+
+    durations = []
+    for i in range(iterations):
+        arg = setup(i) if setup else i
+        started = time.perf_counter()
+        func(arg)
+        durations.append(time.perf_counter() - started)
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(durations, 50) * 1000, 4),
+        "p95_ms": round(percentile(durations, 95) * 1000, 4),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 4),
+        "ops_per_second": round(iterations / sum(durations), 2),
+    }
+
+
+def benchmarks(db, rows: int) -> Dict[str, Union[Callable, Tuple[Callable, Callable]]]:
+    """Benchmark name to func, or to (setup, func) for the ones that need fresh rows."""
+    def row(i: int) -> int:
+        # spread lookups over the table, deterministic per iteration
+        return (abs(i) * 7919) % rows + 1
+
+    def create(i: int):
+        benchmark_actions.create(db=db, data={
+            "name": f"created {i}", "email": f"created-{uuid.uuid4().hex}@example.com",
+            "category": "created", "score": i, "amount": 1.0,
+            "created_date": datetime.now(timezone.utc).replace(tzinfo=None),
+        })
+
+    def insert_rows_to_delete(i: int) -> List[uuid.UUID]:
+        # every iteration deletes 100 fresh rows, not rows an earlier iteration removed
+        ids = [uuid.uuid4() for _ in range(100)]
+        db.execute(BenchmarkRecord.__table__.insert(), [
+            {"id": id_, "email": f"delete-{id_.hex}@example.com", "category": "deleted"} for id_ in ids
+        ])
+        db.commit()
+        return ids
+
+    cases = {
+        "get_by_id": lambda i: benchmark_actions.get_by_id(db, id=record_id(row(i))),
+        "get_many_by_ids": lambda i: benchmark_actions.get_many_by_ids(
+            db, ids=[record_id(row(i * 100 + n)) for n in range(100)]
+        ),
+        "get_by_filters": lambda i: benchmark_actions.get_by_filters(
+            db=db, category=f"category-{abs(i) % CATEGORIES}", limit=50
+        ),
+        "get_by_pattern": lambda i: benchmark_actions.get_by_pattern(
+            db=db, name=f"{abs(i) % 16:x}{abs(i) % 7:x}", limit=50
+        ),
+        "special_read_with_count": lambda i: benchmark_actions.special_read(
+            make_request(f"category=category-{abs(i) % CATEGORIES}&limit=50&offset=0"), db
+        ),
+        "create": create,
+        "update": lambda i: benchmark_actions.update(db=db, id=record_id(row(i)), data={"score": abs(i) % 1000}),
+        "bulk_hard_delete": (insert_rows_to_delete, lambda ids: benchmark_actions.bulk_hard_delete(db, ids=ids)),
+    }
+    for offset in (0, 1_000, 100_000):
+        if offset < rows:
+            cases[f"get_all_offset_{offset}"] = (
+                lambda i, offset=offset: benchmark_actions.get_all(db=db, skip=offset, limit=100)
+            )
+    return cases
+
+
+def run(rows: int, iterations: int, warmup: int, only: List[str] = None) -> dict:
+    with SessionLocal() as db:
+        actual = db.execute(text(f"SELECT count(*) FROM {BENCHMARK_SCHEMA}.benchmark_records")).scalar()
+        if actual < rows:
+            raise SystemExit(f"expected at least {rows} rows, found {actual}: run `generate --rows {rows}` first")
+
+        results = {}
+        for name, func in benchmarks(db, rows).items():
+            if only and name not in only:
+                continue
+            setup, func = func if isinstance(func, tuple) else (None, func)
+            results[name] = measure(func, iterations, warmup, setup=setup)
+            print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    # created rows are removed again so consecutive runs see the same table
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {BENCHMARK_SCHEMA}.benchmark_records WHERE category = 'created'"))
+
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "rows": rows,
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str = "p50_ms",
+            min_delta_ms: float = 0.05) -> List[str]:
+    """Names and numbers of the benchmarks that got slower than `threshold` (a fraction)."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        before, after = base[metric], result[metric]
+        # tiny absolute changes are measurement noise however large the ratio
+        if before > 0 and after - before > min_delta_ms and (after - before) / before > threshold:
+            regressions.append(f"{name}: {metric} {before} -> {after} (+{(after - before) / before:.1%})")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CRUDBase micro-benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = commands.add_parser("generate", help="create the synthetic data set")
+    generate_parser.add_argument("--rows", type=int, default=10_000)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write a JSON result")
+    run_parser.add_argument("--rows", type=int, default=10_000)
+    run_parser.add_argument("--iterations", type=int, default=200)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--only", nargs="*")
+    run_parser.add_argument("--output")
+
+    compare_parser = commands.add_parser("compare", help="fail when a result regressed against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    compare_parser.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p95_ms", "mean_ms"])
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "generate":
+        generate(args.rows)
+
+    elif args.command == "run":
+        output = json.dumps(run(args.rows, args.iterations, args.warmup, args.only), indent=2)
+        if args.output:
+            with open(args.output, "w") as file:
+                file.write(output + "\n")
+        else:
+            print(output)
+
+    elif args.command == "compare":
+        if not os.path.exists(args.baseline):
+            raise SystemExit(f"no baseline at {args.baseline}: record one with `run --output {args.baseline}` first")
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+        if baseline.get("rows") != current.get("rows"):
+            raise SystemExit(f"cannot compare runs over {baseline.get('rows')} and {current.get('rows')} rows")
+
+        regressions = compare(baseline, current, args.threshold, args.metric)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions above {args.threshold:.0%} against {baseline.get('commit')}")
+
+
+if __name__ == "__main__":
+    main()
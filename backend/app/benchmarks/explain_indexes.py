@@ -0,0 +1,89 @@
+"""
+Check that the hot lookups are answered from their indexes.
+
+    python -m benchmarks.explain_indexes
+
+Each lookup is built the way the application builds it and run through
+EXPLAIN (FORMAT JSON) with sequential scans disabled, so the check also holds on
+a nearly empty database where the planner would rightly prefer a seq scan. The
+plan must use the expected index, or on partitioned trips the partitions' copies
+of it; exits with status 1 when one does not.
+"""
+import sys
+import uuid
+
+from sqlalchemy import func, select
+
+from db.session import engine
+from domains.auth.models.users import User
+from domains.etransport.models.notification import Notification
+from domains.etransport.models.passenger import Passenger, normalize_phone, phone_digits
+from domains.etransport.models.rating import Rating
+from domains.etransport.models.transaction import Transaction
+from domains.etransport.models.trip import Trip
+from domains.etransport.repositories.trip import HISTORY_FIELDS
+
+ANY_ID = uuid.UUID(int=0)
+
+LOOKUPS = [
+    ("user by email", "ux_users_email_lower",
+     select(User.id).where(func.lower(User.email) == " Someone@Example.com ".strip().lower())),
+    ("passenger by phone", "ix_passengers_phone_digits",
+     select(Passenger.id).where(phone_digits(Passenger.phone) == normalize_phone("+233 24 000 0000"))),
+    ("trip history of a passenger", "ix_trips_passenger_history",
+     select(*HISTORY_FIELDS).where(Trip.passenger_id == ANY_ID)
+     .order_by(Trip.created_date.desc(), Trip.id.desc()).limit(20)),
+    ("trip history of a driver", "ix_trips_driver_history",
+     select(*HISTORY_FIELDS).where(Trip.driver_id == ANY_ID)
+     .order_by(Trip.created_date.desc(), Trip.id.desc()).limit(20)),
+    ("ratings of a user", "ix_public_ratings_to_user_id", select(Rating.id).where(Rating.to_user_id == ANY_ID)),
+    ("transactions of a driver", "ix_public_transactions_driver_id",
+     select(Transaction.id).where(Transaction.driver_id == ANY_ID)),
+    ("notifications of a user", "ix_public_notifications_user_id",
+     select(Notification.id).where(Notification.user_id == ANY_ID)),
+]
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def index_scans(plan: dict):
+    """(node type, index name) of every index scan in an EXPLAIN JSON plan."""
+    if plan.get("Node Type") in INDEX_SCANS:
+        yield plan["Node Type"], plan.get("Index Name")
+    for child in plan.get("Plans", []):
+        yield from index_scans(child)
+
+
+def index_names(conn, index: str) -> set:
+    """The index and, on a partitioned table, the per-partition indexes attached to it."""
+    children = conn.exec_driver_sql(
+        "SELECT child.relname FROM pg_inherits i JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%(index)s)", {"index": f"public.{index}"}
+    ).scalars().all()
+    return {index, *children}
+
+
+def explain(conn, statement) -> dict:
+    compiled = statement.compile(dialect=engine.dialect)
+    row = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar_one()
+    return row[0]["Plan"]
+
+
+def main() -> None:
+    failures = 0
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        for name, index, statement in LOOKUPS:
+            scans = list(index_scans(explain(conn, statement)))
+            if any(index_name in index_names(conn, index) for _, index_name in scans):
+                print(f"ok    {name:<28} {index}")
+            else:
+                failures += 1
+                print(f"FAIL  {name:<28} expected {index}, plan uses {scans or 'no index'}")
+        conn.rollback()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+End-to-end load test against a running API backed by a local Postgres.
+
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --concurrency 20 --requests 2000
+
+Every scenario runs the same number of iterations with a fixed random seed, and
+the JSON report records the git commit, so reports of different commits taken on
+the same machine and database can be compared side by side. Scenarios whose
+endpoints do not exist yet (404/405 on the first call) are reported as skipped.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+
+class ScenarioSkipped(Exception):
+    pass
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+
+    def add(self, name: str, seconds: float, error: str = None) -> None:
+        self.latencies.setdefault(name, []).append(seconds)
+        if error:
+            errors = self.errors.setdefault(name, {})
+            errors[error] = errors.get(error, 0) + 1
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str,
+                   expected=(200, 201), **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.add(name, time.perf_counter() - started, error=type(e).__name__)
+            return None
+
+        if response.status_code in (404, 405) and not self.latencies.get(name):
+            raise ScenarioSkipped(f"{method} {url} returned {response.status_code}")
+        error = None if response.status_code in expected else str(response.status_code)
+        self.add(name, time.perf_counter() - started, error=error)
+        return response if error is None else None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    results = {}
+    for name, latencies in recorder.latencies.items():
+        errors = sum(recorder.errors.get(name, {}).values())
+        results[name] = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+            "error_rate": round(errors / len(latencies), 4),
+            "errors": recorder.errors.get(name, {}),
+        }
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.run_id = uuid.UUID(int=self.random.getrandbits(128)).hex[:8]
+        self.headers = {"subdomain": args.subdomain}
+        self.admin_token: Optional[str] = None
+
+    def client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=self.args.concurrency, max_keepalive_connections=self.args.concurrency)
+        return httpx.AsyncClient(
+            base_url=self.args.base_url, headers=self.headers, timeout=self.args.timeout, limits=limits
+        )
+
+    async def login(self, client, recorder: Recorder, i: int) -> None:
+        response = await recorder.call(
+            client, "login", "POST", "/auth/token",
+            data={"username": self.args.admin_email, "password": self.args.admin_password},
+        )
+        if response is not None and self.admin_token is None:
+            self.admin_token = response.json()["access_token"]
+
+    async def passenger_signup(self, client, recorder: Recorder, i: int) -> None:
+        await recorder.call(
+            client, "passenger_signup", "POST", "/passengers/",
+            json={
+                "email": f"loadtest-{self.run_id}-{i}@example.com",
+                "full_name": f"Load Test {i}",
+                "phone": f"+1555{self.run_id[:4]}{i:06d}",
+                "password": "loadtest-password",
+            },
+        )
+
+    async def passenger_list(self, client, recorder: Recorder, i: int) -> None:
+        await recorder.call(
+            client, "passenger_list", "GET", "/passengers/",
+            params={"skip": (i * 20) % 1000, "limit": 20}, headers=self._auth(),
+        )
+
+    async def passenger_search(self, client, recorder: Recorder, i: int) -> None:
+        target = self.random.randrange(max(1, self.args.requests))
+        await recorder.call(
+            client, "passenger_search", "GET", f"/passengers/user-profile/loadtest-{self.run_id}-{target}@example.com",
+            expected=(200, 404), headers=self._auth(),
+        )
+
+    async def trip_flow(self, client, recorder: Recorder, i: int) -> None:
+        response = await recorder.call(
+            client, "trip_create", "POST", "/trips/", headers=self._auth(),
+            json={
+                "pickup_location": f"pickup-{i}",
+                "dropoff_location": f"dropoff-{i}",
+                "vehicle_type": "car",
+                "estimated_fare": 10.0,
+                "payment_method": "cash",
+            },
+        )
+        if response is None:
+            return
+        trip_id = response.json()["id"]
+        for step in ("accept", "start", "complete"):
+            if await recorder.call(client, f"trip_{step}", "PUT", f"/trips/{trip_id}/{step}", headers=self._auth()) is None:
+                return
+
+    def _auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.admin_token}"} if self.admin_token else {}
+
+    async def run_scenario(self, name: str, step: Callable[..., Awaitable[None]]) -> dict:
+        recorder = Recorder()
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(self.args.requests):
+            queue.put_nowait(i)
+
+        async def worker(client):
+            while not queue.empty():
+                i = queue.get_nowait()
+                await step(client, recorder, i)
+
+        async with self.client() as client:
+            # warm up connections and caches so cold starts do not skew the first commit measured
+            try:
+                for i in range(min(self.args.warmup, self.args.requests)):
+                    await step(client, Recorder(), -1 - i)
+                started = time.perf_counter()
+                await asyncio.gather(*(worker(client) for _ in range(self.args.concurrency)))
+            except ScenarioSkipped as e:
+                return {"skipped": str(e)}
+            elapsed = time.perf_counter() - started
+
+        return {"elapsed_seconds": round(elapsed, 3), "operations": summarize(recorder, elapsed)}
+
+    async def run(self) -> dict:
+        scenarios = {
+            "login": self.login,
+            "passenger_signup": self.passenger_signup,
+            "passenger_list": self.passenger_list,
+            "passenger_search": self.passenger_search,
+            "trip_flow": self.trip_flow,
+        }
+        selected = self.args.scenarios or list(scenarios)
+
+        # the list/search/trip scenarios need a token, obtain one up front
+        async with self.client() as client:
+            try:
+                await self.login(client, Recorder(), 0)
+            except ScenarioSkipped:
+                pass
+
+        results = {}
+        for name in selected:
+            results[name] = await self.run_scenario(name, scenarios[name])
+            print(f"{name}: {json.dumps(results[name].get('skipped') or results[name]['operations'])}", file=sys.stderr)
+
+        return {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "config": {
+                "base_url": self.args.base_url,
+                "concurrency": self.args.concurrency,
+                "requests": self.args.requests,
+                "warmup": self.args.warmup,
+                "seed": self.args.seed,
+                "subdomain": self.args.subdomain,
+            },
+            "scenarios": results,
+        }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the login, passenger and trip flows")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500, help="iterations per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured iterations per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--subdomain", default="public")
+    parser.add_argument("--admin-email", default="systemadmin@admin.com")
+    parser.add_argument("--admin-password", default="openforme")
+    parser.add_argument("--scenarios", nargs="*",
+                        choices=["login", "passenger_signup", "passenger_list", "passenger_search", "trip_flow"])
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(LoadTest(args).run())
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Concurrency check for the atomic account lockout.
+
+    python -m benchmarks.login_concurrency --email someone@example.com --parallel 50
+    python -m benchmarks.login_concurrency --email someone@example.com --parallel 50 --base-url http://localhost:8000
+
+Without --base-url, register_failed_logins is called from that many threads at
+once, each on its own session, and the user row must show exactly one lock and
+no lost increments. With --base-url, that many wrong-password logins are sent
+to the running API in parallel and it must answer only 401/429 and lock the
+account once, however many workers serve them. The user's lock state is reset
+before and after the run. Exits with status 1 on any violation.
+"""
+import argparse
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import httpx
+from sqlalchemy import func, select, update
+
+from config.settings import settings
+from db.session import SessionLocal
+from domains.auth.models.users import User
+from domains.auth.services.lockout import register_failed_logins
+
+
+def reset(email: str):
+    with SessionLocal() as db:
+        user = db.execute(select(User).where(func.lower(User.email) == email.strip().lower())).scalar_one_or_none()
+        if user is None:
+            raise SystemExit(f"no user with email {email}")
+        db.execute(
+            update(User).where(User.id == user.id)
+            .values(failed_login_attempts=0, account_locked_until=None, lock_count=0, is_active=True)
+        )
+        db.commit()
+        return user.id
+
+
+def read_state(user_id):
+    with SessionLocal() as db:
+        return db.execute(
+            select(User.failed_login_attempts, User.lock_count, User.account_locked_until, User.is_active)
+            .where(User.id == user_id)
+        ).one()
+
+
+def run_direct(user_id, parallel: int) -> list:
+    barrier = Barrier(parallel)
+
+    def fail_once(_):
+        with SessionLocal() as db:
+            barrier.wait()
+            return register_failed_logins(db, user_id=user_id, failures=1)
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        results = list(executor.map(fail_once, range(parallel)))
+
+    problems = []
+    locks = sum(1 for result in results if result and result.locked)
+    state = read_state(user_id)
+    expected_attempts = parallel - settings.LOGIN_MAX_FAILED_ATTEMPTS if parallel >= settings.LOGIN_MAX_FAILED_ATTEMPTS else parallel
+    if parallel >= settings.LOGIN_MAX_FAILED_ATTEMPTS and locks != 1:
+        problems.append(f"expected exactly 1 lock, got {locks}")
+    if state.failed_login_attempts != expected_attempts:
+        problems.append(f"lost updates: failed_login_attempts is {state.failed_login_attempts}, expected {expected_attempts}")
+    if parallel >= settings.LOGIN_MAX_FAILED_ATTEMPTS and (state.lock_count != 1 or state.account_locked_until is None):
+        problems.append(f"expected lock_count 1 and a lock, got {state.lock_count} / {state.account_locked_until}")
+    return problems
+
+
+async def run_http(user_id, email: str, parallel: int, base_url: str, subdomain: str) -> list:
+    async with httpx.AsyncClient(base_url=base_url, headers={"subdomain": subdomain}, timeout=60) as client:
+        responses = await asyncio.gather(*(
+            client.post("/auth/token", data={"username": email, "password": f"wrong-password-{i}"})
+            for i in range(parallel)
+        ), return_exceptions=True)
+
+    problems = []
+    statuses = {}
+    for response in responses:
+        key = type(response).__name__ if isinstance(response, Exception) else response.status_code
+        statuses[key] = statuses.get(key, 0) + 1
+    print(f"responses: {statuses}", file=sys.stderr)
+    unexpected = {key: count for key, count in statuses.items() if key not in (401, 429)}
+    if unexpected:
+        problems.append(f"unexpected responses: {unexpected}")
+
+    state = read_state(user_id)
+    if parallel >= settings.LOGIN_MAX_FAILED_ATTEMPTS and (state.lock_count != 1 or state.account_locked_until is None):
+        problems.append(f"expected the account locked once, got lock_count {state.lock_count} / {state.account_locked_until}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fire parallel failed logins and check the lockout stays consistent")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--parallel", type=int, default=50)
+    parser.add_argument("--base-url", help="drive the running API instead of calling the lockout service directly")
+    parser.add_argument("--subdomain", default="public")
+    args = parser.parse_args(argv)
+
+    user_id = reset(args.email)
+    try:
+        if args.base_url:
+            problems = asyncio.run(run_http(user_id, args.email, args.parallel, args.base_url, args.subdomain))
+        else:
+            problems = run_direct(user_id, args.parallel)
+    finally:
+        reset(args.email)
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"ok: {args.parallel} parallel failed logins locked the account exactly once")
+
+
+if __name__ == "__main__":
+    main()
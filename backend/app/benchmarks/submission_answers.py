@@ -0,0 +1,81 @@
+"""
+Check the jsonb updates that save appraisal submission answers.
+
+    python -m benchmarks.submission_answers
+
+Runs the expressions CRUDAppraisalSubmission.update_answer_in_submission and
+modify_or_add_answers build (utils.jsonb) through the same guarded
+UPDATE ... RETURNING, on a temporary table shaped like appraisal_submissions:
+a json data column and the completed flag. Nothing is committed; exits with
+status 1 when a case does not give the expected document.
+"""
+import sys
+
+from sqlalchemy import JSON, Boolean, Column, Integer, MetaData, Table, cast, insert, null, update
+
+from db.session import engine
+from utils.jsonb import as_jsonb, has_answer, merge_answers, set_answer
+
+submissions = Table(
+    "submission_answers_check", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("completed", Boolean, default=False),
+    Column("data", JSON),
+    prefixes=["TEMPORARY"],
+)
+data = as_jsonb(submissions.c.data)
+
+ANSWERED = {"goals": {"q1": "met", "q2": "partly"}, "conduct": {"q3": "good"}}
+
+# (name, stored data, completed, new data expression, extra WHERE, expected data or None for no row)
+CASES = [
+    ("set an existing answer", ANSWERED, False,
+     set_answer(data, "goals", "q2", "met"), (has_answer(data, "goals", "q2"),),
+     {"goals": {"q1": "met", "q2": "met"}, "conduct": {"q3": "good"}}),
+    ("set a missing question", ANSWERED, False,
+     set_answer(data, "goals", "q9", "met"), (has_answer(data, "goals", "q9"),), None),
+    ("set in a missing group", ANSWERED, False,
+     set_answer(data, "extra", "q1", "met"), (has_answer(data, "extra", "q1"),), None),
+    ("set on a completed submission", ANSWERED, True,
+     set_answer(data, "goals", "q2", "met"), (has_answer(data, "goals", "q2"),), None),
+    ("merge into an existing group", ANSWERED, False,
+     merge_answers(data, {"goals": {"q2": "met", "q4": "new"}}), (),
+     {"goals": {"q1": "met", "q2": "met", "q4": "new"}, "conduct": {"q3": "good"}}),
+    ("merge a new group", ANSWERED, False,
+     merge_answers(data, {"extra": {"q5": "yes"}}), (),
+     {**ANSWERED, "extra": {"q5": "yes"}}),
+    ("merge into SQL NULL", null(), False,
+     merge_answers(data, {"goals": {"q1": "met"}}), (), {"goals": {"q1": "met"}}),
+    ("merge into JSON null", None, False,
+     merge_answers(data, {"goals": {"q1": "met"}}), (), {"goals": {"q1": "met"}}),
+    ("merge into a completed submission", ANSWERED, True,
+     merge_answers(data, {"goals": {"q1": "missed"}}), (), None),
+]
+
+
+def main() -> None:
+    failures = 0
+    with engine.connect() as conn:
+        submissions.create(conn)
+        for case_id, (name, stored, completed, new_data, where, expected) in enumerate(CASES, start=1):
+            conn.execute(insert(submissions).values(id=case_id, completed=completed, data=stored))
+            # the statement CRUDAppraisalSubmission._update_data issues
+            result = conn.execute(
+                update(submissions)
+                .where(submissions.c.id == case_id, submissions.c.completed.isnot(True), *where)
+                .values(data=cast(new_data, submissions.c.data.type))
+                .returning(submissions.c.data)
+            ).first()
+            got = None if result is None else result.data
+            if got == expected:
+                print(f"ok    {name}")
+            else:
+                failures += 1
+                print(f"FAIL  {name}: expected {expected}, got {got}")
+        conn.rollback()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
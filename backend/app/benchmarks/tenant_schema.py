@@ -0,0 +1,63 @@
+"""
+Check that tenant sessions resolve tenant tables to the tenant's schema.
+
+    python -m benchmarks.tenant_schema --tenant acme
+
+Every tenant table is selected through tenant_session(tenant) and run through
+EXPLAIN (VERBOSE, FORMAT JSON); the scanned relation must be the one in the
+tenant schema, not in public or in the template. The tenant must have been
+provisioned. Exits with status 1 when a table does not resolve.
+"""
+import argparse
+import sys
+
+from sqlalchemy import select
+
+from db.tenancy import tenant_session, tenant_tables, validate_schema_name
+
+
+def scanned_relations(plan: dict):
+    """(schema, relation) of every scan in an EXPLAIN VERBOSE JSON plan."""
+    if "Relation Name" in plan:
+        yield plan.get("Schema"), plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from scanned_relations(child)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="check tenant schema resolution")
+    parser.add_argument("--tenant", required=True)
+    args = parser.parse_args(argv)
+    tenant = validate_schema_name(args.tenant)
+
+    tables = tenant_tables()
+    if not tables:
+        print("no tenant tables registered, every model declares a schema")
+        return
+
+    failures = 0
+    with tenant_session(tenant) as db:
+        for table in tables:
+            # rendered with the translate map of the session's own engine, as its queries are
+            bind = db.get_bind()
+            compiled = select(table).limit(1).compile(
+                dialect=bind.dialect,
+                schema_translate_map=bind.get_execution_options().get("schema_translate_map"),
+                render_schema_translate=True,
+            )
+            plan = db.connection().exec_driver_sql(
+                f"EXPLAIN (VERBOSE, FORMAT JSON) {compiled}", compiled.params
+            ).scalar_one()[0]["Plan"]
+            schemas = {schema for schema, relation in scanned_relations(plan) if relation == table.name}
+            if schemas == {tenant}:
+                print(f"ok    {table.name:<40} {tenant}")
+            else:
+                failures += 1
+                print(f"FAIL  {table.name:<40} resolves to {sorted(schemas) or 'nothing'}")
+        db.rollback()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
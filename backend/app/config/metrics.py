@@ -0,0 +1,284 @@
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self) -> dict:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): [list(counts), total[0]] for key, (counts, total) in self._values.items()}
+
+
+class MetricsRegistry:
+    """
+    In-process metrics in the Prometheus text format.
+
+    Recording is a dict update under a per-metric lock. With several workers, set
+    METRICS_DIR to a directory shared by them: every worker dumps a snapshot there
+    every METRICS_FLUSH_SECONDS and the worker answering the scrape merges them.
+    Counters and histograms of workers that exited are folded into one retired
+    snapshot and their files deleted, their gauges are dropped.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flushed = False
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before a snapshot is taken."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self._collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(settings.METRICS_DIR, f"metrics_{pid}.json")
+
+    def flush(self) -> None:
+        if not settings.METRICS_DIR:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = self._snapshot_path(os.getpid())
+        if not self._flushed:
+            # a file under our pid before our first flush belongs to a dead worker whose pid was reused
+            self._retire(path)
+            self._flushed = True
+        _write_json(path, self.snapshot())
+
+    def _retire(self, path: str) -> None:
+        """Add a dead worker's counters and histograms to the retired snapshot and delete its file."""
+        retired_path = os.path.join(settings.METRICS_DIR, "retired.json")
+        with open(os.path.join(settings.METRICS_DIR, "retired.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # another worker may have retired it while we waited for the lock
+            try:
+                with open(path) as file:
+                    dead = json.load(file)
+            except FileNotFoundError:
+                return
+            except ValueError:
+                dead = {}
+            try:
+                with open(retired_path) as file:
+                    retired = json.load(file)
+            except (FileNotFoundError, ValueError):
+                retired = {}
+            for name, metric in self._metrics.items():
+                if metric.kind != "gauge" and name in dead:
+                    retired[name] = self._merge(metric, [retired.get(name, {}), dead[name]])
+            _write_json(retired_path, retired)
+            os.remove(path)
+
+    def start_flusher(self) -> None:
+        """Start the background thread that shares this worker's snapshot with the others."""
+        if not settings.METRICS_DIR or self._flusher is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(settings.METRICS_FLUSH_SECONDS)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._flusher = threading.Thread(target=run, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _collect_all(self) -> List[Tuple[bool, dict]]:
+        own = self.snapshot()
+        if not settings.METRICS_DIR:
+            return [(True, own)]
+
+        snapshots = [(True, own)]
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, "metrics_*.json")):
+            pid = int(os.path.basename(path)[len("metrics_"):-len(".json")])
+            try:
+                if pid == os.getpid():
+                    if not self._flushed:
+                        self._retire(path)
+                    continue
+                if not _is_alive(pid):
+                    self._retire(path)
+                    continue
+                with open(path) as file:
+                    snapshots.append((True, json.load(file)))
+            except (OSError, ValueError):
+                continue
+        try:
+            with open(os.path.join(settings.METRICS_DIR, "retired.json")) as file:
+                snapshots.append((False, json.load(file)))
+        except (OSError, ValueError):
+            pass
+        return snapshots
+
+    def _merge(self, metric: Metric, snapshots: List[dict]) -> dict:
+        merged = {}
+        for snapshot in snapshots:
+            for key, value in snapshot.items():
+                if metric.kind == "histogram":
+                    counts, total = merged.get(key, ([0] * (len(metric.buckets) + 1), 0.0))
+                    merged[key] = [[a + b for a, b in zip(counts, value[0])], total + value[1]]
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self) -> str:
+        snapshots = self._collect_all()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+
+            merged = self._merge(metric, [
+                snapshot.get(name, {}) for alive, snapshot in snapshots if alive or metric.kind != "gauge"
+            ])
+            for key, value in sorted(merged.items()):
+                labels = list(zip(metric.labelnames, json.loads(key)))
+                if metric.kind == "histogram":
+                    counts, total = value
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float("inf"),), counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+db_pool = registry.gauge("db_pool_connections", "Database pool connections by state", ("state",))
+threadpool = registry.gauge("threadpool_tokens", "Worker threadpool usage for sync endpoints", ("state",))
+login_failures = registry.counter("auth_login_failures_total", "Failed login attempts by reason", ("reason",))
+account_lockouts = registry.counter("auth_account_lockouts_total", "Accounts locked after failed logins")
+emails_sent = registry.counter("emails_sent_total", "Emails handed to the mail server by outcome", ("status",))
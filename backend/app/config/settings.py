@@ -33,6 +33,8 @@ class Settings(BaseSettings):
 
     POSTGRES_PASSWORD: str
     SQLALCHEMY_DATABASE_URL: str
+    SQLALCHEMY_REPLICA_URLS: List[str] = []
+    REPLICA_STICKY_SECONDS: int = 5
 
     INSTANCE_CONNECTION_NAME: Optional[str] = None
     UNIX_SOCKET: str = '/cloudsql/'
@@ -59,6 +61,10 @@ class Settings(BaseSettings):
     DOCUMENT_PATH: str = "test-app/docs"
     AUDIO_PATH: str = "test-app/audios"
     VIDEO_PATH: str = "test-app/videos"
+
+    STORAGE_BACKEND: str = "gcs"  # gcs | local
+    LOCAL_STORAGE_ROOT: str = "media"
+    LOCAL_STORAGE_BASE_URL: str = "/media/"
     SHOW_DOCS: bool = True
     ALLOW_ORIGINS: str = os.getenv("ALLOW_ORIGINS", set_allow_origin)
     SET_NEW_ORIGIN: list = ALLOW_ORIGINS.split(',')
@@ -86,6 +92,53 @@ class Settings(BaseSettings):
     PASSWORD_RESET_TOKEN_DURATION_IN_MINUTES: int = 15
     ACCOUNT_VERIFICATION_TOKEN_DURATION_IN_MINUTES: int = 15
 
+    TENANT_TEMPLATE_SCHEMA: str = "tenant_template"
+    TENANT_SETTINGS_TTL_SECONDS: int = 300
+    TENANT_SETTINGS_NEGATIVE_TTL_SECONDS: int = 30
+
+    REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS: int = 3600
+    REFRESH_TOKEN_PRUNE_BATCH_SIZE: int = 1000
+
+    TOKEN_DENYLIST_BLOOM_BITS: int = 1 << 20
+    TOKEN_DENYLIST_PURGE_SECONDS: int = 300
+
+    LOGIN_MAX_FAILED_ATTEMPTS: int = 3  # per username, locks the account
+    LOGIN_MAX_FAILED_ATTEMPTS_PER_IP: int = 20
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 600
+    LOGIN_LOCK_MINUTES: int = 10
+    LOGIN_MAX_LOCKS: int = 3  # consecutive locks before the account is disabled
+    LOGIN_LIMITER_SHARDS: int = 16
+
+    TRIP_PARTITION_MONTHS_AHEAD: int = 3  # monthly trip partitions created in advance
+    TRIP_PARTITION_RETENTION_MONTHS: int = 0  # detach older trip partitions, 0 keeps them all
+    TRIP_PARTITION_CHECK_SECONDS: int = 86400
+    TRIP_HISTORY_MAX_LIMIT: int = 100
+
+    ROLLUP_REFRESH_SECONDS: int = 300
+    ROLLUP_WATERMARK_OVERLAP_SECONDS: int = 300  # re-read margin for rows committed late
+    ROLLUP_MAX_RANGE_DAYS: int = 366
+
+    SUMMARY_BATCH_SIZE: int = 200  # staff summaries fetched per round trip when streaming
+    STAFF_DEPARTMENTS_TTL_SECONDS: int = 300
+
+    EXPORT_WORKERS: int = 2  # report exports written at the same time per process
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched per round trip while exporting
+    EXPORT_FOLDER: str = "exports"
+    EXPORT_SWEEP_SECONDS: int = 60
+    EXPORT_STALE_SECONDS: int = 900  # running exports without progress this long are failed
+
+    DEBUG: bool = False
+    QUERY_COUNT_WARN_THRESHOLD: int = 30  # statements per request
+    QUERY_TIME_WARN_THRESHOLD_MS: int = 500  # database time per request
+    N_PLUS_ONE_THRESHOLD: int = 5  # identical statements per request
+
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # share of slow SELECTs to EXPLAIN, 0 disables
+    SLOW_QUERY_BUFFER_SIZE: int = 200
+
+    METRICS_DIR: Optional[str] = None  # shared directory for multi-worker metrics
+    METRICS_FLUSH_SECONDS: int = 5
+
     POOL_SIZE: int = 20
     POOL_RECYCLE: int = 3600
     POOL_TIMEOUT: int = 15
@@ -6,8 +6,10 @@ from uuid import UUID
 
 from fastapi import HTTPException, Request
 from pydantic import BaseModel, UUID4
-from sqlalchemy import or_, desc, select, delete, text, func
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError, NoResultFound
+from sqlalchemy import String, or_, desc, select, delete, insert, update, text, func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError, MultipleResultsFound, NoResultFound, ProgrammingError
 from sqlalchemy.orm import selectinload, joinedload, Session
 from sqlalchemy.orm.relationships import RelationshipProperty
 from starlette import status
@@ -16,12 +18,63 @@ from starlette.status import HTTP_409_CONFLICT, HTTP_400_BAD_REQUEST
 from config.logger import log
 from db.base_class import APIBase
 from db.session import engine
+from db.provisioning import provision_tenant
+from db.routing import replica_read
+from db.tenancy import validate_schema_name
+from config.settings import settings
+from utils.cache import TTLCache
+from utils.cls import discard_staged_uploads, stage_file_uploads
 from utils.exceptions import http_500_exc_internal_server_error
+from utils.query_spec import compile_query
 
 ModelType = TypeVar("ModelType", bound=APIBase)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# organization_setting rows per tenant schema, None for unknown tenants;
+# lookups by organization filter the cached rows
+tenant_settings_cache = TTLCache(
+    ttl=settings.TENANT_SETTINGS_TTL_SECONDS,
+    negative_ttl=settings.TENANT_SETTINGS_NEGATIVE_TTL_SECONDS
+)
+
+
+def invalidate_tenant_settings(subdomain: str) -> None:
+    tenant_settings_cache.invalidate(subdomain)
+
+
+def load_tenant_settings(db: Session, schema: str) -> Optional[List[dict]]:
+    """Every organization_setting row of a tenant schema, None when the schema has no such table."""
+    schema = validate_schema_name(schema)
+    try:
+        # a savepoint keeps a missing table (unknown tenant) from aborting the caller's transaction
+        with db.begin_nested():
+            rows = db.execute(text(f'SELECT * FROM "{schema}".organization_setting')).mappings().all()
+    except ProgrammingError:
+        return None
+    return [dict(row) for row in rows]
+
+
+def warm_up_tenant_settings(db: Session) -> int:
+    """Load the settings of every tenant schema into the cache, called once at boot."""
+    schemas = db.execute(
+        text(
+            "SELECT table_schema FROM information_schema.tables "
+            "WHERE table_name = 'organization_setting' AND table_schema <> :template"
+        ),
+        {"template": settings.TENANT_TEMPLATE_SCHEMA}
+    ).scalars().all()
+
+    for schema in schemas:
+        try:
+            tenant_settings_cache.set(schema, load_tenant_settings(db, schema))
+        except (HTTPException, SQLAlchemyError):
+            db.rollback()
+            log.error(f"Failed to warm up settings for tenant {schema}", exc_info=True)
+
+    log.info(f"Tenant settings cache warmed up for {len(schemas)} tenants")
+    return len(schemas)
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
@@ -75,23 +128,64 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def get_settings_by_subdomain(self, db: Session, *, subdomain: str, organization_id: any):
         """
         Retrieve settings by subdomain.
+
+        Served from tenant_settings_cache, the database is only queried when the tenant's
+        entry is missing or expired. Unknown tenants are cached too, for a shorter time.
         """
         try:
-            schema = subdomain
-            query = f'SELECT * FROM "{schema}".organization_setting'
-            params = {}
+            rows = tenant_settings_cache.get_or_load(subdomain, lambda: load_tenant_settings(db, subdomain)) or []
+            if organization_id:
+                rows = [row for row in rows if str(row.get("organization_id")) == str(organization_id)]
+            if len(rows) > 1:
+                raise MultipleResultsFound(f"{len(rows)} settings rows for {subdomain}")
+            # a copy, callers must not change the cached row
+            return dict(rows[0]) if rows else None
+        except HTTPException:
+            raise
+        except Exception:
+            log.exception(f"Error in get_settings_by_subdomain for {self.model.__name__}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+
+    def update_settings_by_subdomain(
+            self, db: Session, *, subdomain: str, organization_id: any, data: Dict[str, Any]
+    ) -> Optional[dict]:
+        """Update a tenant's settings and drop its cached copy."""
+        schema = validate_schema_name(subdomain)
+        if not data:
+            return self.get_settings_by_subdomain(db, subdomain=subdomain, organization_id=organization_id)
+
+        try:
+            columns = db.execute(
+                text(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_schema = :schema AND table_name = 'organization_setting'"
+                ),
+                {"schema": schema}
+            ).scalars().all()
+            invalid = set(data) - set(columns)
+            if invalid:
+                raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=f"Invalid setting fields: {sorted(invalid)}")
+
+            assignments = ", ".join(f'"{column}" = :{column}' for column in data)
+            query = f'UPDATE "{schema}".organization_setting SET {assignments}'
+            params = dict(data)
             if organization_id:
                 query += ' WHERE organization_id = :organization_id'
                 params["organization_id"] = organization_id
 
-            result = db.execute(text(query), params)
-            row = result.mappings().one_or_none()
-            return dict(row) if row else None
-        except NoResultFound:
-            return None
+            row = db.execute(text(query + " RETURNING *"), params).mappings().first()
+            db.commit()
+        except HTTPException:
+            db.rollback()
+            raise
         except Exception:
-            log.exception(f"Error in get_settings_by_subdomain for {self.model.__name__}")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
+            db.rollback()
+            log.exception(f"Error in update_settings_by_subdomain for {self.model.__name__}")
+            raise http_500_exc_internal_server_error()
+        finally:
+            invalidate_tenant_settings(subdomain)
+
+        return dict(row) if row else None
 
     def get_by_id(self, db: Session, *, id: any, silent=False):
         """
@@ -167,6 +261,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{self.model.__name__} not found")
 
 
+    @replica_read
     def get_all(
             self, *,
             db: Session,
@@ -202,6 +297,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             log.exception(f"Unexpected error in get_all {self.model.__name__}")
             raise http_500_exc_internal_server_error()
 
+    @replica_read
     def get_by_filters(
             self, *,
             db: Session,
@@ -245,6 +341,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             log.exception(f"Error in get_by_filters for {self.model.__name__}")
             raise http_500_exc_internal_server_error()
 
+    @replica_read
     def get_by_pattern(
             self, *,
             db: Session,
@@ -299,27 +396,124 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def get_or_create(
             self, *,
             db: Session,
-            data: CreateSchemaType,
-            unique_field: str,
+            data: Union[CreateSchemaType, Dict[str, Any]],
+            unique_field: Union[str, List[str]],
     ) -> ModelType:
-        try:
-            result = db.execute(
-                self.query.filter(getattr(self.model, unique_field) == getattr(data, unique_field))
+        """
+        Return the record whose unique_field matches data, creating it if needed.
+
+        Uses INSERT ... ON CONFLICT DO NOTHING RETURNING, so concurrent callers cannot
+        create duplicates; the existing row is only selected when the insert was skipped.
+        unique_field, or the list of columns, must be backed by a unique index; a
+        conflict on another unique index is reported as 409.
+        """
+        conflict_fields = [unique_field] if isinstance(unique_field, str) else list(unique_field)
+        model_data = self._to_model_data(data)
+        missing = [field for field in conflict_fields if field not in model_data]
+        if missing:
+            raise HTTPException(
+                status_code=HTTP_400_BAD_REQUEST,
+                detail=f"{', '.join(missing)} required to look up {self.model.__name__}"
             )
-            existing = result.scalar_one_or_none()
-            if existing:
-                return existing
 
-            return self.create(db=db, data=data)
+        try:
+            staged_data = self._stage_file_uploads(model_data)
+            try:
+                stmt = (
+                    pg_insert(self.model)
+                    .values(**staged_data)
+                    .on_conflict_do_nothing(index_elements=conflict_fields)
+                    .returning(self.model)
+                )
+                db_obj = db.scalars(stmt).one_or_none()
+                created = db_obj is not None
+                if not created:
+                    db_obj = db.scalars(
+                        self.query.filter(
+                            *[getattr(self.model, field) == staged_data[field] for field in conflict_fields]
+                        )
+                    ).one()
+                db.commit()
+            except Exception:
+                discard_staged_uploads(self.model, model_data, staged_data)
+                raise
+
+            if not created:
+                # the existing row keeps its own files, nothing references the ones staged here
+                discard_staged_uploads(self.model, model_data, staged_data)
+            return db_obj
 
         except HTTPException:
             db.rollback()
             raise
+        except IntegrityError as e:
+            db.rollback()
+            log.error(f"Integrity error in get_or_create for {self.model.__name__}", exc_info=True)
+            raise HTTPException(status_code=HTTP_409_CONFLICT, detail=self._format_integrity_error(e))
         except:
             log.exception(f"Error in get_or_create for {self.model.__name__}")
             db.rollback()
             raise http_500_exc_internal_server_error()
 
+    def upsert(
+            self, *,
+            db: Session,
+            data: Union[CreateSchemaType, Dict[str, Any]],
+            conflict_fields: List[str],
+            update_fields: Optional[List[str]] = None
+    ) -> ModelType:
+        """
+        Insert a record or update the one it conflicts with, in a single statement.
+
+        Args:
+            db: Database session
+            data: Values for the new record
+            conflict_fields: Columns of the unique index that decides a conflict
+            update_fields: Columns to overwrite on conflict, defaults to every provided
+                column except the conflict columns and the primary key
+        """
+        try:
+            model_data = self._to_model_data(data)
+            if update_fields is None:
+                update_fields = [
+                    field for field in model_data
+                    if field not in conflict_fields and field not in ("id", "created_date")
+                ]
+            if not update_fields:
+                # stages and, when the row exists, discards the files itself
+                return self.get_or_create(db=db, data=model_data, unique_field=conflict_fields)
+
+            staged_data = self._stage_file_uploads(model_data)
+            try:
+                stmt = pg_insert(self.model).values(**staged_data)
+                set_ = {field: stmt.excluded[field] for field in update_fields}
+                if "updated_date" in self.model.__table__.columns:
+                    set_["updated_date"] = func.timezone("utc", func.now())
+
+                stmt = (
+                    stmt.on_conflict_do_update(index_elements=conflict_fields, set_=set_)
+                    .returning(self.model)
+                    .execution_options(populate_existing=True)
+                )
+                db_obj = db.scalars(stmt).one()
+                db.commit()
+                return db_obj
+            except Exception:
+                discard_staged_uploads(self.model, model_data, staged_data)
+                raise
+
+        except HTTPException:
+            db.rollback()
+            raise
+        except IntegrityError as e:
+            db.rollback()
+            log.error(f"Integrity error upserting {self.model.__name__}", exc_info=True)
+            raise HTTPException(status_code=HTTP_409_CONFLICT, detail=self._format_integrity_error(e))
+        except:
+            log.exception(f"Error in upsert for {self.model.__name__}")
+            db.rollback()
+            raise http_500_exc_internal_server_error()
+
     def create(self, db: Session, *, data: CreateSchemaType, unique_fields: list = None) -> ModelType:
         if unique_fields is None:
             unique_fields = []
@@ -329,19 +523,27 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             )
 
         try:
-            # model_data = data.model_dump(exclude_none=True, exclude_defaults=False)
-            if isinstance(data, BaseModel):
-                model_data = data.model_dump(exclude_none=True, exclude_defaults=False)
-            else:
-                # fallback for dicts
-                model_data = {k: v for k, v in data.items() if v is not None}
-
+            model_data = self._to_model_data(data)
+            # a duplicate is turned away before anything is uploaded
             self.validate_unique_fields(db=db, model_data=model_data, unique_fields=unique_fields)
 
-            db_obj = self.model(**model_data)
-            db.add(db_obj)
-            db.commit()
-            return self.get_by_id(db=db, id=db_obj.id)
+            # upload files before the write so the transaction never waits on the network
+            staged_data = self._stage_file_uploads(model_data)
+            try:
+                if self._is_column_data(staged_data):
+                    # INSERT ... RETURNING hands back the full row, no re-select after the commit
+                    db_obj = db.scalars(insert(self.model).values(**staged_data).returning(self.model)).one()
+                    db.commit()
+                    return db_obj
+
+                # relationships in the payload need the unit of work
+                db_obj = self.model(**staged_data)
+                db.add(db_obj)
+                db.commit()
+                return db_obj
+            except Exception:
+                discard_staged_uploads(self.model, model_data, staged_data)
+                raise
 
         except HTTPException:
             db.rollback()
@@ -351,6 +553,60 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             log.error(f"Integrity error creating {self.model.__name__}", exc_info=True)
             raise HTTPException(status_code=HTTP_409_CONFLICT, detail=self._format_integrity_error(e))
 
+    def bulk_create(
+            self, db: Session, *,
+            data: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+            batch_size: int = 1000
+    ) -> List[ModelType]:
+        """
+        Insert many records and return them.
+
+        Each batch is a single INSERT ... VALUES (...), (...) RETURNING statement
+        (SQLAlchemy insertmanyvalues), the whole call commits once. The records
+        come back in the order of data.
+
+        Args:
+            db: Database session
+            data: Schemas or dicts holding column values only
+            batch_size: Number of rows sent per statement
+        """
+        if not data:
+            return []
+
+        try:
+            originals = [self._to_model_data(item) for item in data]
+            rows = []
+            try:
+                for item in originals:
+                    rows.append(self._stage_file_uploads(item))
+                created = []
+                for start in range(0, len(rows), batch_size):
+                    # RETURNING rows in the order of the input, callers zip them with their data
+                    result = db.scalars(
+                        insert(self.model).returning(self.model, sort_by_parameter_order=True),
+                        rows[start:start + batch_size]
+                    )
+                    created.extend(result.all())
+                db.commit()
+                return created
+            except Exception:
+                # also the rows staged before one failed to stage
+                for item, staged in zip(originals, rows):
+                    discard_staged_uploads(self.model, item, staged)
+                raise
+
+        except HTTPException:
+            db.rollback()
+            raise
+        except IntegrityError as e:
+            db.rollback()
+            log.error(f"Integrity error during bulk create of {self.model.__name__}", exc_info=True)
+            raise HTTPException(status_code=HTTP_409_CONFLICT, detail=self._format_integrity_error(e))
+        except Exception:
+            db.rollback()
+            log.exception(f"Error during bulk create of {self.model.__name__}")
+            raise http_500_exc_internal_server_error()
+
     def update(
             self, *,
             db: Session,
@@ -365,23 +621,46 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if not db_obj and not id:
             raise HTTPException(status_code=400, detail="Either the db_obj or id must be provided for update")
 
-        if not db_obj:
-            db_obj = self.get_by_id(db=db, id=id)
-
-        if not db_obj:
-            raise HTTPException(status_code=404, detail=f"{self.model.__name__} not found")
+        if db_obj:
+            id = db_obj.id
 
         try:
             update_data = data.model_dump(exclude_none=True) if isinstance(data, BaseModel) else data
             self.validate_unique_fields(db=db, model_data=update_data, unique_fields=unique_fields, id=id)
 
-            for field, value in update_data.items():
-                setattr(db_obj, field, value)
+            if not update_data:
+                return db_obj or self.get_by_id(db=db, id=id)
+
+            staged_data = self._stage_file_uploads(update_data)
+            try:
+                if self._is_column_data(staged_data):
+                    # UPDATE ... RETURNING also refreshes db_obj in the identity map
+                    stmt = (
+                        update(self.model)
+                        .where(self.model.id == id)
+                        .values(**staged_data)
+                        .returning(self.model)
+                        .execution_options(populate_existing=True)
+                    )
+                    updated_obj = db.scalars(stmt).one_or_none()
+                    if updated_obj is None:
+                        raise HTTPException(status_code=404, detail=f"{self.model.__name__} not found")
+                    db.commit()
+                    return updated_obj
 
-            db.add(db_obj)
-            db.commit()
-            db.refresh(db_obj)
-            return db_obj
+                if not db_obj:
+                    db_obj = self.get_by_id(db=db, id=id)
+
+                for field, value in staged_data.items():
+                    setattr(db_obj, field, value)
+
+                db.add(db_obj)
+                db.commit()
+                db.refresh(db_obj)
+                return db_obj
+            except Exception:
+                discard_staged_uploads(self.model, update_data, staged_data)
+                raise
 
         except HTTPException:
             db.rollback()
@@ -391,6 +670,53 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             log.exception(f"Error updating {self.model.__name__}: {str(e)}")
             raise HTTPException(status_code=500, detail="Internal server error during update")
 
+    def bulk_update(
+            self, db: Session, *,
+            data: Sequence[Dict[str, Any]],
+            batch_size: int = 1000
+    ) -> None:
+        """
+        Update many records by primary key.
+
+        Every dict must contain the record "id" plus the columns to change. Each
+        batch runs as one executemany UPDATE and the whole call commits once.
+
+        Args:
+            db: Database session
+            data: Dicts of column values keyed by column name, including "id"
+            batch_size: Number of rows sent per statement
+        """
+        if not data:
+            return
+
+        if any(not row.get("id") for row in data):
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Every record to update must include its id")
+
+        try:
+            rows = []
+            try:
+                for row in data:
+                    rows.append(self._stage_file_uploads(dict(row)))
+                for start in range(0, len(rows), batch_size):
+                    db.execute(update(self.model), rows[start:start + batch_size])
+                db.commit()
+            except Exception:
+                for row, staged in zip(data, rows):
+                    discard_staged_uploads(self.model, row, staged)
+                raise
+
+        except HTTPException:
+            db.rollback()
+            raise
+        except IntegrityError as e:
+            db.rollback()
+            log.error(f"Integrity error during bulk update of {self.model.__name__}", exc_info=True)
+            raise HTTPException(status_code=HTTP_409_CONFLICT, detail=self._format_integrity_error(e))
+        except Exception:
+            db.rollback()
+            log.exception(f"Error during bulk update of {self.model.__name__}")
+            raise http_500_exc_internal_server_error()
+
     def delete(self, db: Session, *, id: UUID4, soft: bool = False) -> None:
         """
         Delete a record by ID.
@@ -490,6 +816,25 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             log.exception(f"Failed to reactivate {self.model.__name__}")
             raise http_500_exc_internal_server_error()
 
+    @staticmethod
+    def _to_model_data(data: Union[BaseModel, Dict[str, Any]]) -> dict:
+        if isinstance(data, BaseModel):
+            return data.model_dump(exclude_none=True, exclude_defaults=False)
+        # fallback for dicts
+        return {k: v for k, v in data.items() if v is not None}
+
+    def _is_column_data(self, model_data: dict) -> bool:
+        """True when every key maps to a plain column, so the row can be written with a Core statement."""
+        # mapper attribute keys, which need not match the column names
+        columns = sa_inspect(self.model).column_attrs
+        return all(key in columns for key in model_data)
+
+    def _stage_file_uploads(self, model_data: dict) -> dict:
+        try:
+            return stage_file_uploads(self.model, model_data)
+        except ValueError as e:
+            raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
     @staticmethod
     def _format_integrity_error(e: IntegrityError) -> str:
         """Prettifies SQLAlchemy IntegrityError messages."""
@@ -508,21 +853,43 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return str(e.orig)
 
     def validate_unique_fields(self, db: Session, *, model_data: dict, unique_fields: List, id: UUID = None):
-        for field in unique_fields:
-            if field in model_data and model_data[field]:
-                query = select(self.model).where(getattr(self.model, field) == model_data[field])
+        """
+        Check every unique field in one SELECT and report the first collision.
 
-                if id:
-                    if not isinstance(id, UUID):
-                        raise HTTPException(status_code=400, detail="Invalid UUID format for ID")
-                    query = query.where(self.model.id != id)
+        Postgres compares the values, bound with the column's type, so a str payload
+        matches a UUID or Enum column. Text is compared case-insensitively and without
+        surrounding whitespace, lower(column) can use a lower() unique index. Each field
+        comes back as a bool_or(...) flag of its own.
+        """
+        values = {field: model_data[field] for field in unique_fields if field in model_data and model_data[field]}
+        if not values:
+            return
+
+        matches = {}
+        for field, value in values.items():
+            column = getattr(self.model, field)
+            if isinstance(value, str) and isinstance(column.type, String):
+                matches[field] = func.lower(column) == value.strip().lower()
+            else:
+                matches[field] = column == value
 
-                result = db.execute(query)
-                if result.scalars().first():
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"'{field}' for {model_data[field]} already exists"
-                    )
+        query = (
+            select(*[func.bool_or(match).label(field) for field, match in matches.items()])
+            .where(or_(*matches.values()))
+        )
+
+        if id:
+            if not isinstance(id, UUID):
+                raise HTTPException(status_code=400, detail="Invalid UUID format for ID")
+            query = query.where(self.model.id != id)
+
+        flags = db.execute(query).mappings().one()
+        for field, value in values.items():
+            if flags[field]:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"'{field}' for {value} already exists"
+                )
 
     def get_related_model(self, use_related_name: str):
         relation = getattr(self.model, use_related_name)
@@ -571,6 +938,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         return model, base
 
+    @replica_read
     def special_read(
             self,
             request: Request,
@@ -582,52 +950,28 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             order_direction: Literal['asc', 'desc'] = 'asc'
     ):
         try:
-            params = {
-                k: v for k, v in request.query_params.items()
-                if k in ['offset', 'limit', 'fields', 'q', 'sort'] or any(k == col[0] for col in self.model.c())
-            }
+            target = self.get_related_model(use_related_name)[1] if use_related_name and resource_id else self.model
+            # filters, q search, sort and paging compiled once per distinct query string
+            query = compile_query(target, request.url.query)
 
             model_to_filter, base = self._base(
                 db,
-                params.get('fields', None),
+                query.fields or None,
                 use_related_name=use_related_name,
                 resource_id=resource_id,
                 joins=joins
             )
-
-            # Convert 'id' filter to UUID
-            filters = {}
-            for key, value in request.query_params.items():
-                if hasattr(model_to_filter, key):
-                    if key == "id":  # Ensure correct filtering for UUID type
-                        try:
-                            filters[key] = UUID(value)
-                        except ValueError:
-                            raise HTTPException(status_code=400, detail=f"Invalid UUID format for {key}: {value}")
-                    else:
-                        filters[key] = value
-
-            # Apply query parameter filters
-            base = base.where(*[getattr(model_to_filter, key) == value for key, value in filters.items()])
+            base = base.where(*query.where)
 
             if order_by:
                 order_field = getattr(model_to_filter, order_by, None)
-                if not order_field:
-                    raise ValueError(f"Invalid order_by column: {order_by}")
+                if order_field is None:
+                    raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=f"Invalid order_by column: {order_by}")
                 base = base.order_by(order_field.asc() if order_direction == 'asc' else order_field.desc())
-            elif params.get('sort'):
-                if isinstance(params['sort'], str):
-                    params['sort'] = [params['sort']]
-                sort_expressions = []
-                for key in params['sort']:
-                    field_name = key[1:] if key.startswith('-') else key
-                    order_field = getattr(model_to_filter, field_name, None)
-                    if order_field is None:
-                        raise ValueError(f"Invalid sort field: {field_name}")
-                    sort_expressions.append(order_field.desc() if key.startswith('-') else order_field.asc())
-                base = base.order_by(*sort_expressions)
-
-            data_stmt = base.offset(int(params.get('offset', 0))).limit(int(params.get('limit', 100)))
+            elif query.order_by:
+                base = base.order_by(*query.order_by)
+
+            data_stmt = base.offset(query.offset).limit(query.limit)
             data_result = db.execute(data_stmt)
             data = data_result.unique().scalars().all()
             count_stmt = base.with_only_columns(func.count('*')).order_by(None)
@@ -650,64 +994,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
     def create_schema(self, *, subdomain: str, db: Session):
         """Creates a new database schema dynamically."""
-        # appraisal imports
-        from domains.appraisal.models.appraisal import Appraisal
-        from domains.appraisal.models.appraisal_comment import AppraisalComment, appraisal_submission_comments
-        from domains.appraisal.models.appraisal_input import AppraisalInput
-        from domains.appraisal.models.appraisal_submission import AppraisalSubmission
-        from domains.appraisal.models.appraisal_template import AppraisalTemplate
-        from domains.appraisal.models.department_group import DepartmentGroup
-        from domains.appraisal.models.appraisal_cycle import AppraisalCycle
-        from domains.appraisal.models.appraisal_section import AppraisalSection
-        from domains.organization.models.organization_staff_role_permissions import (
-            OrganizationRole, OrganizationPermission,
-            organization_role_permissions, organization_staff_permissions, Staff, StaffSupervisor
-        )
-
-        # organization imports
-        from domains.organization.models.form_template import FormFieldTemplate
-        from domains.organization.models.organization_branch import OrganizationBranch
-        from domains.organization.models.department import Department, HeadOfDepartment, HeadOfDepartmentUnit, \
-            DepartmentUnit
-        # from domains.organization.models.staff import Staff, StaffSupervisor
-
-        # tenancy imports
-        from domains.tenancies.models.terms_and_conditions import TermsAndConditions
-        from domains.tenancies.models.tenancy import Tenancy
-        from domains.tenancies.models.bill import Bill
-        from domains.tenancies.models.payment import Payment
-
-        # Create schema
-        db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{subdomain}"'))
-        db.commit()
-
-        # Assign schema to tables
-        Staff.__table__.schema = subdomain
-        StaffSupervisor.__table__.schema = subdomain
-        Department.__table__.schema = subdomain
-        HeadOfDepartment.__table__.schema = subdomain
-        DepartmentUnit.__table__.schema = subdomain
-        HeadOfDepartmentUnit.__table__.schema = subdomain
-        Appraisal.__table__.schema = subdomain
-        AppraisalComment.__table__.schema = subdomain
-        AppraisalInput.__table__.schema = subdomain
-        AppraisalSubmission.__table__.schema = subdomain
-        AppraisalTemplate.__table__.schema = subdomain
-        AppraisalCycle.__table__.schema = subdomain
-        AppraisalSection.__table__.schema = subdomain
-        DepartmentGroup.__table__.schema = subdomain
-        FormFieldTemplate.__table__.schema = subdomain
-        OrganizationRole.__table__.schema = subdomain
-        OrganizationPermission.__table__.schema = subdomain
-        organization_role_permissions.schema = subdomain
-        organization_staff_permissions.schema = subdomain
-        OrganizationBranch.__table__.schema = subdomain
-        appraisal_submission_comments.schema = subdomain
-        TermsAndConditions.__table__.schema = subdomain
-        Tenancy.__table__.schema = subdomain
-        Bill.__table__.schema = subdomain
-        Payment.__table__.schema = subdomain
-
-        # Create tables synchronously
-        with engine.begin() as conn:
-            APIBase.metadata.create_all(conn)
+        # the template holds the schema-less tables, see db.tenancy.tenant_tables
+        # clone the pre-built template schema instead of issuing the DDL table by table
+        result = provision_tenant(subdomain)
+        # drop the negative entry a lookup may have cached before the schema existed
+        invalidate_tenant_settings(subdomain)
+        if result.error:
+            raise http_500_exc_internal_server_error()
+        return result
@@ -5,6 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from config.logger import log
 from config.settings import settings
 from db.base_class import APIBase
+from db.partitions import ensure_monthly_partitions
 from db.session import engine
 
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
@@ -40,6 +41,7 @@ def init_database():
 
 
 from domains.auth.models.refresh_token import RefreshToken
+from domains.auth.models.revoked_token import RevokedToken
 from domains.auth.models.users import User
 from domains.auth.models.role_permissions import Role,Permission, role_permissions
 from domains.etransport.models.driver import Driver
@@ -50,12 +52,17 @@ from domains.etransport.models.rating import Rating
 from domains.etransport.models.transaction import Transaction
 from domains.etransport.models.admin_action_log import AdminActionLog
 from domains.etransport.models.notification import Notification
+from domains.etransport.models.rollup import (
+    DriverDailyEarnings, RollupWatermark, TripStatusDaily, VehicleTypeDailyTrips
+)
+from domains.etransport.models.report_export import ReportExport
 
 def init_tables():
     selected_models = [
         Role,
         User,
         RefreshToken,
+        RevokedToken,
         Permission,
         Vehicle,
         Driver,
@@ -65,16 +72,19 @@ def init_tables():
         Transaction,
         AdminActionLog,
         Notification,
-        TripCancellation
+        TripCancellation,
+        DriverDailyEarnings,
+        VehicleTypeDailyTrips,
+        TripStatusDaily,
+        RollupWatermark,
+        ReportExport,
     ]
 
-    with engine.begin() as conn:
-        for model in selected_models:
-            model.__table__.schema = "public"
-            model.__table__.create(bind=conn, checkfirst=True)
+    # every model declares schema "public" itself, nothing global is reassigned here
+    tables = [model.__table__ for model in selected_models] + [role_permissions]
 
-        # Ensure schema is set for the Table object
-        role_permissions.schema = "public"
-        role_permissions.create(bind=conn, checkfirst=True)
+    with engine.begin() as conn:
+        APIBase.metadata.create_all(conn, tables=tables, checkfirst=True)
+        ensure_monthly_partitions(conn, Trip.__tablename__, months_ahead=settings.TRIP_PARTITION_MONTHS_AHEAD)
 
 
@@ -0,0 +1,85 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.settings import settings
+from db.slow_queries import EXPLAIN_OPTION, slow_query_log
+
+# literals are bound as parameters already, this only folds IN lists of different lengths
+_IN_LIST = re.compile(r"IN \(__\[POSTCOMPILE_\w+\]\)|IN \((%\(\w+\)s(, )?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", statement)).strip()
+
+
+class QueryStats:
+    """Statements, time and rows spent in the database while serving one request."""
+
+    __slots__ = ("path", "scope", "count", "duration", "rows", "shapes")
+
+    def __init__(self, path: str = None, scope: dict = None):
+        self.path = path
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.shapes = Counter()
+
+    @property
+    def route(self) -> Optional[str]:
+        """
+        The route template ("GET /trips/{id}") once the router has matched the request,
+        the raw path before that; resolved on every read so slow queries logged while
+        the endpoint runs are grouped by template, not by path.
+        """
+        route = self.scope.get("route") if self.scope is not None else None
+        if route is not None:
+            return f"{self.scope['method']} {route.path}"
+        return self.path
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        self.count += 1
+        self.duration += duration
+        if rows and rows > 0:
+            self.rows += rows
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_statements(self, threshold: int = None):
+        """Statement shapes executed at least threshold times, most likely N+1 patterns."""
+        threshold = threshold or settings.N_PLUS_ONE_THRESHOLD
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration, cursor.rowcount)
+
+    if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS and not context.execution_options.get(EXPLAIN_OPTION):
+        slow_query_log.record(conn.engine, statement, parameters, duration, route=stats.route if stats else None)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute, drop its start time here
+    # or the stack grows by one entry per error for the life of the pooled connection
+    conn = exception_context.connection
+    if conn is not None and exception_context.cursor is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
@@ -0,0 +1,89 @@
+import re
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from config.logger import log
+from db.session import engine
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(conn: Connection, table: str, schema: str = "public") -> bool:
+    return conn.execute(
+        text("SELECT c.relkind = 'p' FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+             "WHERE n.nspname = :schema AND c.relname = :table"),
+        {"schema": schema, "table": table},
+    ).scalar() is True
+
+
+def ensure_monthly_partitions(
+        conn: Connection, table: str, *, schema: str = "public", since: Optional[datetime] = None,
+        until: Optional[datetime] = None, months_ahead: int = 3
+) -> List[str]:
+    """
+    Create the missing monthly partitions of a table partitioned by RANGE on a
+    timestamp, from the month of since (default: this month) to months_ahead
+    months after the current one, or to the month of until if that is later.
+    Returns the names of the partitions created.
+    """
+    if not is_partitioned(conn, table, schema):
+        log.warning(f"{schema}.{table} is not partitioned, run the migrations first")
+        return []
+
+    now = datetime.utcnow()
+    month, last = month_start(since or now), add_months(month_start(now), months_ahead)
+    if until is not None:
+        last = max(last, month_start(until))
+    created = []
+    while month <= last:
+        name = partition_name(table, month)
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": f"{schema}.{name}"}).scalar() is None:
+            # bounds are dates formatted here, DDL takes no bind parameters
+            conn.execute(text(
+                f"CREATE TABLE {schema}.{name} PARTITION OF {schema}.{table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions_before(table: str, cutoff: date, *, schema: str = "public") -> List[str]:
+    """
+    Detach the monthly partitions of table that end on or before cutoff. The
+    detached tables are kept as they are, to be archived or dropped by hand;
+    DETACH ... CONCURRENTLY does not block reads or writes on the parent.
+    """
+    pattern = re.compile(rf"^{re.escape(table)}_y(\d{{4}})m(\d{{2}})$")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        names = conn.execute(
+            text("SELECT child.relname FROM pg_inherits i "
+                 "JOIN pg_class parent ON parent.oid = i.inhparent "
+                 "JOIN pg_class child ON child.oid = i.inhrelid "
+                 "JOIN pg_namespace n ON n.oid = parent.relnamespace "
+                 "WHERE n.nspname = :schema AND parent.relname = :table"),
+            {"schema": schema, "table": table},
+        ).scalars().all()
+
+        detached = []
+        for name in sorted(names):
+            match = pattern.match(name)
+            if match is None or add_months(date(int(match[1]), int(match[2]), 1), 1) > cutoff:
+                continue
+            conn.execute(text(f"ALTER TABLE {schema}.{table} DETACH PARTITION {schema}.{name} CONCURRENTLY"))
+            detached.append(name)
+    return detached
@@ -0,0 +1,189 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from config.logger import log
+from config.settings import settings
+from db.base_class import APIBase
+from db.session import engine
+from db.tenancy import tenant_tables, validate_schema_name
+
+# Copies every table of source_schema into target_schema with LIKE ... INCLUDING ALL
+# (columns, defaults, indexes, check/unique/primary constraints), then recreates the
+# foreign keys, which LIKE does not copy, pointing at the new schema. Partitioned
+# tables keep their partition key and every partition is recreated with its bounds,
+# parents before their partitions; a partition gets the parent's indexes, indexes
+# created on one partition only are not copied. search_path is pinned to pg_catalog
+# so pg_get_constraintdef always qualifies the referenced table.
+CLONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION public.clone_tenant_schema(source_schema text, target_schema text)
+RETURNS void
+LANGUAGE plpgsql
+SET search_path = pg_catalog
+AS $$
+DECLARE
+    tbl record;
+    fk record;
+BEGIN
+    EXECUTE format('CREATE SCHEMA %I', target_schema);
+
+    FOR tbl IN
+        WITH RECURSIVE tree AS (
+            SELECT c.oid, c.relname, c.relkind, c.relpartbound, NULL::name AS parent, 0 AS depth
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = source_schema AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+            UNION ALL
+            SELECT c.oid, c.relname, c.relkind, c.relpartbound, tree.relname, tree.depth + 1
+            FROM tree
+            JOIN pg_inherits i ON i.inhparent = tree.oid
+            JOIN pg_class c ON c.oid = i.inhrelid AND c.relispartition
+        )
+        SELECT
+            relname, parent,
+            pg_get_expr(relpartbound, oid) AS bound,
+            CASE WHEN relkind = 'p' THEN ' PARTITION BY ' || pg_get_partkeydef(oid) ELSE '' END AS partition_by
+        FROM tree
+        ORDER BY depth
+    LOOP
+        IF tbl.parent IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I.%I (LIKE %I.%I INCLUDING ALL)%s',
+                target_schema, tbl.relname, source_schema, tbl.relname, tbl.partition_by
+            );
+        ELSE
+            EXECUTE format(
+                'CREATE TABLE %I.%I PARTITION OF %I.%I %s%s',
+                target_schema, tbl.relname, target_schema, tbl.parent, tbl.bound, tbl.partition_by
+            );
+        END IF;
+    END LOOP;
+
+    FOR fk IN
+        SELECT cl.relname AS table_name, con.conname, pg_get_constraintdef(con.oid) AS definition
+        FROM pg_constraint con
+        JOIN pg_class cl ON cl.oid = con.conrelid
+        JOIN pg_namespace n ON n.oid = cl.relnamespace
+        -- constraints a partition inherits come with it from the parent
+        WHERE n.nspname = source_schema AND con.contype = 'f' AND con.conparentid = 0
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %I.%I ADD CONSTRAINT %I %s',
+            target_schema, fk.table_name, fk.conname,
+            replace(
+                fk.definition,
+                'REFERENCES ' || quote_ident(source_schema) || '.',
+                'REFERENCES ' || quote_ident(target_schema) || '.'
+            )
+        );
+    END LOOP;
+END;
+$$;
+"""
+
+# arbitrary key for the advisory lock that serialises template builds across workers
+TEMPLATE_LOCK_KEY = 731_204_118
+
+_template_lock = threading.Lock()
+_template_ready = False
+
+
+class ProvisioningResult(BaseModel):
+    subdomain: str
+    seconds: float
+    created: bool = False
+    error: Optional[str] = None
+
+
+def ensure_template_schema(rebuild: bool = False) -> bool:
+    """
+    Build the template schema every tenant is cloned from, on first use.
+
+    Runs create_all with every tenant table (see tenant_tables) against the template
+    once per process (checkfirst, so tables added to the models since the last boot
+    are picked up) and installs the clone function. create_all leaves a partitioned
+    table without partitions; whichever partitions the template has are cloned
+    along with it.
+
+    Returns False, and touches nothing, while there are no tenant tables (every model
+    declares a schema); tenants are then created as empty schemas.
+    """
+    global _template_ready
+    if _template_ready and not rebuild:
+        return True
+
+    tables = tenant_tables()
+    if not tables:
+        return False
+
+    template = validate_schema_name(settings.TENANT_TEMPLATE_SCHEMA)
+    with _template_lock:
+        if _template_ready and not rebuild:
+            return True
+
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": TEMPLATE_LOCK_KEY})
+            if rebuild:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS "{template}" CASCADE'))
+            conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{template}"'))
+            template_conn = conn.execution_options(schema_translate_map={None: template})
+            APIBase.metadata.create_all(template_conn, tables=tables)
+            conn.execute(text(CLONE_FUNCTION))
+
+        _template_ready = True
+        log.info(f"Tenant template schema '{template}' ready in {time.perf_counter() - started:.3f}s")
+        return True
+
+
+def provision_tenant(subdomain: str) -> ProvisioningResult:
+    """Clone the template into a new tenant schema in a single transaction."""
+    validate_schema_name(subdomain)
+    has_template = ensure_template_schema()
+
+    started = time.perf_counter()
+    result = ProvisioningResult(subdomain=subdomain, seconds=0.0)
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_namespace WHERE nspname = :schema"), {"schema": subdomain}
+            ).scalar()
+            if not exists and has_template:
+                conn.execute(
+                    text("SELECT public.clone_tenant_schema(:source, :target)"),
+                    {"source": settings.TENANT_TEMPLATE_SCHEMA, "target": subdomain},
+                )
+                result.created = True
+            elif not exists:
+                conn.execute(text(f'CREATE SCHEMA "{subdomain}"'))
+                result.created = True
+    except Exception as e:
+        log.exception(f"Failed to provision tenant schema '{subdomain}'")
+        result.error = str(e)
+
+    result.seconds = round(time.perf_counter() - started, 4)
+    log.info(f"Provisioned tenant '{subdomain}' in {result.seconds}s (created={result.created})")
+    return result
+
+
+def provision_tenants(subdomains: List[str], max_workers: int = None) -> List[ProvisioningResult]:
+    """Provision several tenants in parallel, each clone runs on its own pooled connection."""
+    ensure_template_schema()
+
+    # leave room in the pool for the requests being served meanwhile
+    max_workers = max_workers or max(1, min(len(subdomains), settings.MAX_CONCURRENT_THREADS, engine.pool.size() // 2))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tenant-provision") as executor:
+        results = list(executor.map(provision_tenant, subdomains))
+
+    failed = [result.subdomain for result in results if result.error]
+    log.info(
+        f"Provisioned {len(results) - len(failed)}/{len(results)} tenants "
+        f"in {time.perf_counter() - started:.3f}s with {max_workers} workers"
+        + (f", failed: {failed}" if failed else "")
+    )
+    return results
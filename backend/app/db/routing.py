@@ -0,0 +1,147 @@
+import functools
+import hashlib
+import itertools
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+from sqlalchemy import Select, TextClause, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from utils.cache import TTLCache
+
+# session.info keys
+ROUTING = "routing"          # "auto" (default), "replica" or "primary"
+READ_ONLY = "read_only"      # set while a CRUDBase read operation runs
+WROTE = "wrote"              # the session has written, keep it on the primary
+STICKY_KEY = "sticky_key"    # identifies the client for read-your-writes
+
+# clients that wrote recently read from the primary until replication has caught up;
+# kept per worker process, a client's next request served by another worker (or
+# another instance) does not see it and may read a replica that is behind
+_recent_writers = TTLCache(ttl=settings.REPLICA_STICKY_SECONDS, maxsize=100_000)
+
+
+def sticky_key_for(request) -> Optional[str]:
+    """Derive the read-your-writes key of a request from its credentials, falling back to the client address."""
+    identity = request.headers.get("authorization") or request.cookies.get("AccessToken")
+    if not identity and request.client:
+        identity = request.client.host
+    if not identity:
+        return None
+    return hashlib.sha1(identity.encode()).hexdigest()
+
+
+class RoutingSession(Session):
+    """
+    Session that sends read-only statements to a replica.
+
+    A SELECT goes to a replica when it runs inside a CRUDBase read operation (or the
+    route asked for replica reads) and the session is not in a write transaction.
+    Everything else, including every flush, stays on the primary. Once a session has
+    written, it and the client it belongs to read from the primary for
+    REPLICA_STICKY_SECONDS so they see their own writes. That memory is per process,
+    see _recent_writers.
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = list(replicas)
+        self._replica_cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._use_replica(clause):
+            return self._replica_for(super().get_bind(mapper, clause, **kw))
+        return super().get_bind(mapper, clause, **kw)
+
+    def _use_replica(self, clause) -> bool:
+        if self._replica_cycle is None or self._flushing:
+            return False
+        if not isinstance(clause, Select) or clause._for_update_arg is not None:
+            return False
+
+        routing = self.info.get(ROUTING, "auto")
+        if routing == "primary" or (routing == "auto" and not self.info.get(READ_ONLY)):
+            return False
+        if self.info.get(WROTE) or self.new or self.dirty or self.deleted:
+            return False
+
+        key = self.info.get(STICKY_KEY)
+        return not (key and key in _recent_writers)
+
+    def _replica_for(self, primary: Engine) -> Engine:
+        replica = next(self._replica_cycle)
+        # carry over per-tenant options such as schema_translate_map
+        return _with_options(replica, primary) if primary.get_execution_options() else replica
+
+
+@functools.lru_cache(maxsize=1024)
+def _with_options(replica: Engine, primary: Engine) -> Engine:
+    return replica.execution_options(**primary.get_execution_options())
+
+
+# text() statements starting with these only read
+READ_ONLY_SQL = ("SELECT", "SHOW", "EXPLAIN", "VALUES", "TABLE")
+
+
+def _is_write(orm_execute_state) -> bool:
+    if orm_execute_state.is_select:
+        return orm_execute_state.statement._for_update_arg is not None
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        # raw SQL, e.g. update_settings_by_subdomain; WITH may hide a data-modifying CTE
+        return not statement.text.lstrip().upper().startswith(READ_ONLY_SQL)
+    # insert/update/delete, DDL and anything else that is not a SELECT
+    return True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_writes(orm_execute_state):
+    if _is_write(orm_execute_state):
+        orm_execute_state.session.info[WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flush(session, flush_context):
+    session.info[WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session):
+    if session.info.get(WROTE):
+        key = session.info.get(STICKY_KEY)
+        if key:
+            _recent_writers.set(key, True)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_write(session):
+    session.info.pop(WROTE, None)
+
+
+@contextmanager
+def replica_reads(db: Session):
+    """Allow the SELECTs run inside the block to be served by a replica."""
+    previous = db.info.get(READ_ONLY)
+    db.info[READ_ONLY] = True
+    try:
+        yield db
+    finally:
+        db.info[READ_ONLY] = previous
+
+
+def replica_read(func):
+    """Mark a repository method as read-only, its queries may be routed to a replica."""
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        db = kwargs.get("db")
+        if db is None:
+            db = next((arg for arg in args if isinstance(arg, Session)), None)
+        if db is None:
+            return func(self, *args, **kwargs)
+        with replica_reads(db):
+            return func(self, *args, **kwargs)
+
+    return wrapper
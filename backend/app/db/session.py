@@ -2,26 +2,74 @@ from fastapi import Request, Depends
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
 from config.logger import log
+from config.metrics import db_pool, registry
 from config.settings import settings
 from utils.core import change_database_schema
 from email.generator import Generator
+
+from db.routing import ROUTING, STICKY_KEY, RoutingSession, sticky_key_for
 # Use psycopg2 for synchronous connections
 
 # Create a synchronous engine
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, echo=False)
 
+# Read replicas, read-only CRUDBase operations are routed to them by RoutingSession
+replica_engines = [
+    create_engine(url, pool_pre_ping=True, echo=False) for url in settings.SQLALCHEMY_REPLICA_URLS
+]
+
 # Create a session factory
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+SessionLocal = sessionmaker(
+    bind=engine, class_=RoutingSession, replicas=replica_engines,
+    autocommit=False, autoflush=False, expire_on_commit=False
+)
+
+
+def collect_pool_stats():
+    pool = engine.pool
+    db_pool.set(pool.size(), state="size")
+    db_pool.set(pool.checkedout(), state="checked_out")
+    db_pool.set(pool.checkedin(), state="idle")
+    db_pool.set(max(pool.overflow(), 0), state="overflow")
+
 
+registry.add_collector(collect_pool_stats)
 
-def get_db() -> Generator:
+
+def request_session(request: Request, routing: str = "auto", bind=None, factory: sessionmaker = SessionLocal):
+    """Session for one request: replica routing and the client's read-your-writes key."""
+    db = factory() if bind is None else factory(bind=bind)
+    db.info[ROUTING] = routing
+    db.info[STICKY_KEY] = sticky_key_for(request)
+    return db
+
+
+def get_db(request: Request) -> Generator:
     try:
-        db = SessionLocal()
+        db = request_session(request)
         yield db 
     finally:
         db.close()
 
 
+def get_primary_db(request: Request) -> Generator:
+    """Per-route override, every statement goes to the primary."""
+    try:
+        db = request_session(request, routing="primary")
+        yield db
+    finally:
+        db.close()
+
+
+def get_replica_db(request: Request) -> Generator:
+    """Per-route override, every plain SELECT may go to a replica, not only CRUDBase reads."""
+    try:
+        db = request_session(request, routing="replica")
+        yield db
+    finally:
+        db.close()
+
+
 def drop_and_alter_table_columns(db: Session):
     # the query execution
     result = db.execute(text('SELECT username FROM users'))
@@ -0,0 +1,109 @@
+import json
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+from config.logger import log
+from config.settings import settings
+
+# marks the recorder's own EXPLAIN statements so they are never recorded themselves
+EXPLAIN_OPTION = "slow_query_explain"
+
+
+class SlowQuery(BaseModel):
+    id: int
+    statement: str
+    parameter_types: Any = None
+    duration_ms: float
+    route: Optional[str] = None
+    recorded_at: datetime
+    plan: Optional[Any] = None
+    plan_error: Optional[str] = None
+
+
+def parameter_types(parameters) -> Any:
+    """Describe bound parameters by type only, values may hold personal data."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany, the first row is representative
+            return [parameter_types(parameters[0]), f"x{len(parameters)}"]
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of the last SLOW_QUERY_BUFFER_SIZE statements slower than
+    SLOW_QUERY_THRESHOLD_MS.
+
+    A SLOW_QUERY_EXPLAIN_SAMPLE_RATE share of slow SELECTs is explained with
+    EXPLAIN (FORMAT JSON) on a separate pooled connection in a background thread,
+    so the request that ran the query never waits for its plan.
+    """
+
+    def __init__(self, maxsize: int = None):
+        self._entries = deque(maxlen=maxsize or settings.SLOW_QUERY_BUFFER_SIZE)
+        self._lock = threading.Lock()
+        self._ids = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def record(self, engine, statement: str, parameters, duration: float, route: str = None) -> SlowQuery:
+        with self._lock:
+            self._ids += 1
+            entry = SlowQuery(
+                id=self._ids,
+                statement=statement.strip(),
+                parameter_types=parameter_types(parameters),
+                duration_ms=round(duration * 1000, 2),
+                route=route,
+                recorded_at=datetime.now(timezone.utc),
+            )
+            self._entries.append(entry)
+
+        log.warning(f"Slow query ({entry.duration_ms}ms) in {route or 'background'}: {entry.statement[:300]}")
+
+        if self._should_explain(entry.statement):
+            self._executor.submit(self._explain, engine, entry, statement, parameters)
+        return entry
+
+    @staticmethod
+    def _should_explain(statement: str) -> bool:
+        rate = settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        if rate <= 0 or not statement.lstrip()[:6].upper() == "SELECT":
+            return False
+        return rate >= 1 or random.random() < rate
+
+    @staticmethod
+    def _explain(engine, entry: SlowQuery, statement: str, parameters) -> None:
+        if isinstance(parameters, list):
+            return
+        try:
+            with engine.connect() as conn:
+                conn = conn.execution_options(**{EXPLAIN_OPTION: True})
+                plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters or None).scalar()
+                entry.plan = json.loads(plan) if isinstance(plan, str) else plan
+                conn.rollback()
+        except Exception as e:
+            entry.plan_error = str(e)
+            log.exception(f"Failed to explain slow query {entry.id}")
+
+    def entries(self, limit: int = 50, route: str = None) -> List[SlowQuery]:
+        with self._lock:
+            entries = list(self._entries)
+        if route:
+            entries = [entry for entry in entries if entry.route == route]
+        return entries[::-1][:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,95 @@
+import importlib
+import re
+from functools import lru_cache
+from typing import Generator, List
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from config.logger import log
+from db.base_class import APIBase
+from db.routing import RoutingSession
+from db.session import engine, replica_engines, request_session
+
+PUBLIC_SCHEMA = "public"
+
+# tenant schemas come from the subdomain header and end up quoted in DDL, keep them strict
+TENANT_SCHEMA_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+
+def is_valid_schema_name(schema: str) -> bool:
+    return bool(schema) and TENANT_SCHEMA_PATTERN.match(schema) is not None
+
+
+def validate_schema_name(schema: str) -> str:
+    if not is_valid_schema_name(schema):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid tenant: {schema}")
+    return schema
+
+
+# Model packages registered on APIBase.metadata before tenant tables are collected.
+# Shared models declare "public"; a model without a schema lives in every tenant
+# schema, tenant engines render it into the tenant's.
+MODEL_PACKAGES = (
+    "domains.auth.models",
+    "domains.etransport.models",
+)
+
+
+@lru_cache(maxsize=1)
+def load_models() -> None:
+    """Import the model packages so their tables are registered on APIBase.metadata."""
+    for package in MODEL_PACKAGES:
+        try:
+            importlib.import_module(package)
+        except ModuleNotFoundError:
+            log.warning(f"Model package {package} not found, its tables are not registered")
+
+
+def tenant_tables() -> List[Table]:
+    """Tables without an explicit schema, they live in every tenant schema. Empty while no model has one."""
+    load_models()
+    return [table for table in APIBase.metadata.sorted_tables if table.schema is None]
+
+
+@lru_cache(maxsize=1024)
+def get_tenant_engine(schema: str) -> Engine:
+    """
+    Engine that renders schema-less tables into the tenant schema.
+
+    The returned engine shares the pool and the compiled statement cache with the
+    main engine; the schema name is substituted at execution time, so nothing global
+    is mutated and tenants can be served concurrently.
+    """
+    if schema == PUBLIC_SCHEMA:
+        return engine
+    return engine.execution_options(schema_translate_map={None: validate_schema_name(schema)})
+
+
+# Sessions over tenant tables, configured like SessionLocal. Listeners for tenant
+# models attach to this factory instead of Session, every public session skips them.
+TenantSessionLocal = sessionmaker(
+    bind=engine, class_=RoutingSession, replicas=replica_engines,
+    autocommit=False, autoflush=False, expire_on_commit=False
+)
+
+
+def tenant_session(schema: str) -> Session:
+    return TenantSessionLocal(bind=get_tenant_engine(schema))
+
+
+def get_tenant_db(request: Request) -> Generator:
+    """
+    Session scoped to the tenant resolved by TenantMiddleware, the dependency of
+    every router over tenant tables. Public tables are reached as usual.
+    """
+    # the same routing and stickiness as get_db, only the bind and the factory differ
+    db = request_session(
+        request, bind=get_tenant_engine(getattr(request.state, "schema", PUBLIC_SCHEMA)), factory=TenantSessionLocal
+    )
+    try:
+        yield db
+    finally:
+        db.close()
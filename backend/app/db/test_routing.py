@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import column, delete, insert, select, table, text, update
+
+from db.routing import _is_write
+
+users = table("users", column("id"), column("email"))
+
+
+def execute_state(statement):
+    """The parts of an ORMExecuteState _is_write reads."""
+    return SimpleNamespace(statement=statement, is_select=statement.is_select)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM organization_setting",
+    "  select 1",
+    "\n\tSELECT count(*) FROM users",
+    "SHOW search_path",
+    "EXPLAIN SELECT 1",
+    "VALUES (1), (2)",
+    "TABLE users",
+])
+def test_read_only_text_is_not_a_write(sql):
+    assert not _is_write(execute_state(text(sql)))
+
+
+@pytest.mark.parametrize("sql", [
+    'UPDATE "acme".organization_setting SET name = :name',
+    "insert into users (id) values (:id)",
+    "DELETE FROM users WHERE id = :id",
+    "WITH moved AS (UPDATE users SET email = :email RETURNING id) SELECT id FROM moved",
+    "ALTER TABLE users ADD COLUMN nickname text",
+    "CREATE SCHEMA acme",
+])
+def test_text_writes_are_writes(sql):
+    assert _is_write(execute_state(text(sql)))
+
+
+def test_select_is_not_a_write():
+    assert not _is_write(execute_state(select(users)))
+
+
+def test_select_for_update_is_a_write():
+    assert _is_write(execute_state(select(users).with_for_update()))
+
+
+@pytest.mark.parametrize("statement", [
+    insert(users).values(id=1),
+    update(users).values(email="a@example.com"),
+    delete(users),
+])
+def test_dml_is_a_write(statement):
+    assert _is_write(execute_state(statement))
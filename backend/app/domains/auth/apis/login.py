@@ -5,7 +5,6 @@ from fastapi import APIRouter, Depends, status, Response, Request, Header
 from fastapi.exceptions import HTTPException
 from fastapi.responses import PlainTextResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from slowapi.errors import RateLimitExceeded
 from sqlalchemy.orm import Session
 
 from config.logger import log
@@ -14,7 +13,6 @@ from db.session import get_db
 from domains.auth.schemas import auth as schema
 from domains.auth.services import login as loginService
 from domains.auth.services import login as service_login
-from domains.auth.services.user_account import users_forms_service
 from services.email_service import EmailSchema
 from utils.rbac import get_current_user_db
 
@@ -39,17 +37,6 @@ def login_for_both_access_and_refresh_tokens(
         if ex.status_code == status.HTTP_401_UNAUTHORIZED: log.exception("Login Failed")
         raise HTTPException(status_code=ex.status_code, detail=str(ex.detail))
 
-    except RateLimitExceeded as ex:
-        user = users_forms_service.repo.get_by_email(db=db, email=form_data.username)
-        if user:
-            user.lock_account(lock_time_minutes=10)
-            db.commit()
-
-        raise HTTPException(
-            status_code=ex.status_code,
-            detail="Account locked due to too many attempts, please try again in 10 minutes."
-        )
-
     except:
         log.exception("Unexpected error in login")
         raise HTTPException(
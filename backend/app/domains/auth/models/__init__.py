@@ -1,11 +1,13 @@
 __all__ = [
     "User",
     "RefreshToken",
+    "RevokedToken",
     "Permission",
     "Role"
     "role_permissions"
 ]
 
 from .refresh_token import RefreshToken
+from .revoked_token import RevokedToken
 from .role_permissions import Role,Permission, role_permissions
 from .users import User
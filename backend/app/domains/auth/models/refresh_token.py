@@ -5,8 +5,10 @@ from sqlalchemy.orm import relationship
 
 
 class RefreshToken(APIBase):
+    __table_args__ = {"schema": "public"}
     user_id = Column(UUID(as_uuid=True), ForeignKey('public.users.id'), unique=True, nullable=True)
-    refresh_token = Column(String, unique=True)
-    expiration_time = Column(DateTime, nullable=True)
+    # hex SHA-256 of the opaque token handed to the client, the token itself is never stored
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expiration_time = Column(DateTime, nullable=True, index=True)
 
     users = relationship('User', backref='users', uselist=True)
@@ -0,0 +1,11 @@
+from db.base_class import APIBase
+from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class RevokedToken(APIBase):
+    __table_args__ = {"schema": "public"}
+    jti = Column(String(64), unique=True, nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey('public.users.id', ondelete="CASCADE"), nullable=True)
+    # the token's own expiry, after which the row is useless and pruned
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -11,7 +11,8 @@ role_permissions = Table(
     'role_permissions',
     APIBase.metadata,
     Column('role_id', UUID(as_uuid=True), ForeignKey('public.roles.id'), primary_key=True),
-    Column('permission_id', UUID(as_uuid=True), ForeignKey('public.permissions.id'), primary_key=True)
+    Column('permission_id', UUID(as_uuid=True), ForeignKey('public.permissions.id'), primary_key=True),
+    schema='public'
 )
 
 
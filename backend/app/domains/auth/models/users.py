@@ -1,13 +1,12 @@
 from datetime import datetime, timedelta
 from db.base_class import APIBase
-from sqlalchemy import Boolean, Column, DateTime, String, Integer, ForeignKey
+from sqlalchemy import Boolean, Column, DateTime, String, Integer, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from domains.etransport.models.driver import Driver
 from domains.etransport.models.passenger import Passenger
 
 class User(APIBase):
-    __table_args__ = {"schema": "public"}
     email = Column(String(255), nullable=False)
     password = Column(String(255), nullable=True)
     reset_password_token = Column(String(255), nullable=True)
@@ -17,6 +16,12 @@ class User(APIBase):
     account_locked_until = Column(DateTime, nullable=True)
     lock_count = Column(Integer, default=0)
 
+    # emails are looked up as lower(email), the index both serves and enforces that
+    __table_args__ = (
+        Index("ux_users_email_lower", func.lower(email), unique=True),
+        {"schema": "public"},
+    )
+
     #file_uploads = relationship("FileUpload", back_populates="users")
     # Relationships
     role = relationship("Role", back_populates="users", foreign_keys=[role_id], primaryjoin="User.role_id==Role.id", post_update=True)
@@ -0,0 +1,116 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from pydantic import BaseModel, UUID4
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from config.settings import settings
+from crud.base import CRUDBase
+from db.session import engine
+from domains.auth.models.refresh_token import RefreshToken
+from domains.auth.models.users import User
+from services.background import register_job
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def new_token() -> Tuple[str, str]:
+    """A fresh opaque refresh token and its digest."""
+    token = secrets.token_urlsafe(32)
+    return token, hash_token(token)
+
+
+class CRUDRefreshToken(CRUDBase[RefreshToken, BaseModel, BaseModel]):
+    """
+    Refresh tokens are opaque random strings; only their SHA-256 digest is stored, in
+    a fixed-length column whose unique index stays small. Every user holds one
+    token, replaced on login and rotated on refresh.
+    """
+
+    def issue(self, db: Session, *, user_id: UUID4, expires_delta: timedelta) -> str:
+        """Store a new token for the user, replacing any previous one, and return it."""
+        token, token_hash = new_token()
+        values = {"token_hash": token_hash, "expiration_time": datetime.utcnow() + expires_delta}
+        db.execute(
+            pg_insert(RefreshToken)
+            .values(user_id=user_id, **values)
+            .on_conflict_do_update(index_elements=[RefreshToken.user_id], set_=values)
+        )
+        db.commit()
+        return token
+
+    def rotate(self, db: Session, *, token: str, expires_delta: timedelta) -> Optional[Tuple[str, UUID4, str]]:
+        """
+        Swap a valid token for a new one in a single UPDATE ... FROM users ... RETURNING.
+
+        Returns (new token, user id, user email), or None when the token is unknown,
+        expired, already rotated or belongs to a disabled user.
+        """
+        new, new_hash = new_token()
+        now = datetime.utcnow()
+        row = db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == hash_token(token),
+                RefreshToken.expiration_time > now,
+                User.id == RefreshToken.user_id,
+                User.is_active.is_(True),
+            )
+            .values(token_hash=new_hash, expiration_time=now + expires_delta, updated_date=now)
+            .returning(User.id, User.email)
+            .execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+        if row is None:
+            return None
+        return new, row.id, row.email
+
+    def get_user_email(self, db: Session, *, token: str) -> Optional[str]:
+        return db.execute(
+            select(User.email)
+            .join(RefreshToken, RefreshToken.user_id == User.id)
+            .where(RefreshToken.token_hash == hash_token(token), RefreshToken.expiration_time > datetime.utcnow())
+        ).scalar()
+
+    def revoke_for_user(self, db: Session, *, user_id: UUID4) -> bool:
+        result = db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+        db.commit()
+        return result.rowcount > 0
+
+
+refresh_token_actions = CRUDRefreshToken(RefreshToken)
+
+
+def prune_expired_refresh_tokens(batch_size: int = None) -> int:
+    """
+    Delete expired tokens in batches, one short transaction per batch, so the job
+    never holds many row locks; SKIP LOCKED lets several workers run it at once.
+    """
+    batch_size = batch_size or settings.REFRESH_TOKEN_PRUNE_BATCH_SIZE
+    expired = (
+        select(RefreshToken.id)
+        .where(RefreshToken.expiration_time < datetime.utcnow())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            deleted = conn.execute(delete(RefreshToken).where(RefreshToken.id.in_(expired))).rowcount
+        total += deleted
+        if deleted < batch_size:
+            break
+    if total:
+        log.info(f"Pruned {total} expired refresh tokens")
+    return total
+
+
+register_job(prune_expired_refresh_tokens, settings.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS)
@@ -1,6 +1,7 @@
 from typing import Dict, Any, Union, Optional
 from fastapi.encoders import jsonable_encoder
 from pydantic import UUID4
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from crud.base import CRUDBase, ModelType
 from domains.auth.models.users import User
@@ -14,7 +15,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
     def is_email_taken(self, db: Session, email: str, exclude_id: UUID4) -> bool:
         if not email: return True
-        query = db.query(User).filter(User.email == email)
+        query = db.query(User).filter(func.lower(User.email) == email.strip().lower())
         if exclude_id: query = query.filter(User.id != exclude_id)
         return query.count() > 0
 
@@ -24,7 +25,7 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
 
     def get_by_email(self, db: Session, email: str):
-        return db.query(self.model).filter(self.model.email == email.strip()).first()
+        return db.query(self.model).filter(func.lower(self.model.email) == email.strip().lower()).first()
 
 
     def get_by_reset_password_token(self, db: Session, token: Any) -> Optional[ModelType]:
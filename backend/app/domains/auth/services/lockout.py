@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pydantic import BaseModel, UUID4
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from config.settings import settings
+from domains.auth.models.users import User
+
+# intrusion logging does a geo lookup and a file write, kept off the request path
+_intrusion_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="intrusion-log")
+
+
+class LockoutResult(BaseModel):
+    failed_login_attempts: int
+    lock_count: int
+    locked: bool
+    disabled: bool
+    account_locked_until: Optional[datetime] = None
+
+
+def register_failed_logins(db: Session, *, user_id: UUID4, failures: int = 1) -> Optional[LockoutResult]:
+    """
+    Add failed logins to the user and lock the account when they reach
+    LOGIN_MAX_FAILED_ATTEMPTS, in one UPDATE ... RETURNING.
+
+    Locking resets the counter and escalates lock_count; the lock after
+    LOGIN_MAX_LOCKS consecutive locks disables the account instead. An account that
+    is already locked is not locked again, so concurrent failures in several workers
+    escalate it once. Returns None when the user does not exist.
+    """
+    now = datetime.now()
+    lock_until = now + timedelta(minutes=settings.LOGIN_LOCK_MINUTES)
+    attempts = func.coalesce(User.failed_login_attempts, 0) + failures
+    lock_count = func.coalesce(User.lock_count, 0)
+    locking = and_(
+        attempts >= settings.LOGIN_MAX_FAILED_ATTEMPTS,
+        or_(User.account_locked_until.is_(None), User.account_locked_until <= now),
+    )
+    disabling = and_(locking, lock_count >= settings.LOGIN_MAX_LOCKS)
+
+    row = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            failed_login_attempts=case((locking, 0), else_=attempts),
+            account_locked_until=case((locking, lock_until), else_=User.account_locked_until),
+            lock_count=case((disabling, 0), (locking, lock_count + 1), else_=User.lock_count),
+            is_active=case((disabling, False), else_=User.is_active),
+        )
+        .returning(
+            User.failed_login_attempts, User.lock_count, User.account_locked_until, User.is_active,
+            # RETURNING sees the new row, compare with the values just written
+            (User.account_locked_until == lock_until).label("locked"),
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+
+    if row is None:
+        return None
+    return LockoutResult(
+        failed_login_attempts=row.failed_login_attempts,
+        lock_count=row.lock_count or 0,
+        locked=bool(row.locked),
+        disabled=bool(row.locked) and not row.is_active,
+        account_locked_until=row.account_locked_until,
+    )
+
+
+def submit_background(func, *args, **kwargs) -> None:
+    """Fire-and-forget for the slow side effects of a lockout: intrusion logs and emails."""
+
+    def run():
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            log.exception(f"Background {func.__name__} failed")
+
+    _intrusion_executor.submit(run)
@@ -14,18 +14,39 @@ from sqlalchemy.future import select
 from sqlalchemy.orm import Session
 
 from config.logger import log
+from config.metrics import account_lockouts, login_failures
 from config.settings import settings
 from db.session import get_db
 from domains.auth.models import RefreshToken, Role, User
+from domains.auth.respository.refresh_token import refresh_token_actions
 from domains.auth.respository.user_account import user_actions
 from domains.auth.schemas import auth as schema
+from domains.auth.services.lockout import register_failed_logins, submit_background
 from domains.auth.services.user_account import users_forms_service
 from domains.auth.services.user_account_mail import send_email, account_emergency
 from domains.auth.respository.role import role_crud
 from utils.core import change_database_schema
+from services.background import register_job
+from utils.rate_limit import SlidingWindowLimiter
 from utils.rbac import get_current_user_db
 from utils.security import Security
 
+# failed logins per username and per client address within LOGIN_FAILURE_WINDOW_SECONDS
+failed_logins_by_user = SlidingWindowLimiter(
+    settings.LOGIN_MAX_FAILED_ATTEMPTS, settings.LOGIN_FAILURE_WINDOW_SECONDS, shards=settings.LOGIN_LIMITER_SHARDS
+)
+failed_logins_by_ip = SlidingWindowLimiter(
+    settings.LOGIN_MAX_FAILED_ATTEMPTS_PER_IP, settings.LOGIN_FAILURE_WINDOW_SECONDS, shards=settings.LOGIN_LIMITER_SHARDS
+)
+
+
+def cleanup_login_limiters() -> None:
+    failed_logins_by_user.cleanup()
+    failed_logins_by_ip.cleanup()
+
+
+register_job(cleanup_login_limiters, settings.LOGIN_FAILURE_WINDOW_SECONDS)
+
 
 def get_tokens(request: Request):
     # Extract tokens from cookies
@@ -46,18 +67,14 @@ def list_logged_in_users(request: Request, db: Session = Depends(get_db), skip:
 
     user_email = None
 
-    # Verify Access Token
-    try:
-        payload = Security.decode_token(tokens['AccessToken'])
+    # Verify Access Token, decode_token returns None for an invalid one
+    payload = Security.decode_token(tokens['AccessToken'])
+    if payload:
         user_email = payload.get("sub")
-    except JWTError:
-        # If Access Token is invalid, try verifying the Refresh Token
-        try:
-            payload = Security.decode_token(tokens['RefreshToken'])
-            user = payload.get("sub")
-            if user:
-                user_email = user.email  # Extract email from user object
-        except JWTError:
+    else:
+        # If Access Token is invalid, fall back to the owner of the Refresh Token
+        user_email = refresh_token_actions.get_user_email(db, token=tokens['RefreshToken'])
+        if not user_email:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid tokens")
 
     if not user_email:
@@ -126,24 +143,19 @@ def get_location_data(ip_address: str) -> dict:
 
 
 def log_intruder_attempt(username: str, request: Request):
-    location = {}
-    try:
-        response = httpx.get(f"https://ipinfo.io/{request.client.host}/geo")
-        response.raise_for_status()
-
-        if response.status_code == 200: location = response.json()
-
-    except:
-        log.exception("Failed to get client host location data at log_intruder_attempt")
-
+    """Capture the request details now, look up the location and write the log in the background."""
     intruder_info = {
         "username": username,
         "ip_address": request.client.host,
         "mac_address": request.headers.get("X-MAC-Address", "N/A"),
         "user_agent": request.headers.get("User-Agent", "N/A"),
-        "location": location,
         "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
+    submit_background(_write_intruder_info, intruder_info)
+
+
+def _write_intruder_info(intruder_info: dict):
+    intruder_info["location"] = get_location_data(intruder_info["ip_address"])
 
     # Log the intruder information
     return secure_log_intruder_info(intruder_info)
@@ -155,65 +167,74 @@ def log_user_in(
         db: Session = Depends(get_current_user_db),
         form_data: OAuth2PasswordRequestForm = Depends()
 ):
+    username = form_data.username.strip().lower()
+    client_ip = request.client.host if request.client else "unknown"
+
+    # attack traffic over the limit is turned away here, before any query
+    if failed_logins_by_ip.is_limited(client_ip) or failed_logins_by_user.is_limited(username):
+        login_failures.inc(reason="rate_limited")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, please try again later.",
+        )
+
     user = users_forms_service.repo.get_by_email(db, email=form_data.username)
 
-    if not user: raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Incorrect username or password",
-    )
-    if not user.is_active: raise HTTPException(
+    if not user:
+        login_failures.inc(reason="unknown_user")
+        failed_logins_by_ip.hit(client_ip)
+        failed_logins_by_user.hit(username)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+        )
+    if not user.is_active:
+        login_failures.inc(reason="disabled")
+        raise HTTPException(
         status_code=status.HTTP_423_LOCKED,
         detail="Account Disabled, please contact system administrator for redress.",
     )
-    now_utc = datetime.now(timezone.utc)
-
     if user.is_account_locked():
-        if now_utc < user.account_locked_until:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Account is locked due to multiple failed login attempts.",
-            )
-        else:
-            # Unlock the account if the lock time has passed
-            user.account_locked_until = None
-            db.commit()
+        login_failures.inc(reason="locked")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is locked due to multiple failed login attempts.",
+        )
 
     if not Security.verify_password(form_data.password, user.password):
-        user.failed_login_attempts += 1
-
-        if user.failed_login_attempts >= 3:
-            user.lock_account(lock_time_minutes=10)
-
-            if user.lock_count <= 2:
-                user.lock_count += 1
-
-            elif user.lock_count >= 3:
-                user.is_active = False
-                user.lock_count = 0
-                db.commit()
+        login_failures.inc(reason="bad_password")
+        failed_logins_by_ip.hit(client_ip)
+
+        # failures are counted in memory, the User row is only written when they cross the threshold
+        failures = failed_logins_by_user.hit(username)
+        if failures >= settings.LOGIN_MAX_FAILED_ATTEMPTS:
+            # increment, lock and escalate in one statement, safe against concurrent failures
+            lockout = register_failed_logins(db, user_id=user.id, failures=failures)
+
+            if lockout and lockout.locked:
+                account_lockouts.inc()
+                log_intruder_attempt(user.email, request)
+            if lockout and lockout.disabled:
                 email_body = account_emergency("")
-                send_email(email=user.email, subject="Account Status", body=email_body)  # send email message
-
-            db.commit()
+                submit_background(send_email, email=user.email, subject="Account Status", body=email_body)
 
-            log_intruder_attempt(user.email, request)
             # LoginService.log_intruder_attempt(user.username, request)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Account is locked due to multiple failed login attempts.",
             )
 
-        db.commit()
-
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
 
     is_system_admin = True
-    # Reset failed attempts after successful login
-    user.reset_failed_attempts()
-    db.commit()
+    # Reset failed attempts after successful login, an expired lock is cleared here as well
+    failed_logins_by_user.reset(username)
+    if user.failed_login_attempts or user.account_locked_until:
+        user.reset_failed_attempts()
+        db.commit()
 
     # Token creation logic
     access_token_expires = timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -225,24 +246,12 @@ def log_user_in(
     access_token = Security.create_access_token(
         data={"sub": str(user.email)}, expires_delta=access_token_expires
     )
-    refresh_token = Security.create_refresh_token(
-        data={"sub": str(user)}, expires_delta=refresh_token_expires
-    )
+    # opaque token, replaces the user's previous one in a single upsert
+    refresh_token = refresh_token_actions.issue(db, user_id=user.id, expires_delta=refresh_token_expires)
 
     expiration_time = datetime.now() + refresh_token_expires
     access_token_expiration = datetime.now() + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    db_refresh_token = db.execute(select(RefreshToken).where(RefreshToken.user_id == user.id))
-    db_refresh_token = db_refresh_token.scalars().first()
-    if db_refresh_token:
-        db_refresh_token.refresh_token = refresh_token
-        db_refresh_token.expiration_time = expiration_time
-    else:
-        db_refresh_token = RefreshToken(user_id=user.id, refresh_token=refresh_token, expiration_time=expiration_time)
-        db.add(db_refresh_token)
-
-    db.commit()
-
     # refresh_token_expires = expiration_time
     # 
     # Set cookies for access and refresh tokens
@@ -312,28 +321,24 @@ def get_new_access_token(
         refresh_token: schema.RefreshToken,
         db: Session = Depends(get_current_user_db)
 ):
-    refresh_token_check = db.execute(
-        select(RefreshToken).where(RefreshToken.refresh_token == refresh_token.refresh_token))
-    refresh_token_check = refresh_token_check.scalars().first()
-    if not refresh_token_check: raise HTTPException(
+    access_token_expires = timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    refresh_token_expires = timedelta(minutes=settings.REFRESH_TOKEN_DURATION_IN_MINUTES)
+
+    # validate, rotate and fetch the owner in one statement
+    rotated = refresh_token_actions.rotate(
+        db, token=refresh_token.refresh_token, expires_delta=refresh_token_expires
+    )
+    if not rotated: raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate new access token credentials",
         headers={"WWW-Authenticate": "Bearer"}
     )
+    new_refresh_token, user_id, user_email = rotated
+    log.debug(f"rotated refresh token of user id: {user_id}")
 
-    user_data = db.execute(select(User).filter(User.id == refresh_token_check.user_id))
-    user_data = user_data.scalars().first()
-    # Get current user information
-    log.debug("user id: ", refresh_token_check.user_id)
-    # user_data = users_forms_service.get_user(db=db, id=refresh_token_check.user_id)
-    log.debug("user email: ", user_data.email)
-
-    access_token_expires = timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    refresh_token_expires = timedelta(minutes=settings.REFRESH_TOKEN_DURATION_IN_MINUTES)
     new_access_token = Security.create_access_token(
-        data={"sub": str(user_data.email)}, expires_delta=access_token_expires
+        data={"sub": str(user_email)}, expires_delta=access_token_expires
     )
-    new_refresh_token = Security.create_refresh_token(jsonable_encoder(user_data), expires_delta=refresh_token_expires)
 
     # # Set Cookie for new access token
     # response.set_cookie(
@@ -357,24 +362,6 @@ def get_new_access_token(
     #     secure=True
     # )
 
-    refresh_token_check = db.execute(
-        select(RefreshToken).where(RefreshToken.refresh_token == refresh_token.refresh_token))
-    refresh_token_obj = refresh_token_check.scalars().first()  # Extract the ORM instance
-
-    if refresh_token_obj:
-        db.delete(refresh_token_obj)
-        db.commit()
-
-    refresh_token_dict = {
-        "user_id": user_data.id,
-        "refresh_token": new_refresh_token,
-    }
-
-    # create new refresh token for user after requesting for a new access token
-    refresh_token_data = RefreshToken(**refresh_token_dict)
-    db.add(refresh_token_data)
-    db.commit()
-
     return {
         "access_token": new_access_token,
         "token_type": "bearer",
@@ -1,14 +1,11 @@
-from datetime import datetime
-
 from fastapi import Depends, HTTPException, status, Response, Request
-from jose import JWTError
 from sqlalchemy.orm import Session
-from sqlalchemy.future import select
 from utils.rbac import get_current_user_db
 from config.logger import log
 from db.session import get_db
-from domains.auth.models.refresh_token import RefreshToken
+from domains.auth.respository.refresh_token import refresh_token_actions
 from domains.auth.services import login as loginService
+from domains.auth.services.revocation import revoke_token
 from domains.auth.services.user_account import users_forms_service
 from utils.security import Security
 
@@ -20,15 +17,13 @@ def logout_user(request: Request, response: Response, db: Session = Depends(get_
         detail="No token provided"
     )
 
-    # Verify the refresh token
-    try:
-        payload = Security.decode_token(tokens['AccessToken'])
-        user_email = payload.get("sub")
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid tokens"
-        )
+    # Verify the access token, decode_token returns None for an invalid one
+    payload = Security.decode_token(tokens['AccessToken'])
+    if not payload: raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid tokens"
+    )
+    user_email = payload.get("sub")
 
     if not user_email: raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,18 +38,11 @@ def logout_user(request: Request, response: Response, db: Session = Depends(get_
         detail="User not found"
     )
 
-    refresh_token = db.execute(select(RefreshToken).where(RefreshToken.user_id == user.id))
-    refresh_token = refresh_token.scalars().first()
-    # refresh_token = db.query(RefreshToken).filter(RefreshToken.user_id == user.id).first()
-    if not refresh_token: raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Refresh token not found"
-    )
+    # the access token stops working on every worker now, not at its expiry
+    revoke_token(db, payload, user_id=user.id)
 
-    # Invalidate the token by setting the logged_out_at timestamp
-    refresh_token.logged_out_at = datetime.now()
-    db.delete(refresh_token)
-    db.commit()
+    if not refresh_token_actions.revoke_for_user(db, user_id=user.id):
+        log.debug(f"user {user.id} had no refresh token to remove")
 
     # Clear tokens from the cookies
     response.delete_cookie(key="AccessToken")
@@ -0,0 +1,136 @@
+import select as select_module
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import UUID4
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from config.settings import settings
+from db.session import engine
+from domains.auth.models.revoked_token import RevokedToken
+from services.background import register_job
+from utils.denylist import TokenDenylist
+
+NOTIFY_CHANNEL = "token_revoked"
+
+# revoked access tokens of this worker, consulted on every authenticated request
+denylist = TokenDenylist(bloom_size_bits=settings.TOKEN_DENYLIST_BLOOM_BITS)
+
+
+def is_token_revoked(payload: dict) -> bool:
+    """In-memory check, authentication never queries the database for revocation."""
+    return payload.get("jti") in denylist
+
+
+def revoke_token(db: Session, payload: dict, user_id: UUID4 = None) -> bool:
+    """
+    Revoke an access token until it expires.
+
+    The row and the NOTIFY are committed together; every worker, this one included,
+    receives the notification and adds the jti to its denylist. This worker adds it
+    right away as well so the revocation holds for its very next request.
+    """
+    jti, exp = payload.get("jti"), payload.get("exp")
+    if not jti or not exp:
+        return False
+
+    db.execute(
+        pg_insert(RevokedToken)
+        .values(jti=jti, user_id=user_id, expires_at=datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None))
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+    )
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": NOTIFY_CHANNEL, "payload": f"{jti}:{exp}"})
+    db.commit()
+    denylist.add(jti, float(exp))
+    return True
+
+
+def load_revoked_tokens() -> int:
+    """Fill the denylist with the tokens revoked and not yet expired, on start and after reconnects."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > datetime.utcnow())
+        ).all()
+    denylist.add_many((jti, expires_at.replace(tzinfo=timezone.utc).timestamp()) for jti, expires_at in rows)
+    return len(rows)
+
+
+def prune_revoked_tokens() -> None:
+    removed = denylist.purge()
+    with engine.begin() as conn:
+        deleted = conn.execute(delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())).rowcount
+    if removed or deleted:
+        log.debug(f"Dropped {removed} expired denylist entries and {deleted} revoked token rows")
+
+
+register_job(prune_revoked_tokens, settings.TOKEN_DENYLIST_PURGE_SECONDS)
+
+
+class RevocationListener:
+    """
+    Background thread that LISTENs for revocations made by other workers.
+
+    It keeps one pooled connection checked out while it runs. After a lost
+    connection it reconnects and reloads the table, so revocations sent meanwhile
+    are not missed.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        try:
+            log.info(f"Loaded {load_revoked_tokens()} revoked tokens")
+        except Exception:
+            log.exception("Failed to load revoked tokens")
+        self._thread = threading.Thread(target=self._run, name="token-revocation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        reconnect_delay = 1
+        while not self._stop.is_set():
+            try:
+                self._listen()
+                reconnect_delay = 1
+            except Exception:
+                log.exception("Token revocation listener lost its connection, reconnecting")
+                self._stop.wait(reconnect_delay)
+                reconnect_delay = min(reconnect_delay * 2, 60)
+                try:
+                    load_revoked_tokens()
+                except Exception:
+                    log.exception("Failed to reload revoked tokens")
+
+    def _listen(self) -> None:
+        connection = engine.raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+            while not self._stop.is_set():
+                readable, _, _ = select_module.select([dbapi_connection], [], [], 5)
+                if not readable:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    jti, _, exp = notify.payload.rpartition(":")
+                    denylist.add(jti, float(exp))
+        finally:
+            # the connection was switched to autocommit/LISTEN, do not return it to the pool
+            connection.invalidate()
+
+
+revocation_listener = RevocationListener()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.future import select
 
 from config.logger import log
+from db.tenancy import validate_schema_name
 from pydantic import UUID4
 from domains.auth.models.role_permissions import Role
 from domains.auth.respository.role import role_crud as role_repo
@@ -101,20 +102,15 @@ class RoleService:
             # Convert role_id to UUID (ensure it's the correct type)
             role_id = UUID4(role_id) if isinstance(role_id, str) else role_id
 
-            # Set schema explicitly
-            db.execute(text(f'SET search_path TO "{schema}"'))
-            log.debug(f"Schema switched to: {schema}")
-
-            # Explicitly use the correct schema
-            RoleSchema = Role.with_schema(schema)
-            query = select(RoleSchema).where(RoleSchema.id == role_id)
+            validate_schema_name(schema)
+            query = select(Role).where(Role.id == role_id)
 
             log.debug(f"Executing query in schema: {schema}")
-            log.debug(str(query))
-            log.debug("User role id:", role_id)
+            log.debug(f"User role id: {role_id}")
 
-            # Execute the query
-            result = db.execute(query)
+            # Render the roles table in the tenant schema for this statement only,
+            # SET search_path would leak into every later use of the pooled connection
+            result = db.execute(query, execution_options={"schema_translate_map": {"public": schema}})
             user_role = result.scalars().first()
 
             if user_role:
@@ -1,7 +1,10 @@
+import asyncio
+
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from pydantic import EmailStr
 
 from config.logger import log
+from config.metrics import emails_sent
 from config.settings import settings
 
 # Define the email configuration
@@ -19,6 +22,7 @@ conf = ConnectionConfig(
 
 
 def send_email(email: EmailStr, subject: str, body: str):
+    """Send and wait for the mail server, runs on a worker thread (see lockout.submit_background)."""
     try:
         message = MessageSchema(
             subject=subject,
@@ -27,8 +31,10 @@ def send_email(email: EmailStr, subject: str, body: str):
             subtype="html"
         )
         fm = FastMail(conf)
-        fm.send_message(message)
+        asyncio.run(fm.send_message(message))
+        emails_sent.inc(status="sent")
     except:
+        emails_sent.inc(status="failed")
         # Log the exception or retry
         log.exception(f"Failed to send email to {email}")
 
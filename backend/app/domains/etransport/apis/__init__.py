@@ -1,7 +1,13 @@
 from fastapi import APIRouter
 
+from .analytics import analytics_router
 from .passenger import passengers_router
+from .report_export import report_exports_router
+from .trip import trips_router
 
 
 etransport_router = APIRouter()
 etransport_router.include_router(passengers_router, tags=["PASSENGERS ACCOUNT"])
+etransport_router.include_router(trips_router, tags=["TRIPS"])
+etransport_router.include_router(analytics_router, tags=["ANALYTICS"])
+etransport_router.include_router(report_exports_router, tags=["REPORT EXPORTS"])
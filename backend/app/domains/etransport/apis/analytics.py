@@ -0,0 +1,71 @@
+from datetime import date
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends
+from pydantic import UUID4
+from sqlalchemy.orm import Session
+
+from db.session import get_db
+from domains.auth.models.users import User
+from domains.etransport.schemas import analytics as schemas
+from domains.etransport.services.analytics import analytics_service as actions
+from utils.rbac import check_if_is_system_admin, get_current_user
+
+
+analytics_router = APIRouter(
+    prefix="/analytics",
+    responses={404: {"description": "Not found"}},
+)
+
+
+@analytics_router.get(
+    "/earnings/me",
+    response_model=schemas.DriverEarningsReport
+)
+def my_earnings(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user),
+        start: Optional[date] = None,
+        end: Optional[date] = None
+) -> Any:
+    return actions.my_earnings(db=db, user=current_user, start=start, end=end)
+
+
+@analytics_router.get(
+    "/earnings/{driver_id}",
+    response_model=schemas.DriverEarningsReport
+)
+def driver_earnings(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(check_if_is_system_admin),
+        driver_id: UUID4,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+) -> Any:
+    return actions.driver_earnings(db=db, driver_id=driver_id, start=start, end=end)
+
+
+@analytics_router.get(
+    "/vehicle-types",
+    response_model=List[schemas.VehicleTypeDay]
+)
+def vehicle_type_trips(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(check_if_is_system_admin),
+        start: Optional[date] = None,
+        end: Optional[date] = None
+) -> Any:
+    return actions.vehicle_type_trips(db=db, start=start, end=end)
+
+
+@analytics_router.get(
+    "/trip-statuses",
+    response_model=List[schemas.TripStatusDay]
+)
+def trip_statuses(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(check_if_is_system_admin),
+        start: Optional[date] = None,
+        end: Optional[date] = None
+) -> Any:
+    return actions.trip_statuses(db=db, start=start, end=end)
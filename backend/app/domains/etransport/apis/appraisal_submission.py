@@ -7,8 +7,9 @@ from db.session import get_db
 from domains.driver.schemas import appraisal_submission as schemas
 from domains.driver.services.appraisal_submission import appraisal_submission_service as actions
 from domains.auth.models.users import User
-from fastapi import APIRouter, Depends, Query, status, Header
+from fastapi import APIRouter, Depends, Query, Request, status, Header
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 from utils.rbac import get_current_user
@@ -163,8 +164,9 @@ appraisal_summary_router = APIRouter(prefix='/summaries')
     responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
 )
 def get_summary_results_endpoint(
-        *, db: Session = Depends(get_db),
+        *,
         current_user: User = Depends(get_current_user),
+        request: Request,
         year: Optional[int] = Query(None, description="Filter by appraisal year"),
         staff_id: Optional[UUID4] = Query(None, description="Filter by staff ID"),
         department_group_id: Optional[UUID4] = Query(None, description="Filter by department group ID"),
@@ -173,13 +175,17 @@ def get_summary_results_endpoint(
 ) -> Any:
     """
     Fetch summary results grouped by group_name, filtered by year, staff_id and department_group_id.
+    Built in the database and streamed per staff, large departments are not held in memory.
     """
-    return actions.get_summary_results(
-        db=db,
-        year=year,
-        staff_id=staff_id,
-        department_group_id=department_group_id,
-        cycle=cycle
+    return StreamingResponse(
+        actions.stream_summary_results(
+            schema=request.state.schema,
+            year=year,
+            staff_id=staff_id,
+            department_group_id=department_group_id,
+            cycle=cycle
+        ),
+        media_type="application/json",
     )
 
 
@@ -216,3 +222,4 @@ def get_filtered_submissions_report(
         order_by=order_by,
         order_direction=order_direction,
     )
+
@@ -0,0 +1,79 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import UUID4
+from sqlalchemy.orm import Session
+
+from db.session import get_db
+from domains.auth.models.users import User
+from domains.etransport.schemas import report_export as schemas
+from domains.etransport.services.report_export import report_export_service as actions
+from utils.rbac import get_current_user
+from utils.schemas import HTTPError
+
+
+report_exports_router = APIRouter(
+    prefix="/report_exports",
+    responses={404: {"description": "Not found"}},
+)
+
+
+@report_exports_router.post(
+    "",
+    response_model=schemas.ReportExportSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": HTTPError}},
+)
+def create_report_export(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user),
+        request: Request,
+        export_in: schemas.ReportExportCreate,
+
+) -> Any:
+    """
+    Export a whole report to CSV or XLSX in the background. Poll the returned
+    export until its status is done, then fetch its download_url.
+    """
+    export = actions.request_export(db=db, user=current_user, schema=request.state.schema, export_in=export_in)
+    return actions.to_schema(export)
+
+
+@report_exports_router.get(
+    "/{id}",
+    response_model=schemas.ReportExportSchema,
+    responses={status.HTTP_404_NOT_FOUND: {"model": HTTPError}},
+)
+def get_report_export(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user),
+        request: Request,
+        id: UUID4,
+
+) -> Any:
+    export = actions.get_export(db=db, user=current_user, schema=request.state.schema, id=id)
+    return actions.to_schema(export, download_url=str(request.url_for("download_report_export", id=export.id)))
+
+
+@report_exports_router.get(
+    "/{id}/download",
+    responses={
+        status.HTTP_404_NOT_FOUND: {"model": HTTPError},
+        status.HTTP_409_CONFLICT: {"model": HTTPError},
+    },
+)
+def download_report_export(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user),
+        request: Request,
+        id: UUID4,
+
+) -> Any:
+    export, chunks = actions.open_export(db=db, user=current_user, schema=request.state.schema, id=id)
+    filename = export.key.rsplit("/", 1)[-1]
+    return StreamingResponse(
+        chunks,
+        media_type=export.content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
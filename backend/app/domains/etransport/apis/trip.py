@@ -0,0 +1,30 @@
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from db.session import get_db
+from domains.auth.models.users import User
+from domains.etransport.schemas import trip as schemas
+from domains.etransport.services.trip import trips_service as actions
+from utils.rbac import get_current_user
+
+
+trips_router = APIRouter(
+    prefix="/trips",
+    responses={404: {"description": "Not found"}},
+)
+
+
+@trips_router.get(
+    "/history",
+    response_model=schemas.TripHistoryPage
+)
+def trip_history(
+        *, db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user),
+        role: Literal['passenger', 'driver'] = 'passenger',
+        cursor: Optional[str] = None,
+        limit: int = 20
+) -> Any:
+    return actions.trip_history(db=db, user=current_user, role=role, cursor=cursor, limit=limit)
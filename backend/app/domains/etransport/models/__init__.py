@@ -6,7 +6,12 @@ __all__ = [
     "Rating",
     "Transaction",
     "AdminActionLog",
-    "Notification"
+    "Notification",
+    "DriverDailyEarnings",
+    "VehicleTypeDailyTrips",
+    "TripStatusDaily",
+    "RollupWatermark",
+    "ReportExport",
 ]
 
 from .driver import Driver
@@ -17,3 +22,5 @@ from .rating import Rating
 from .transaction import Transaction
 from .admin_action_log import AdminActionLog
 from .notification import Notification
+from .rollup import DriverDailyEarnings, VehicleTypeDailyTrips, TripStatusDaily, RollupWatermark
+from .report_export import ReportExport
@@ -5,7 +5,7 @@ from sqlalchemy.orm import relationship
 
 class Notification(APIBase):
     __table_args__ = {"schema": "public"}
-    user_id = Column(UUID(as_uuid=True), ForeignKey("public.users.id"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("public.users.id"), index=True)
     message = Column(String)
     is_read = Column(Boolean, default=False)
 
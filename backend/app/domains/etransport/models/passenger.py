@@ -1,16 +1,32 @@
-from sqlalchemy import Column, ForeignKey, JSON, Boolean, String, Text
+import re
+
+from sqlalchemy import Column, ForeignKey, Index, JSON, Boolean, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from db.base_class import APIBase
 from sqlalchemy.dialects.postgresql import UUID
 
 
+def normalize_phone(phone: str) -> str:
+    """The digits of a phone number, what phone lookups compare."""
+    return re.sub(r"[^0-9]", "", phone or "")
+
+
+def phone_digits(column):
+    """SQL side of normalize_phone, indexed as ix_passengers_phone_digits."""
+    return func.regexp_replace(column, "[^0-9]", "", "g")
+
+
 class Passenger(APIBase):
-    __table_args__ = {"schema": "public"}
     user_id = Column(UUID(as_uuid=True), ForeignKey("public.users.id"))
     full_name = Column(String(255), nullable=True)
     phone = Column(String(255), nullable=True)
     payment_info = Column(String(244), nullable=True)
+
+    __table_args__ = (
+        Index("ix_passengers_phone_digits", phone_digits(phone)),
+        {"schema": "public"},
+    )
     
     user = relationship("User", back_populates="passenger_profile")
     trips = relationship("Trip", back_populates="passenger")
\ No newline at end of file
@@ -8,12 +8,12 @@ from sqlalchemy.dialects.postgresql import UUID
 
 class Rating(APIBase):
     __table_args__ = {"schema": "public"}
-    trip_id = Column(UUID(as_uuid=True), ForeignKey("public.trips.id"))
+    trip_id = Column(UUID(as_uuid=True), index=True)  # trips are partitioned, no foreign key
     from_user_id = Column(UUID(as_uuid=True), ForeignKey("public.users.id"))
-    to_user_id = Column(UUID(as_uuid=True), ForeignKey("public.users.id"))
+    to_user_id = Column(UUID(as_uuid=True), ForeignKey("public.users.id"), index=True)
     rating = Column(Integer)  # 1 to 5
     comment = Column(String, nullable=True)
 
-    trip = relationship("Trip")
+    trip = relationship("Trip", primaryjoin="foreign(Rating.trip_id) == Trip.id")
     from_user = relationship("User", foreign_keys=[from_user_id])
     to_user = relationship("User", foreign_keys=[to_user_id])
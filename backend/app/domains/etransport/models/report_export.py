@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+from db.base_class import APIBase, UUID
+
+
+class ReportExport(APIBase):
+    """
+    A report written to storage by a background worker. Requested as pending,
+    claimed as running by exactly one worker, then done with the storage key or
+    failed with the error; the row is the polling handle.
+    """
+    __table_args__ = (
+        # the sweep looks for pending and stalled running exports
+        Index("ix_report_exports_status_updated", "status", "updated_date"),
+        {"schema": "public"},
+    )
+    tenant_schema = Column(String(63), nullable=False, default="public")  # the report is read from it
+    kind = Column(String(32), nullable=False)  # submissions | summaries
+    format = Column(String(8), nullable=False)  # csv | xlsx
+    filters = Column(JSONB, nullable=False, default=dict)
+    status = Column(String(16), nullable=False, default="pending")  # pending | running | done | failed
+    requested_by = Column(UUID(as_uuid=True), ForeignKey("public.users.id"), index=True)
+    rows = Column(Integer, nullable=False, default=0)
+    storage = Column(String(8))  # prefix of the backend holding the file, e.g. "GS"
+    key = Column(String)
+    content_type = Column(String(128))
+    size = Column(Integer)
+    error = Column(String)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Date, DateTime, Float, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from db.base_class import Base
+
+
+# Daily aggregates of trips and transactions, rebuilt a day at a time by
+# refresh_daily_rollups. Natural composite keys, no APIBase bookkeeping columns:
+# rows are only ever replaced wholesale. Days are UTC, like created_date.
+
+
+class DriverDailyEarnings(Base):
+    __tablename__ = "driver_daily_earnings"
+    __table_args__ = {"schema": "public"}
+    driver_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    transactions = Column(Integer, nullable=False, default=0)
+    gross_amount = Column(Float, nullable=False, default=0)
+    service_fees = Column(Float, nullable=False, default=0)
+    paid_amount = Column(Float, nullable=False, default=0)  # transactions with status 'paid'
+
+
+class VehicleTypeDailyTrips(Base):
+    __tablename__ = "vehicle_type_daily_trips"
+    __table_args__ = {"schema": "public"}
+    vehicle_type = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    trips = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)  # actual fare of completed trips
+
+
+class TripStatusDaily(Base):
+    __tablename__ = "trip_status_daily"
+    __table_args__ = {"schema": "public"}
+    status = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    trips = Column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    """Latest updated_date of each source table already folded into the rollups."""
+    __tablename__ = "rollup_watermarks"
+    __table_args__ = {"schema": "public"}
+    source = Column(String(64), primary_key=True)
+    high_water = Column(DateTime, nullable=False)
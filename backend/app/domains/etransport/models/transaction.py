@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Float
+from sqlalchemy import Column, String, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from db.base_class import APIBase
@@ -6,13 +6,16 @@ from db.base_class import APIBase
 
 class Transaction(APIBase):
     __table_args__ = {"schema": "public"}
-    trip_id = Column(UUID(as_uuid=True), ForeignKey("public.trips.id"))
-    driver_id = Column(UUID(as_uuid=True), ForeignKey("public.drivers.id"))
+    trip_id = Column(UUID(as_uuid=True), index=True)  # trips are partitioned, no foreign key
+    driver_id = Column(UUID(as_uuid=True), ForeignKey("public.drivers.id"), index=True)
     amount = Column(Float)
     service_fee = Column(Float)
     payment_method = Column(String)  # 'cash', 'online'
     status = Column(String)  # 'pending', 'paid'
 
-    trip = relationship("Trip")
+    trip = relationship("Trip", primaryjoin="foreign(Transaction.trip_id) == Trip.id")
     driver = relationship("Driver")
 
+
+# finds the transactions changed since the rollups last ran
+Index("ix_transactions_updated_date", Transaction.updated_date)
@@ -1,13 +1,27 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import (
-    Column, ForeignKey, String, Text, Float, DateTime
+    Column, ForeignKey, Index, String, Text, Float, DateTime
 )
 from sqlalchemy.orm import relationship
 from db.base_class import APIBase
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
+
+def _naive_utc():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Trip(APIBase):
-    __table_args__ = {"schema": "public"}
+    """
+    Partitioned by month on created_date, see db/partitions.py. PostgreSQL needs
+    the partition key in the primary key and cannot enforce foreign keys pointing
+    at id alone, so ratings, transactions and cancellations refer to trips by a
+    plain indexed trip_id.
+    """
+    __table_args__ = {"schema": "public", "postgresql_partition_by": "RANGE (created_date)"}
+    created_date = Column(DateTime, primary_key=True, nullable=False, default=_naive_utc)
     passenger_id = Column(UUID(as_uuid=True), ForeignKey("public.passengers.id"))
     driver_id = Column(UUID(as_uuid=True), ForeignKey("public.drivers.id"))
     vehicle_type = Column(String)
@@ -22,7 +36,25 @@ class Trip(APIBase):
 
     passenger = relationship("Passenger", back_populates="trips")
     driver = relationship("Driver", back_populates="trips")
-    cancellation = relationship("TripCancellation", back_populates="trip", uselist=False)
+    cancellation = relationship(
+        "TripCancellation", back_populates="trip", uselist=False,
+        primaryjoin="Trip.id == foreign(TripCancellation.trip_id)",
+    )
+
+
+# trip history, newest first: the leading columns answer the keyset query and the
+# included ones the listing itself, so a page is an index-only scan of the newest partitions
+HISTORY_COLUMNS = ["status", "pickup_location", "dropoff_location", "estimated_fare", "actual_fare", "is_deleted"]
+Index(
+    "ix_trips_passenger_history", Trip.passenger_id, Trip.created_date.desc(), Trip.id.desc(),
+    postgresql_include=HISTORY_COLUMNS,
+)
+Index(
+    "ix_trips_driver_history", Trip.driver_id, Trip.created_date.desc(), Trip.id.desc(),
+    postgresql_include=HISTORY_COLUMNS,
+)
+# finds the trips changed since the rollups last ran
+Index("ix_trips_updated_date", Trip.updated_date)
 
 
 
@@ -30,11 +62,12 @@ class Trip(APIBase):
 
 
 class TripCancellation(APIBase):
-    trip_id = Column(UUID(as_uuid=True), ForeignKey("public.trips.id"), nullable=False, unique=True)
+    __table_args__ = {"schema": "public"}
+    trip_id = Column(UUID(as_uuid=True), nullable=False, unique=True)
     cancelled_by_id = Column(UUID(as_uuid=True), ForeignKey("public.users.id"), nullable=False)
     reason = Column(String, nullable=True)
     cancelled_at = Column(DateTime, server_default=func.now())
     penalty_fee = Column(Float, nullable=True, default=0.0)  # optional, if any fee is charged
 
-    trip = relationship("Trip", back_populates="cancellation")
+    trip = relationship("Trip", back_populates="cancellation", primaryjoin="foreign(TripCancellation.trip_id) == Trip.id")
     cancelled_by = relationship("User")
\ No newline at end of file
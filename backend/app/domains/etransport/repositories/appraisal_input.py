@@ -3,20 +3,72 @@ from typing import Optional, Sequence, Literal
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import or_, desc
+from sqlalchemy import desc, event, inspect as sa_inspect, select
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from config.logger import log
+from config.settings import settings
 from crud.base import CRUDBase
+from db.tenancy import TenantSessionLocal
 from domains.appraisal.models import Appraisal
 from domains.appraisal.models.appraisal_input import AppraisalInput
 from domains.appraisal.schemas.appraisal_input import (
     AppraisalInputCreate, AppraisalInputUpdate
 )
-from domains.organization.repositories.staff import staff_actions
+from domains.organization.models import Staff
+from utils.cache import TTLCache
 from utils.exceptions import http_500_exc_internal_server_error
 
+# department of each staff member, read on every form listing for that staff
+staff_departments_cache = TTLCache(ttl=settings.STAFF_DEPARTMENTS_TTL_SECONDS)
+
+
+def invalidate_staff_departments(staff_id: UUID) -> None:
+    """Forget a staff member's department, for when it changes."""
+    staff_departments_cache.invalidate(staff_id)
+
+
+# session.info key: ids of staff whose department changed in the transaction, ALL_STAFF
+# when an UPDATE statement may have changed any of them. Staff are tenant rows, the
+# listeners below watch tenant sessions only.
+STAFF_DEPARTMENTS_CHANGED = "staff_departments_changed"
+ALL_STAFF = "all"
+
+
+@event.listens_for(TenantSessionLocal, "after_flush")
+def _track_department_changes(session, flush_context):
+    # still the pre-flush state here, dirty and attribute history included
+    for obj in session.dirty:
+        if isinstance(obj, Staff) and sa_inspect(obj).attrs.department_id.history.has_changes():
+            changed = session.info.setdefault(STAFF_DEPARTMENTS_CHANGED, set())
+            if changed != ALL_STAFF:
+                changed.add(obj.id)
+
+
+@event.listens_for(TenantSessionLocal, "do_orm_execute")
+def _track_staff_updates(orm_execute_state):
+    # CRUDBase.update writes columns with UPDATE ... RETURNING, no instance to inspect
+    if orm_execute_state.is_update and orm_execute_state.bind_mapper is sa_inspect(Staff):
+        orm_execute_state.session.info[STAFF_DEPARTMENTS_CHANGED] = ALL_STAFF
+
+
+@event.listens_for(TenantSessionLocal, "after_commit")
+def _forget_changed_departments(session):
+    # only once committed, before that other sessions still read the old department
+    changed = session.info.pop(STAFF_DEPARTMENTS_CHANGED, None)
+    if changed == ALL_STAFF:
+        staff_departments_cache.clear()
+    elif changed:
+        for staff_id in changed:
+            invalidate_staff_departments(staff_id)
+
+
+@event.listens_for(TenantSessionLocal, "after_rollback")
+def _keep_departments(session):
+    session.info.pop(STAFF_DEPARTMENTS_CHANGED, None)
+
 
 class CRUDAppraisalInput(CRUDBase[AppraisalInput, AppraisalInputCreate, AppraisalInputUpdate]):
     def list_appraisal_input_for_staff(
@@ -37,9 +89,14 @@ class CRUDAppraisalInput(CRUDBase[AppraisalInput, AppraisalInputCreate, Appraisa
         """
         Fetch form inputs (appraisal_inputs) filtered by staff ID, year, cycle, department, and designation.
         Designation takes precedence over department.
+
+        A staff member's department comes from staff_departments_cache, or else from
+        a subselect in the same statement that also returns it for the cache. Either
+        way department_ids @> ARRAY[...] is answered by the GIN index.
         """
         # Start with the base query for form_inputs
         query = self.query.outerjoin(Appraisal)
+        staff_department = None
         try:
             # Filter by appraisal year and cycle
             if appraisal_year: query = query.filter(Appraisal.year == appraisal_year)
@@ -47,12 +104,13 @@ class CRUDAppraisalInput(CRUDBase[AppraisalInput, AppraisalInputCreate, Appraisa
 
             # Staff-specific filters
             if staff_id:
-                staff = staff_actions.get_by_id(db=db, id=staff_id)
-
-                # Create filters for both designation and department
-                query = query.filter(or_(
-                    AppraisalInput.department_ids.contains([staff.department_id])
-                ))
+                department_ids = staff_departments_cache.get(staff_id)
+                if department_ids is None:
+                    staff_department = select(Staff.department_id).where(Staff.id == staff_id).scalar_subquery()
+                    query = query.filter(AppraisalInput.department_ids.contains(array([staff_department])))
+                    query = query.add_columns(staff_department.label("staff_department_id"))
+                else:
+                    query = query.filter(AppraisalInput.department_ids.contains(list(department_ids)))
 
             elif department_id:
                 query = query.filter(AppraisalInput.department_ids.contains([department_id]))
@@ -76,14 +134,20 @@ class CRUDAppraisalInput(CRUDBase[AppraisalInput, AppraisalInputCreate, Appraisa
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail=f'Invalid key given to order_by: {order_by}'
                     )
-                query = self.query.order_by(
+                query = query.order_by(
                     order_column.desc() if order_direction == 'desc' else order_column.asc()
                 )
             else:
-                query = query.order_by(desc(AppraisalInput.created_date)).offset(skip).limit(limit)
+                query = query.order_by(desc(AppraisalInput.created_date))
+            query = query.offset(skip).limit(limit)
+
+            if staff_department is None:
+                return db.execute(query).scalars().all()
 
-            result = db.execute(query)
-            return result.scalars().all()
+            rows = db.execute(query).all()
+            if rows:
+                staff_departments_cache.set(staff_id, (rows[0].staff_department_id,))
+            return [row[0] for row in rows]
 
         except HTTPException:
             raise
@@ -1,20 +1,23 @@
+import json
 from datetime import datetime
-from typing import Any, Optional, Sequence, Literal
+from typing import Any, Iterator, Optional, Sequence, Literal, Tuple
 
 from fastapi import HTTPException, status
 from pydantic import UUID4
-from sqlalchemy import desc
+from sqlalchemy import Row, Select, Text, cast, desc, func, select, text, true, update
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
 from sqlalchemy.orm import Session
-from sqlalchemy.orm import selectinload
-from sqlalchemy.orm.attributes import flag_modified
 
+from config.settings import settings
 from crud.base import CRUDBase
+from db.routing import replica_read
 from domains.appraisal.models import Appraisal, DepartmentGroup, AppraisalInput
 from domains.appraisal.models.appraisal_submission import AppraisalSubmission
 from domains.appraisal.schemas.appraisal_submission import (
     AppraisalSubmissionCreate, AppraisalSubmissionUpdate
 )
 from domains.organization.models import Staff, Department
+from utils.jsonb import as_jsonb, has_answer, merge_answers, set_answer
 
 
 class CRUDAppraisalSubmission(CRUDBase[AppraisalSubmission, AppraisalSubmissionCreate, AppraisalSubmissionUpdate]):
@@ -33,22 +36,11 @@ class CRUDAppraisalSubmission(CRUDBase[AppraisalSubmission, AppraisalSubmissionC
         """
         Fetch submissions filtered by various parameters.
         """
-        query = (
-            self.query
-            .join(AppraisalInput)
-            .join(Appraisal)
-            .join(Staff)
-            .join(DepartmentGroup)
-            .join(Department)
+        query = self.filter_submissions(
+            self.query,
+            appraisal_year=appraisal_year, cycle=cycle, department_id=department_id,
+            staff_id=staff_id, submitted=submitted, completed=completed,
         )
-
-        # Apply dynamic filters
-        if appraisal_year: query = query.filter(Appraisal.year == appraisal_year)
-        if cycle: query = query.filter(Appraisal.cycle == cycle)
-        if department_id: query = query.filter(Department.id == department_id)
-        if staff_id: query = query.filter(AppraisalSubmission.staff_id == staff_id)
-        if submitted is not None: query = query.filter(AppraisalSubmission.submitted == submitted)
-        if completed is not None: query = query.filter(AppraisalSubmission.completed == completed)
         if order_by:
             try:
                 order_column = getattr(self.model, order_by)
@@ -57,16 +49,64 @@ class CRUDAppraisalSubmission(CRUDBase[AppraisalSubmission, AppraisalSubmissionC
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f'Invalid key given to order_by: {order_by}'
                 )
-            query = self.query.order_by(
+            query = query.order_by(
                 order_column.desc() if order_direction == 'desc' else order_column.asc()
             )
         else:
-            query = self.query.order_by(desc(self.model.created_date))
+            query = query.order_by(desc(self.model.created_date))
 
         query = query.offset(skip).limit(limit)
         result = db.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    def filter_submissions(
+            query: Select, *,
+            appraisal_year: Optional[int] = None,
+            cycle: Optional[str] = None,
+            department_id: Optional[UUID4] = None,
+            staff_id: Optional[UUID4] = None,
+            submitted: Optional[bool] = None,
+            completed: Optional[bool] = None,
+    ) -> Select:
+        """The submission report filters, on a select of submissions or of their columns."""
+        query = (
+            query
+            .join(AppraisalInput)
+            .join(Appraisal)
+            .join(Staff)
+            .join(DepartmentGroup)
+            .join(Department)
+        )
+
+        # Apply dynamic filters
+        if appraisal_year: query = query.filter(Appraisal.year == appraisal_year)
+        if cycle: query = query.filter(Appraisal.cycle == cycle)
+        if department_id: query = query.filter(Department.id == department_id)
+        if staff_id: query = query.filter(AppraisalSubmission.staff_id == staff_id)
+        if submitted is not None: query = query.filter(AppraisalSubmission.submitted == submitted)
+        if completed is not None: query = query.filter(AppraisalSubmission.completed == completed)
+        return query
+
+    def submissions_export_query(self, **filters) -> Select:
+        """One row per submission with the report filters applied, answers as the stored JSON."""
+        query = select(
+            AppraisalSubmission.id.label("submission_id"),
+            AppraisalSubmission.staff_id,
+            Staff.department_id,
+            AppraisalSubmission.appraisal_id,
+            Appraisal.year,
+            Appraisal.cycle,
+            AppraisalSubmission.submitted,
+            AppraisalSubmission.completed,
+            AppraisalSubmission.created_date,
+            AppraisalSubmission.updated_date,
+            AppraisalSubmission.data.label("answers"),
+        ).select_from(AppraisalSubmission)
+        # a unique order, the export reads straight through it
+        return self.filter_submissions(query, **filters).order_by(
+            AppraisalSubmission.created_date, AppraisalSubmission.id
+        )
 
     def get_all(
             self, db: Session, *, skip: int = 0, limit: int = 100,
@@ -132,32 +172,56 @@ class CRUDAppraisalSubmission(CRUDBase[AppraisalSubmission, AppraisalSubmissionC
         result = db.execute(query)
         return result.scalars().all()
 
+    def _update_data(self, db: Session, *, id: UUID4, data, where: tuple = ()) -> Optional[AppraisalSubmission]:
+        """
+        Set data to an expression over the stored document, in one UPDATE ...
+        RETURNING guarded by completed, so an answer can never land after the
+        submission was completed. Returns None when no row qualified.
+        """
+        submission = db.scalars(
+            update(AppraisalSubmission)
+            .where(AppraisalSubmission.id == id, AppraisalSubmission.completed.isnot(True), *where)
+            .values(data=cast(data, AppraisalSubmission.data.type), updated_date=func.now())
+            .returning(AppraisalSubmission)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).first()
+        db.commit()
+        return submission
+
     def update_answer_in_submission(
             self, *, db: Session, id: UUID4, group_name: str, field_name: str, new_answer: str
     ) -> AppraisalSubmission:
         """
         Update a specific question's answer in a submission.
-        """
-        submission = self.get_by_id(db=db, id=id)
 
-        if submission.completed:
+        jsonb_set replaces just that answer in the stored document; the group and
+        the question must already exist.
+        """
+        data = as_jsonb(AppraisalSubmission.data)
+        submission = self._update_data(
+            db, id=id,
+            data=set_answer(data, group_name, field_name, new_answer),
+            where=(has_answer(data, group_name, field_name),),
+        )
+        if submission is not None:
+            return submission
+
+        # nothing was written, find out why
+        state = db.execute(
+            select(
+                AppraisalSubmission.completed,
+                data.has_key(group_name),
+                has_answer(data, group_name, field_name),
+            ).where(AppraisalSubmission.id == id)
+        ).first()
+        if state is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Appraisal submission not found")
+        completed, has_group, has_field = state
+        if completed:
             raise ValueError(f"Submission is marked as complete and cannot be updated.")
-
-        # Check if the group exists in the JSON data
-        if group_name not in submission.data:
+        if not has_group:
             raise ValueError(f"Group '{group_name}' not found in the submission data.")
-
-        # Check if the question exists in the group
-        if field_name not in submission.data[group_name]:
-            raise ValueError(f"Question '{field_name}' not found in the group '{group_name}'.")
-
-        # Update the specific question's answer
-        submission.data[group_name][field_name] = new_answer
-
-        flag_modified(submission, "data")
-        db.commit()
-        db.refresh(submission)
-        return submission
+        raise ValueError(f"Question '{field_name}' not found in the group '{group_name}'.")
 
     def modify_or_add_answers(
             self, *, db: Session, id: UUID4, updates: dict
@@ -165,6 +229,10 @@ class CRUDAppraisalSubmission(CRUDBase[AppraisalSubmission, AppraisalSubmissionC
         """
         Modify existing answers and add new ones in the submission data field.
 
+        Each group is merged as coalesce(data, {}) || {group: (data -> group) || answers},
+        so only the groups in updates are rewritten and missing groups are added, see
+        utils.jsonb.merge_answers.
+
         Args:
             db: Database session.
             id: ID of the submission to update.
@@ -174,95 +242,179 @@ class CRUDAppraisalSubmission(CRUDBase[AppraisalSubmission, AppraisalSubmissionC
         Returns:
             Submission: The updated submission.
         """
-        submission = self.get_by_id(db=db, id=id)
-
-        if submission.completed:
+        merged = merge_answers(as_jsonb(AppraisalSubmission.data), updates)
+        if merged is None:
+            return self.get_by_id(db=db, id=id)
+
+        submission = self._update_data(db, id=id, data=merged)
+        if submission is None:
+            # raises 404 when there is no such submission
+            self.get_by_id(db=db, id=id)
             raise ValueError(f"Submission is marked as complete and cannot be updated.")
-
-        # Update or add answers
-        for group_name, questions in updates.items():
-            if group_name not in submission.data:
-                # Add new group if it doesn't exist
-                submission.data[group_name] = {}
-
-            for field_name, new_answer in questions.items():
-                # Update existing question or add new one
-                submission.data[group_name][field_name] = new_answer
-
-        flag_modified(submission, "data")
-        db.commit()
-        db.refresh(submission)
         return submission
 
-    def get_summary_results(
-            self, *, db: Session,
+    def summary_answers_query(
+            self, *,
             year: int = None,
             staff_id: UUID4 = None,
             department_group_id: UUID4 = None,
             cycle: str = None
-    ) -> dict[str, Any]:
+    ) -> Select:
         """
-        Fetch summary results grouped by group_name, filtered by year, staff_id, and department_group_id
+        One row per form field of every matching submission, with its answer.
+        Postgres unnests each submission's form template with jsonb_array_elements
+        and looks every answer up in the submission's data.
         """
-        query = (
-            self.query
+        data = cast(AppraisalSubmission.data, JSONB)
+        form_group = (
+            func.jsonb_array_elements(cast(AppraisalInput.form_fields, JSONB))
+            .table_valued("value", with_ordinality="position")
+            .render_derived(name="form_group")
+        )
+        form_field = (
+            func.jsonb_array_elements(form_group.c.value.op("->")("fields"))
+            .table_valued("value", with_ordinality="position")
+            .render_derived(name="form_field")
+        )
+        group_name = form_group.c.value.op("->>")("group_name")
+        field_name = form_field.c.value.op("->>")("field_name")
+        field_text = form_field.c.value.op("->>")("field_text")
+        answer = data.op("->")(group_name).op("->")(field_name)
+
+        answers = (
+            select(
+                AppraisalSubmission.staff_id.label("staff_id"),
+                AppraisalSubmission.appraisal_id.label("appraisal_id"),
+                AppraisalSubmission.created_date.label("submitted_at"),
+                AppraisalSubmission.id.label("submission_id"),
+                group_name.label("group_name"),
+                form_group.c.position.label("group_position"),
+                form_field.c.position.label("field_position"),
+                field_name.label("field_name"),
+                field_text.label("field_text"),
+                answer.label("answer"),
+                func.jsonb_build_object(
+                    "field_name", field_name, "field_text", field_text, "answer", answer
+                ).label("field"),
+            )
+            .select_from(AppraisalSubmission)
             .join(Appraisal, AppraisalSubmission.appraisal_id == Appraisal.id)
             .join(Staff, AppraisalSubmission.staff_id == Staff.id)
             .join(AppraisalInput, AppraisalSubmission.appraisal_input_id == AppraisalInput.id)
             .join(DepartmentGroup, AppraisalInput.department_group_id == DepartmentGroup.id)
-            .options(
-                selectinload(AppraisalSubmission.staff_id),
-                selectinload(AppraisalSubmission.appraisal_input_id),
-                selectinload(AppraisalInput.department_group_id),
-            )
+            # set-returning functions in FROM see the tables before them, LATERAL is implied;
+            # outer joins keep staff whose template has no groups, and groups without fields
+            .outerjoin(form_group, true())
+            .outerjoin(form_field, true())
         )
-
-        # Apply filters dynamically
         if year:
-            query = query.filter(Appraisal.year == year)
+            answers = answers.where(Appraisal.year == year)
         if staff_id:
-            query = query.filter(AppraisalSubmission.staff_id == staff_id)
+            answers = answers.where(AppraisalSubmission.staff_id == staff_id)
         if department_group_id:
-            query = query.filter(AppraisalInput.department_group_id == department_group_id)
+            answers = answers.where(AppraisalInput.department_group_id == department_group_id)
         if cycle:
-            query = query.filter(Appraisal.cycle == cycle)
+            answers = answers.where(Appraisal.cycle == cycle)
+        return answers
+
+    def summary_answers_export_query(self, **filters) -> Select:
+        """The rows of the summary, one per answer, in the order the summary lists them."""
+        answers = self.summary_answers_query(**filters).subquery("answers")
+        return (
+            select(
+                answers.c.staff_id, answers.c.appraisal_id, answers.c.submission_id, answers.c.submitted_at,
+                answers.c.group_name, answers.c.field_name, answers.c.field_text, answers.c.answer,
+            )
+            .where(answers.c.field_name.isnot(None))
+            .order_by(
+                answers.c.staff_id, answers.c.submitted_at, answers.c.submission_id,
+                answers.c.group_position, answers.c.field_position,
+            )
+        )
 
-        result = db.execute(query)
-        submissions = result.scalars().all()
-
-        # Results organized by staff
-        summary_results = {}
-
-        for submission in submissions:
-            appraisal = submission.appraisal
-            appraisal_id = str(appraisal.id)
-            staff_id = str(submission.staff_id)
-            form_template = submission.appraisal_input.form_fields
-
-            if staff_id not in summary_results:
-                summary_results[staff_id] = {
-                    "appraisal_id": appraisal_id,
-                    "staff_id": staff_id,
-                    "groups": {}
-                }
-
-            for group in form_template:
-                group_name = group["group_name"]
-
-                if group_name not in summary_results[staff_id]["groups"]:
-                    summary_results[staff_id]["groups"][group_name] = []
-
-                for field in group["fields"]:
-                    field_name = field["field_name"]
-                    field_text = field["field_text"]
-                    answer = submission.data.get(group_name, {}).get(field_name, None)
-
-                    summary_results[staff_id]["groups"][group_name].append({
-                        "field_name": field_name,
-                        "field_text": field_text,
-                        "answer": answer
-                    })
-        return summary_results
+    def summary_query(self, **filters) -> Select:
+        """
+        One row per staff: (staff_id, summary), summary being the JSON text of
+        {"appraisal_id", "staff_id", "groups": {group_name: [{field_name, field_text, answer}]}}.
+
+        Postgres folds the answers' fields into groups and the groups into one
+        object per staff. Groups keep the template order, fields of several
+        submissions follow each other oldest first, and the appraisal is the one
+        of the staff's oldest submission.
+        """
+        answers = self.summary_answers_query(**filters).subquery("answers")
+
+        submission_order = (answers.c.submitted_at, answers.c.submission_id)
+        groups = (
+            select(
+                answers.c.staff_id,
+                answers.c.group_name,
+                func.min(answers.c.group_position).label("group_position"),
+                func.min(answers.c.submitted_at).label("first_submitted_at"),
+                func.array_agg(aggregate_order_by(answers.c.appraisal_id, *submission_order))[1]
+                .label("appraisal_id"),
+                func.coalesce(
+                    func.jsonb_agg(aggregate_order_by(answers.c.field, *submission_order, answers.c.field_position))
+                    .filter(answers.c.field.op("->>")("field_name").isnot(None)),
+                    text("'[]'::jsonb"),
+                ).label("fields"),
+            )
+            .group_by(answers.c.staff_id, answers.c.group_name)
+            .subquery("groups")
+        )
+
+        summary = func.json_build_object(
+            "appraisal_id", func.array_agg(aggregate_order_by(groups.c.appraisal_id, groups.c.first_submitted_at))[1],
+            "staff_id", groups.c.staff_id,
+            "groups", func.coalesce(
+                func.json_object_agg(groups.c.group_name, aggregate_order_by(groups.c.fields, groups.c.group_position))
+                .filter(groups.c.group_name.isnot(None)),
+                text("'{}'::json"),
+            ),
+        )
+        return (
+            select(groups.c.staff_id, cast(summary, Text).label("summary"))
+            .group_by(groups.c.staff_id)
+            .order_by(groups.c.staff_id)
+        )
+
+    def stream_summary_results(self, *, db: Session, **filters) -> Iterator[Tuple[UUID4, str]]:
+        """
+        Yield (staff_id, summary JSON text) through a server-side cursor, a batch
+        of SUMMARY_BATCH_SIZE staff at a time, so memory does not grow with the
+        department. The JSON is built by Postgres and passed on as is.
+        """
+        result = db.execute(
+            self.summary_query(**filters),
+            execution_options={"stream_results": True, "yield_per": settings.SUMMARY_BATCH_SIZE},
+        )
+        for staff_id, summary in result:
+            yield staff_id, summary
+
+    def stream_export_rows(self, *, db: Session, query: Select) -> Iterator[Row]:
+        """Rows of an export query through a server-side cursor, EXPORT_BATCH_SIZE at a time."""
+        result = db.execute(
+            query, execution_options={"stream_results": True, "yield_per": settings.EXPORT_BATCH_SIZE}
+        )
+        yield from result
+
+    @replica_read
+    def get_summary_results(
+            self, *, db: Session,
+            year: int = None,
+            staff_id: UUID4 = None,
+            department_group_id: UUID4 = None,
+            cycle: str = None
+    ) -> dict[str, Any]:
+        """
+        Fetch summary results grouped by group_name, filtered by year, staff_id, and department_group_id
+        """
+        return {
+            str(staff): json.loads(summary)
+            for staff, summary in self.stream_summary_results(
+                db=db, year=year, staff_id=staff_id, department_group_id=department_group_id, cycle=cycle
+            )
+        }
 
 
 appraisal_submission_actions = CRUDAppraisalSubmission(
@@ -2,9 +2,11 @@ from typing import Dict, Any, Union, Optional
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import UUID4
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from crud.base import CRUDBase, ModelType
-from domains.etransport.models.passenger import Passenger
+from domains.auth.models.users import User
+from domains.etransport.models.passenger import Passenger, normalize_phone, phone_digits
 from domains.etransport.schemas.passenger import (
     PassengerCreate, PassengerUpdate
 )
@@ -15,7 +17,7 @@ class CRUDPassenger(CRUDBase[Passenger, PassengerCreate, PassengerUpdate]):
 
     def is_email_taken(self, db: Session, email: str, exclude_id: UUID4) -> bool:
         if not email: return True
-        query = db.query(Passenger).filter(Passenger.email == email)
+        query = db.query(Passenger).join(Passenger.user).filter(func.lower(User.email) == email.strip().lower())
         if exclude_id: query = query.filter(Passenger.id != exclude_id)
         return query.count() > 0
 
@@ -26,7 +28,7 @@ class CRUDPassenger(CRUDBase[Passenger, PassengerCreate, PassengerUpdate]):
 
     ## function to get admin or user base on contact
     def get_user_phone(self, db: Session, phone: str):
-        return db.query(self.model).filter(self.model.phone == phone.strip()).first()
+        return db.query(self.model).filter(phone_digits(self.model.phone) == normalize_phone(phone)).first()
 
 
     def get_by_reset_password_token(self, db: Session, token: Any) -> Optional[ModelType]:
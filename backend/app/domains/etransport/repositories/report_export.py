@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pydantic import UUID4
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from crud.base import CRUDBase
+from domains.etransport.models.report_export import ReportExport
+from domains.etransport.schemas.report_export import ReportExportCreate
+
+
+class CRUDReportExport(CRUDBase[ReportExport, ReportExportCreate, dict]):
+
+    def claim(self, db: Session, *, id: UUID4) -> Optional[ReportExport]:
+        """
+        Move a pending export to running in one UPDATE ... RETURNING, so of the
+        worker it was submitted to and a sweep on another process only one runs
+        it. Returns None when the export is no longer pending.
+        """
+        export = db.scalars(
+            update(ReportExport)
+            .where(ReportExport.id == id, ReportExport.status == "pending")
+            .values(status="running", started_at=datetime.utcnow(), updated_date=datetime.utcnow())
+            .returning(ReportExport)
+            .execution_options(synchronize_session=False)
+        ).first()
+        db.commit()
+        return export
+
+    def progress(self, db: Session, *, id: UUID4, rows: int) -> None:
+        """Record the rows written so far, which also tells the sweep the export is alive."""
+        db.execute(
+            update(ReportExport)
+            .where(ReportExport.id == id, ReportExport.status == "running")
+            .values(rows=rows, updated_date=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def finish(self, db: Session, *, id: UUID4, status: str, **values) -> None:
+        db.execute(
+            update(ReportExport)
+            .where(ReportExport.id == id, ReportExport.status == "running")
+            .values(status=status, finished_at=datetime.utcnow(), updated_date=datetime.utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def pending_ids(self, db: Session, *, limit: int) -> List[UUID4]:
+        """Oldest pending exports first, those whose worker went away before claiming them included."""
+        return db.scalars(
+            select(ReportExport.id)
+            .where(ReportExport.status == "pending")
+            .order_by(ReportExport.updated_date)
+            .limit(limit)
+        ).all()
+
+    def fail_stalled(self, db: Session) -> int:
+        """Fail running exports that made no progress for EXPORT_STALE_SECONDS, their worker is gone."""
+        stalled_before = datetime.utcnow() - timedelta(seconds=settings.EXPORT_STALE_SECONDS)
+        count = db.execute(
+            update(ReportExport)
+            .where(ReportExport.status == "running", ReportExport.updated_date < stalled_before)
+            .values(status="failed", error="Export interrupted", finished_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return count
+
+
+report_export_actions = CRUDReportExport(ReportExport)
@@ -0,0 +1,128 @@
+from datetime import date, datetime, time, timedelta
+from typing import Callable, List
+
+from sqlalchemy import Date, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from config.settings import settings
+from db.routing import replica_read
+from db.session import engine
+from domains.etransport.models.rollup import (
+    DriverDailyEarnings, RollupWatermark, TripStatusDaily, VehicleTypeDailyTrips
+)
+from domains.etransport.models.transaction import Transaction
+from domains.etransport.models.trip import Trip
+from services.background import register_job
+
+# any constant shared by all workers, only one of them refreshes at a time
+ROLLUP_LOCK_ID = 46_001
+
+
+def _day_range(model, day: date):
+    start = datetime.combine(day, time())
+    # a range on the raw column, so partitions are pruned and indexes used
+    return model.created_date >= start, model.created_date < start + timedelta(days=1)
+
+
+def _rebuild_trip_day(conn: Connection, day: date) -> None:
+    completed, cancelled = Trip.status == "completed", Trip.status == "cancelled"
+    trips = (*_day_range(Trip, day), Trip.is_deleted.isnot(True))
+
+    conn.execute(delete(VehicleTypeDailyTrips).where(VehicleTypeDailyTrips.day == day))
+    vehicle_type = func.coalesce(Trip.vehicle_type, "unknown")
+    conn.execute(insert(VehicleTypeDailyTrips).from_select(
+        ["vehicle_type", "day", "trips", "completed", "cancelled", "revenue"],
+        select(
+            vehicle_type, literal(day, Date), func.count(),
+            func.count().filter(completed), func.count().filter(cancelled),
+            func.coalesce(func.sum(Trip.actual_fare).filter(completed), 0),
+        ).where(*trips).group_by(vehicle_type),
+    ))
+
+    conn.execute(delete(TripStatusDaily).where(TripStatusDaily.day == day))
+    status = func.coalesce(Trip.status, "unknown")
+    conn.execute(insert(TripStatusDaily).from_select(
+        ["status", "day", "trips"],
+        select(status, literal(day, Date), func.count()).where(*trips).group_by(status),
+    ))
+
+
+def _rebuild_earnings_day(conn: Connection, day: date) -> None:
+    conn.execute(delete(DriverDailyEarnings).where(DriverDailyEarnings.day == day))
+    conn.execute(insert(DriverDailyEarnings).from_select(
+        ["driver_id", "day", "transactions", "gross_amount", "service_fees", "paid_amount"],
+        select(
+            Transaction.driver_id, literal(day, Date), func.count(),
+            func.coalesce(func.sum(Transaction.amount), 0),
+            func.coalesce(func.sum(Transaction.service_fee), 0),
+            func.coalesce(func.sum(Transaction.amount).filter(Transaction.status == "paid"), 0),
+        )
+        .where(*_day_range(Transaction, day), Transaction.driver_id.isnot(None), Transaction.is_deleted.isnot(True))
+        .group_by(Transaction.driver_id),
+    ))
+
+
+def _refresh_source(conn: Connection, model, rebuild_day: Callable[[Connection, date], None]) -> int:
+    """
+    Rebuild the days that have rows changed since the source's watermark, then
+    move the watermark. Recomputing a whole day rather than applying deltas keeps
+    a row that changed status from being counted in both buckets. The overlap
+    re-reads a margin before the watermark, catching rows whose transaction
+    committed after a later updated_date was seen; rebuilding a day twice is harmless.
+    """
+    source = model.__tablename__
+    high_water = conn.execute(select(RollupWatermark.high_water).where(RollupWatermark.source == source)).scalar()
+    changed = select(func.date(model.created_date).label("day"), func.max(model.updated_date).label("latest"))
+    if high_water is not None:
+        changed = changed.where(
+            model.updated_date > high_water - timedelta(seconds=settings.ROLLUP_WATERMARK_OVERLAP_SECONDS)
+        )
+    days = conn.execute(changed.where(model.created_date.isnot(None)).group_by("day")).all()
+    if not days:
+        return 0
+
+    for day, _ in days:
+        rebuild_day(conn, day)
+    latest = max((latest for _, latest in days if latest is not None), default=None)
+    if latest is not None and (high_water is None or latest > high_water):
+        conn.execute(
+            pg_insert(RollupWatermark).values(source=source, high_water=latest)
+            .on_conflict_do_update(index_elements=[RollupWatermark.source], set_={"high_water": latest})
+        )
+    return len(days)
+
+
+def refresh_daily_rollups() -> None:
+    """Fold trips and transactions changed since the last run into the daily rollups, in one transaction."""
+    with engine.begin() as conn:
+        if not conn.execute(select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_ID))).scalar():
+            return
+        trip_days = _refresh_source(conn, Trip, _rebuild_trip_day)
+        earnings_days = _refresh_source(conn, Transaction, _rebuild_earnings_day)
+    if trip_days or earnings_days:
+        log.debug(f"Rebuilt rollups for {trip_days} trip days and {earnings_days} earnings days")
+
+
+register_job(refresh_daily_rollups, settings.ROLLUP_REFRESH_SECONDS)
+
+
+class RollupRepository:
+    """Read side of one rollup table, a row per key and day."""
+
+    def __init__(self, model):
+        self.model = model
+
+    @replica_read
+    def between(self, db: Session, *, start: date, end: date, **keys) -> List:
+        query = select(self.model).where(self.model.day >= start, self.model.day <= end)
+        for name, value in keys.items():
+            query = query.where(getattr(self.model, name) == value)
+        return db.scalars(query.order_by(self.model.day)).all()
+
+
+driver_earnings_rollup = RollupRepository(DriverDailyEarnings)
+vehicle_type_rollup = RollupRepository(VehicleTypeDailyTrips)
+trip_status_rollup = RollupRepository(TripStatusDaily)
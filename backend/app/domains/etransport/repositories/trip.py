@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pydantic import UUID4
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from config.settings import settings
+from crud.base import CRUDBase
+from db.partitions import add_months, detach_partitions_before, ensure_monthly_partitions, month_start
+from db.routing import replica_read
+from db.session import engine
+from domains.etransport.models.trip import Trip
+from domains.etransport.schemas.trip import TripCreate, TripUpdate
+from services.background import register_job
+
+HISTORY_FIELDS = (
+    Trip.id, Trip.created_date, Trip.status, Trip.pickup_location, Trip.dropoff_location,
+    Trip.estimated_fare, Trip.actual_fare,
+)
+
+
+class CRUDTrip(CRUDBase[Trip, TripCreate, TripUpdate]):
+
+    @replica_read
+    def history(
+            self, db: Session, *, passenger_id: UUID4 = None, driver_id: UUID4 = None,
+            before: Optional[Tuple[datetime, UUID4]] = None, limit: int = 20
+    ) -> List:
+        """
+        One page of a passenger's or a driver's trips, newest first, keyed on
+        (created_date, id). The upper bound on created_date prunes the newer
+        partitions at plan time; the ordered scan stops in the first partitions
+        that fill the page, so older months are never read.
+        """
+        owner = Trip.passenger_id == passenger_id if passenger_id is not None else Trip.driver_id == driver_id
+        query = select(*HISTORY_FIELDS).where(owner, Trip.is_deleted.isnot(True))
+        if before is not None:
+            query = query.where(Trip.created_date <= before[0], tuple_(Trip.created_date, Trip.id) < tuple_(*before))
+        query = query.order_by(Trip.created_date.desc(), Trip.id.desc()).limit(limit)
+        return db.execute(query).all()
+
+
+trip_actions = CRUDTrip(Trip)
+
+
+def maintain_trip_partitions() -> None:
+    """Create the coming monthly partitions and detach the expired ones."""
+    with engine.begin() as conn:
+        created = ensure_monthly_partitions(
+            conn, Trip.__tablename__, months_ahead=settings.TRIP_PARTITION_MONTHS_AHEAD
+        )
+    if created:
+        log.info(f"Created trip partitions {', '.join(created)}")
+
+    if settings.TRIP_PARTITION_RETENTION_MONTHS > 0:
+        cutoff = add_months(month_start(datetime.utcnow()), -settings.TRIP_PARTITION_RETENTION_MONTHS)
+        detached = detach_partitions_before(Trip.__tablename__, cutoff)
+        if detached:
+            log.info(f"Detached trip partitions {', '.join(detached)}")
+
+
+register_job(maintain_trip_partitions, settings.TRIP_PARTITION_CHECK_SECONDS)
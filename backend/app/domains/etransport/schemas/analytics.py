@@ -0,0 +1,48 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel, UUID4, computed_field
+
+
+class RollupBase(BaseModel):
+    day: date
+
+    class Config:
+        from_attributes = True
+
+
+class DriverEarningsTotals(BaseModel):
+    transactions: int = 0
+    gross_amount: float = 0
+    service_fees: float = 0
+    paid_amount: float = 0
+
+    @computed_field
+    @property
+    def net_amount(self) -> float:
+        return self.gross_amount - self.service_fees
+
+
+class DriverEarningsDay(RollupBase, DriverEarningsTotals):
+    pass
+
+
+class DriverEarningsReport(BaseModel):
+    driver_id: UUID4
+    start: date
+    end: date
+    days: List[DriverEarningsDay]
+    totals: DriverEarningsTotals
+
+
+class VehicleTypeDay(RollupBase):
+    vehicle_type: str
+    trips: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    revenue: float = 0
+
+
+class TripStatusDay(RollupBase):
+    status: str
+    trips: int = 0
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, UUID4
+
+from db.schemas import BaseSchema
+
+
+class ReportExportFilters(BaseModel):
+    """The filters of the matching report; each kind reads the ones it knows."""
+    year: Optional[int] = None
+    cycle: Optional[str] = None
+    department_id: Optional[UUID4] = None  # submissions
+    department_group_id: Optional[UUID4] = None  # summaries
+    staff_id: Optional[UUID4] = None
+    submitted: Optional[bool] = None  # submissions
+    completed: Optional[bool] = None  # submissions
+
+
+class ReportExportCreate(ReportExportFilters):
+    # submissions: one row per submission, as /summaries/reports;
+    # summaries: one row per answer, as /summaries/summary_results
+    kind: Literal['submissions', 'summaries']
+    format: Literal['csv', 'xlsx'] = 'xlsx'
+
+
+class ReportExportSchema(BaseSchema):
+    kind: str
+    format: str
+    filters: dict
+    status: str
+    requested_by: Optional[UUID4] = None
+    rows: int = 0
+    size: Optional[int] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None  # set once the export is done
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, UUID4
+
+
+class TripBase(BaseModel):
+    pickup_location: str
+    dropoff_location: str
+    vehicle_type: Optional[str] = None
+    estimated_fare: Optional[float] = None
+    payment_method: Literal['cash', 'online'] = 'cash'
+
+
+class TripCreate(TripBase):
+    pass
+
+
+class TripUpdate(BaseModel):
+    actual_fare: Optional[float] = None
+
+
+class TripHistoryItem(BaseModel):
+    id: UUID4
+    created_date: datetime
+    status: Optional[str] = None
+    pickup_location: Optional[str] = None
+    dropoff_location: Optional[str] = None
+    estimated_fare: Optional[float] = None
+    actual_fare: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TripHistoryPage(BaseModel):
+    items: List[TripHistoryItem]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next, older page
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import UUID4
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from domains.auth.models.users import User
+from domains.etransport.models.driver import Driver
+from domains.etransport.repositories.rollup import (
+    driver_earnings_rollup, trip_status_rollup, vehicle_type_rollup
+)
+from domains.etransport.schemas.analytics import (
+    DriverEarningsDay, DriverEarningsReport, DriverEarningsTotals, TripStatusDay, VehicleTypeDay
+)
+
+
+def date_range(start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+    """Default to the last 30 days, reject ranges the rollups were not meant to serve."""
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start is after end")
+    if (end - start).days >= settings.ROLLUP_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {settings.ROLLUP_MAX_RANGE_DAYS} days"
+        )
+    return start, end
+
+
+class AnalyticsService:
+    """Dashboards read the daily rollups only, never trips or transactions."""
+
+    def driver_earnings(
+            self, db: Session, *, driver_id: UUID4, start: date = None, end: date = None
+    ) -> DriverEarningsReport:
+        start, end = date_range(start, end)
+        days = [
+            DriverEarningsDay.model_validate(row)
+            for row in driver_earnings_rollup.between(db, start=start, end=end, driver_id=driver_id)
+        ]
+        totals = DriverEarningsTotals(
+            transactions=sum(day.transactions for day in days),
+            gross_amount=sum(day.gross_amount for day in days),
+            service_fees=sum(day.service_fees for day in days),
+            paid_amount=sum(day.paid_amount for day in days),
+        )
+        return DriverEarningsReport(driver_id=driver_id, start=start, end=end, days=days, totals=totals)
+
+    def my_earnings(self, db: Session, *, user: User, start: date = None, end: date = None) -> DriverEarningsReport:
+        driver_id = db.scalar(select(Driver.id).where(Driver.user_id == user.id))
+        if driver_id is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No driver profile for this account")
+        return self.driver_earnings(db, driver_id=driver_id, start=start, end=end)
+
+    def vehicle_type_trips(self, db: Session, *, start: date = None, end: date = None) -> List[VehicleTypeDay]:
+        start, end = date_range(start, end)
+        return [VehicleTypeDay.model_validate(row) for row in vehicle_type_rollup.between(db, start=start, end=end)]
+
+    def trip_statuses(self, db: Session, *, start: date = None, end: date = None) -> List[TripStatusDay]:
+        start, end = date_range(start, end)
+        return [TripStatusDay.model_validate(row) for row in trip_status_rollup.between(db, start=start, end=end)]
+
+
+analytics_service = AnalyticsService()
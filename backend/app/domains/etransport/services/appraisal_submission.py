@@ -1,11 +1,13 @@
 from datetime import datetime
-from typing import List, Any, Optional, Literal
+from typing import List, Any, Iterator, Optional, Literal
 
 from fastapi import HTTPException, status
 from pydantic import ValidationError, UUID4
 from sqlalchemy.orm import Session
 
 from config.logger import log
+from db.routing import replica_reads
+from db.tenancy import tenant_session
 from domains.appraisal.repositories.appraisal_submission import (
     appraisal_submission_actions as appraisal_submission_repo
 )
@@ -169,6 +171,9 @@ class AppraisalSubmissionService:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail='Incorrect data format received.'
             )
+        except (ValueError, HTTPException):
+            # completed submission or missing one, answered as 400/404 by the router
+            raise
         except:
             log.exception('Failed to modify or add appraisal submission answers')
             raise HTTPException(
@@ -186,5 +191,33 @@ class AppraisalSubmissionService:
             db=db, year=year, staff_id=staff_id, department_group_id=department_group_id, cycle=cycle
         )
 
+    def stream_summary_results(
+            self, *,
+            schema: str,
+            year: int = None,
+            staff_id: UUID4 = None,
+            department_group_id: UUID4 = None,
+            cycle: str = None
+    ) -> Iterator[str]:
+        """
+        The same object as get_summary_results, keyed by staff id, written out one
+        staff at a time. Runs on its own session in the tenant's schema: the
+        request's session is closed before a streaming response is sent.
+        """
+        with tenant_session(schema) as db, replica_reads(db):
+            try:
+                yield "{"
+                separator = ""
+                for staff, summary in self.repo.stream_summary_results(
+                        db=db, year=year, staff_id=staff_id, department_group_id=department_group_id, cycle=cycle
+                ):
+                    yield f'{separator}"{staff}":{summary}'
+                    separator = ","
+                yield "}"
+            except Exception:
+                # the status line is already sent, the client sees a truncated body
+                log.exception('Failed to stream appraisal summary results')
+                raise
+
 
 appraisal_submission_service = AppraisalSubmissionService()
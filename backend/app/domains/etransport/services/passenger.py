@@ -1,9 +1,11 @@
 from typing import List, Optional, Literal
 from fastapi import HTTPException, status
 from pydantic import UUID4
+from sqlalchemy import func, literal, select
 from sqlalchemy.orm import Session
 from config.settings import settings
 from domains.etransport.models import Passenger
+from domains.etransport.models.passenger import normalize_phone, phone_digits
 from domains.etransport.repositories.passenger import passenger_actions as passenger_repo
 from domains.etransport.schemas.passenger import PassengerSchema, PassengerCreate, PassengerUpdate, UserSchema
 from domains.auth.services.password_reset import password_reset_service
@@ -51,38 +53,38 @@ class PassengerService:
         """Creates a new Passenger under an organization and returns the Passenger with role details."""
         
 
-        check_passenger_email = user_actions.get_by_email(db, Passenger_in.email)
-        check_passenger_phone = passenger_repo.get_user_phone(db, Passenger_in.phone)
-
-        if check_passenger_email:
+        # email, phone and role lookups in one round trip
+        email_taken, phone_taken, passenger_role_id = db.execute(
+            select(
+                select(User.id).where(func.lower(User.email) == Passenger_in.email.strip().lower()).exists(),
+                select(Passenger.id).where(phone_digits(Passenger.phone) == normalize_phone(Passenger_in.phone)).exists()
+                if Passenger_in.phone else literal(False),
+                select(Role.id).where(Role.name == 'Passenger').scalar_subquery(),
+            )
+        ).one()
+
+        if email_taken:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail='Email already exist!')
     
-        if check_passenger_phone:
+        if phone_taken:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                 detail='Phone Number already exist!')
 
-        get_passenger_role = db.query(Role).filter(Role.name == 'Passenger').first()
-
         ##create user account for passenger
         new_user = User()
         new_user.email = Passenger_in.email
-        new_user.role_id = get_passenger_role.id
+        new_user.role_id = passenger_role_id
         new_user.password = pwd_context.hash(Passenger_in.password)
         new_user.reset_password_token = None
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-
 
-        ##create passenger account
+        ##create passenger account, flushed together with the user in a single commit
         new_Passenger = Passenger()
-        new_Passenger.user_id = new_user.id
+        new_Passenger.user = new_user
         new_Passenger.full_name = Passenger_in.full_name
         new_Passenger.phone = Passenger_in.phone
         db.add(new_Passenger)
         db.commit()
-        db.refresh(new_Passenger)
 
         # email_data = send_reset_email(Passenger_in.Passengername, Passenger_in.email, reset_link)
         # Email.sendMailService(email_data, template_name='password_reset.html')
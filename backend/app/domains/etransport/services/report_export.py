@@ -0,0 +1,264 @@
+import csv
+import importlib
+import io
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import UUID4
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+from config.logger import log
+from config.settings import settings
+from db.routing import replica_reads
+from db.session import SessionLocal
+from db.tenancy import tenant_session
+from domains.auth.models.users import User
+from domains.etransport.models.report_export import ReportExport
+from domains.etransport.repositories.report_export import report_export_actions
+from domains.etransport.schemas.report_export import (
+    ReportExportCreate, ReportExportFilters, ReportExportSchema
+)
+from services.background import register_job
+from services.storage import get_backend_by_prefix, get_storage_backend, upload_file
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# filters each kind of report reads, mapped to the argument names of its query
+REPORT_FILTERS = {
+    "submissions": {
+        "year": "appraisal_year", "cycle": "cycle", "department_id": "department_id",
+        "staff_id": "staff_id", "submitted": "submitted", "completed": "completed",
+    },
+    "summaries": {
+        "year": "year", "cycle": "cycle", "department_group_id": "department_group_id", "staff_id": "staff_id",
+    },
+}
+
+XLSX_MAX_ROWS = 1_048_576  # rows per worksheet, the header included
+XLSX_MAX_CELL_LENGTH = 32_767
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# bounded pool, a burst of export requests queues up instead of starving the API of connections
+_executor = ThreadPoolExecutor(max_workers=settings.EXPORT_WORKERS, thread_name_prefix="report-export")
+_queued = set()  # exports submitted to this process's pool and not finished yet
+
+
+@lru_cache(maxsize=1)
+def appraisal_submission_repo():
+    """
+    The repository the reports are read through, None when the appraisal models
+    it needs are not installed. Imported on first use, so the export endpoints
+    and the sweep load without it.
+    """
+    try:
+        module = importlib.import_module("domains.etransport.repositories.appraisal_submission")
+    except ImportError:
+        log.warning("Appraisal models not available, report exports are disabled", exc_info=True)
+        return None
+    return module.appraisal_submission_actions
+
+
+def report_query(kind: str, filters: dict) -> Select:
+    repo = appraisal_submission_repo()
+    if repo is None:
+        raise RuntimeError("Appraisal reports are not available")
+    params = ReportExportFilters.model_validate(filters)
+    arguments = {argument: getattr(params, field) for field, argument in REPORT_FILTERS[kind].items()}
+    if kind == "submissions":
+        return repo.submissions_export_query(**arguments)
+    return repo.summary_answers_export_query(**arguments)
+
+
+def _cell(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def write_csv(fileobj: BinaryIO, header: List[str], rows: Iterable[Tuple]) -> None:
+    # utf-8 with a BOM, which Excel needs to open the file as utf-8
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([_cell(value) for value in row])
+    text.flush()
+    text.detach()
+
+
+def write_xlsx(fileobj: BinaryIO, header: List[str], rows: Iterable[Tuple]) -> None:
+    """
+    A write-only workbook streams every appended row to a temporary file, memory
+    stays flat however many rows there are. Rows beyond a worksheet's limit go
+    on to a new sheet.
+    """
+    # imported lazily so CSV exports work without openpyxl installed
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    def xlsx_cell(value):
+        value = _cell(value)
+        if isinstance(value, str):
+            return ILLEGAL_CHARACTERS_RE.sub("", value)[:XLSX_MAX_CELL_LENGTH]
+        return value
+
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows = None, XLSX_MAX_ROWS
+    for row in rows:
+        if sheet_rows >= XLSX_MAX_ROWS:
+            sheet = workbook.create_sheet(f"Report {len(workbook.worksheets) + 1}")
+            sheet.append(header)
+            sheet_rows = 1
+        sheet.append([xlsx_cell(value) for value in row])
+        sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet("Report 1").append(header)
+    workbook.save(fileobj)
+
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+def _with_progress(rows: Iterable[Tuple], db: Session, export_id: UUID4, counter: list) -> Iterator[Tuple]:
+    """Pass the rows on, recording the count every EXPORT_BATCH_SIZE rows."""
+    for row in rows:
+        yield row
+        counter[0] += 1
+        if counter[0] % settings.EXPORT_BATCH_SIZE == 0:
+            report_export_actions.progress(db, id=export_id, rows=counter[0])
+
+
+def run_export(export_id: UUID4) -> None:
+    """
+    Write one export to storage. Runs on the export pool and never raises,
+    failures are recorded on the export. Rows come through a server-side cursor
+    and go straight to a temporary file, neither side holds the data set.
+    """
+    with SessionLocal() as jobs_db:
+        export = report_export_actions.claim(jobs_db, id=export_id)
+        if export is None:
+            return
+
+        counter = [0]
+        try:
+            query = report_query(export.kind, export.filters)
+            header = [column.name for column in query.selected_columns]
+            backend = get_storage_backend()
+            with tempfile.TemporaryFile() as fileobj:
+                with tenant_session(export.tenant_schema) as db, replica_reads(db):
+                    rows = appraisal_submission_repo().stream_export_rows(db=db, query=query)
+                    WRITERS[export.format](fileobj, header, _with_progress(rows, jobs_db, export.id, counter))
+
+                filename = f"{export.kind}-{date.today().isoformat()}.{export.format}"
+                result = upload_file(
+                    {"filename": filename, "file": fileobj, "content_type": CONTENT_TYPES[export.format]},
+                    folder=f"{settings.EXPORT_FOLDER}/{export.id}", backend=backend,
+                )
+            if not result.ok:
+                raise RuntimeError(result.error)
+
+            report_export_actions.finish(
+                jobs_db, id=export.id, status="done", rows=counter[0], storage=backend.prefix,
+                key=result.key, content_type=result.content_type, size=result.size,
+            )
+            log.info(f"Report export {export.id} done, {counter[0]} rows")
+        except Exception as e:
+            jobs_db.rollback()
+            log.exception(f"Report export {export.id} failed")
+            report_export_actions.finish(
+                jobs_db, id=export.id, status="failed", rows=counter[0], error=str(e) or type(e).__name__
+            )
+
+
+def submit_export(export_id: UUID4) -> None:
+    if export_id in _queued:
+        return
+    _queued.add(export_id)
+    _executor.submit(run_export, export_id).add_done_callback(lambda _: _queued.discard(export_id))
+
+
+def sweep_report_exports() -> None:
+    """Fail exports whose worker went away mid-run, pick up the ones it never claimed."""
+    with SessionLocal() as db:
+        stalled = report_export_actions.fail_stalled(db)
+        pending = report_export_actions.pending_ids(db, limit=settings.EXPORT_WORKERS)
+    if stalled:
+        log.warning(f"Failed {stalled} stalled report exports")
+    for export_id in pending:
+        submit_export(export_id)
+
+
+register_job(sweep_report_exports, settings.EXPORT_SWEEP_SECONDS)
+
+
+class ReportExportService:
+
+    def __init__(self):
+        self.repo = report_export_actions
+
+    def request_export(
+            self, db: Session, *, user: User, schema: str, export_in: ReportExportCreate
+    ) -> ReportExport:
+        """Record a pending export of the tenant's data and hand it to the pool, the request returns right away."""
+        if appraisal_submission_repo() is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Appraisal reports are not available"
+            )
+        filters = export_in.model_dump(mode="json", include=set(REPORT_FILTERS[export_in.kind]), exclude_none=True)
+        export = self.repo.create(db, data={
+            "tenant_schema": schema,
+            "kind": export_in.kind,
+            "format": export_in.format,
+            "filters": filters,
+            "status": "pending",
+            "requested_by": user.id,
+        })
+        submit_export(export.id)
+        return export
+
+    def get_export(self, db: Session, *, user: User, schema: str, id: UUID4) -> ReportExport:
+        export = self.repo.get_by_id(db, id=id, silent=True)
+        # other users' and other tenants' exports are not found rather than forbidden, their ids reveal nothing
+        if export is None or export.requested_by != user.id or export.tenant_schema != schema:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report export not found")
+        return export
+
+    def open_export(
+            self, db: Session, *, user: User, schema: str, id: UUID4
+    ) -> Tuple[ReportExport, Iterator[bytes]]:
+        """The export and its file in chunks, read from storage as they are sent."""
+        export = self.get_export(db, user=user, schema=schema, id=id)
+        if export.status != "done":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Report export is {export.status}")
+        backend = get_backend_by_prefix(export.storage)
+        if backend is None:
+            log.error(f"Report export {export.id} is stored on unknown backend {export.storage}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail='An error occurred.')
+
+        def chunks() -> Iterator[bytes]:
+            with backend.open(export.key) as fileobj:
+                yield from iter(lambda: fileobj.read(DOWNLOAD_CHUNK_SIZE), b"")
+
+        return export, chunks()
+
+    def to_schema(self, export: ReportExport, download_url: str = None) -> ReportExportSchema:
+        schema = ReportExportSchema.model_validate(export)
+        if export.status == "done":
+            schema.download_url = download_url
+        return schema
+
+
+report_export_service = ReportExportService()
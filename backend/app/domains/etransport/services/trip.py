@@ -0,0 +1,62 @@
+import base64
+from datetime import datetime
+from typing import Literal, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import UUID4
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from domains.auth.models.users import User
+from domains.etransport.models.driver import Driver
+from domains.etransport.models.passenger import Passenger
+from domains.etransport.repositories.trip import trip_actions as trip_repo
+from domains.etransport.schemas.trip import TripHistoryItem, TripHistoryPage
+
+
+def encode_cursor(created_date: datetime, id: UUID4) -> str:
+    return base64.urlsafe_b64encode(f"{created_date.isoformat()}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID4]:
+    try:
+        created_date, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_date), UUID4(id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+class TripService:
+
+    def __init__(self):
+        self.repo = trip_repo
+
+    @staticmethod
+    def _profile_id(db: Session, model, user: User) -> UUID4:
+        profile_id = db.scalar(select(model.id).where(model.user_id == user.id))
+        if profile_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail=f"No {model.__name__.lower()} profile for this account"
+            )
+        return profile_id
+
+    def trip_history(
+            self, db: Session, *, user: User, role: Literal['passenger', 'driver'] = 'passenger',
+            cursor: Optional[str] = None, limit: int = 20
+    ) -> TripHistoryPage:
+        limit = max(1, min(limit, settings.TRIP_HISTORY_MAX_LIMIT))
+        before = decode_cursor(cursor) if cursor else None
+        if role == 'driver':
+            owner = {"driver_id": self._profile_id(db, Driver, user)}
+        else:
+            owner = {"passenger_id": self._profile_id(db, Passenger, user)}
+
+        # one extra row tells whether there is an older page
+        rows = self.repo.history(db, **owner, before=before, limit=limit + 1)
+        items = [TripHistoryItem.model_validate(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(items[-1].created_date, items[-1].id) if len(rows) > limit else None
+        return TripHistoryPage(items=items, next_cursor=next_cursor)
+
+
+trips_service = TripService()
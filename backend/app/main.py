@@ -9,12 +9,19 @@ from fastapi.responses import JSONResponse
 
 from apis.routers import router as api_router
 from config.logger import log
+from config.metrics import registry
 from config.settings import settings
+from crud.base import warm_up_tenant_settings
 from db.init_db import create_system_admin
 from db.init_models import init_tables,init_database
 from db.session import SessionLocal, drop_and_alter_table_columns
+from domains.auth.respository.refresh_token import prune_expired_refresh_tokens  # noqa: registers the pruning job
 from middleware.intruder_detection import IntruderDetectionMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.query_stats import QueryStatsMiddleware
 from middleware.tenant import TenantMiddleware
+from domains.auth.services.revocation import revocation_listener
+from services.background import start_background_jobs, stop_background_jobs
 
 
 ## adding our api routes
@@ -26,10 +33,20 @@ def initial_data_insert():
     """Insert initial data using synchronous session."""
     with SessionLocal() as db:
         create_system_admin(db)
+        warm_up_tenant_settings(db)
         #drop_and_alter_table_columns(db)
 
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    jobs = start_background_jobs()
+    revocation_listener.start()
+    yield
+    revocation_listener.stop()
+    await stop_background_jobs(jobs)
+
+
 # List of allowed origins
 origins = [
     "http://localhost:4200",
@@ -38,7 +55,7 @@ origins = [
 
 
 def start_application():
-    app = FastAPI(docs_url="/", title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION)
+    app = FastAPI(docs_url="/", title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION, lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origin_regex=r"http://(localhost|[a-zA-Z0-9_-]+\.localhost)(:\d+)?$",
@@ -52,6 +69,9 @@ def start_application():
     include(app)
     app.add_middleware(IntruderDetectionMiddleware)
     app.add_middleware(TenantMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    registry.start_flusher()
     return app
 
 
@@ -2,21 +2,20 @@ import os
 from datetime import datetime
 
 import requests
-from fastapi import Depends
-from sqlalchemy.orm import Session
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
 from config.logger import log
 from config.settings import settings
-from db.session import get_db
-from domains.auth.models import User
 
 
 class IntruderDetectionMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, db: Session = Depends(get_db)):
-        super().__init__(app)
-        self.db = db
+    """
+    Logs clients that hit the login rate limit.
+
+    Lockouts are decided by the login service, which persists them only when the
+    failure threshold is crossed; rejected attack requests cause no database write here.
+    """
 
     @staticmethod
     def intruder_info(request: Request):
@@ -73,14 +72,11 @@ class IntruderDetectionMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         response = await call_next(request)  # Await the async function
         if response.status_code == 429:
-            username = request.headers.get("X-Username")
-            log.info("\nusername in middleware: ", username)
-            if username:
-                user = self.db.query(User).filter(User.username == username).first()
-                if user:
-                    log.info("user in middleware: ", user)
-                    user.lock_account(lock_time_minutes=10)
-                    self.db.commit()
+            client_ip = request.client.host if request.client else "unknown"
+            log.warning(
+                f"Rate limited request from {client_ip} to {request.url.path} "
+                f"(username header: {request.headers.get('X-Username', 'N/A')})"
+            )
 
         return response
 
@@ -0,0 +1,30 @@
+import time
+
+from anyio import to_thread
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from config.metrics import http_request_duration, http_requests, threadpool
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Records request count, status and latency per route template (not per raw path)."""
+
+    async def dispatch(self, request: Request, call_next):
+        limiter = to_thread.current_default_thread_limiter()
+        statistics = limiter.statistics()
+        threadpool.set(statistics.borrowed_tokens, state="busy")
+        threadpool.set(limiter.total_tokens, state="total")
+        threadpool.set(statistics.tasks_waiting, state="queued")
+
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            http_requests.inc(method=request.method, route=path, status=status_code)
+            http_request_duration.observe(time.perf_counter() - started, method=request.method, route=path)
@@ -0,0 +1,42 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from config.logger import log
+from config.settings import settings
+from db.instrumentation import QueryStats, current_query_stats
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Counts the SQL statements, database time and rows of every request.
+
+    The totals are returned as X-DB-* headers in debug mode and logged when they
+    exceed the configured thresholds, together with any statement repeated often
+    enough to look like an N+1 pattern.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        # the router adds the matched route to this same scope, see QueryStats.route
+        stats = QueryStats(path=f"{request.method} {request.url.path}", scope=request.scope)
+        token = current_query_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            current_query_stats.reset(token)
+
+        if settings.DEBUG:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.2f}"
+            response.headers["X-DB-Rows"] = str(stats.rows)
+
+        if stats.count >= settings.QUERY_COUNT_WARN_THRESHOLD or \
+                stats.duration * 1000 >= settings.QUERY_TIME_WARN_THRESHOLD_MS:
+            log.warning(
+                f"{stats.route} ran {stats.count} queries in {stats.duration * 1000:.2f}ms "
+                f"returning {stats.rows} rows"
+            )
+
+        for shape, count in stats.repeated_statements():
+            log.warning(f"Possible N+1 in {stats.route}: statement executed {count} times: {shape[:300]}")
+
+        return response
@@ -1,18 +1,23 @@
-from fastapi import Request
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from config.logger import log
+from db.tenancy import is_valid_schema_name
 
 
 class TenantMiddleware(BaseHTTPMiddleware):
-    def dispatch(self, request: Request, call_next):
+    async def dispatch(self, request: Request, call_next):
         # Extract subdomain from custom header
-        subdomain = request.headers.get("subdomain", "public")
+        subdomain = request.headers.get("subdomain", "public").strip().lower() or "public"
 
-        # Store schema in request state
+        if not is_valid_schema_name(subdomain):
+            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": "Invalid subdomain"})
+
+        # Store schema in request state, db.tenancy.get_tenant_db builds the tenant session from it
         request.state.schema = subdomain
         log.debug(f"Schema extracted from headers: {subdomain}")
 
-        response = call_next(request)
+        response = await call_next(request)
         return response
     
 
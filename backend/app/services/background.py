@@ -0,0 +1,33 @@
+import asyncio
+from typing import Callable, List
+
+from starlette.concurrency import run_in_threadpool
+
+from config.logger import log
+
+_jobs: List[tuple] = []
+
+
+def register_job(func: Callable[[], None], interval_seconds: float, name: str = None) -> Callable[[], None]:
+    """Run a blocking func every interval_seconds while the application is up."""
+    _jobs.append((name or func.__name__, func, interval_seconds))
+    return func
+
+
+async def _run_job(name: str, func: Callable[[], None], interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(func)
+        except Exception:
+            log.exception(f"Background job {name} failed")
+
+
+def start_background_jobs() -> List[asyncio.Task]:
+    return [asyncio.create_task(_run_job(*job), name=job[0]) for job in _jobs]
+
+
+async def stop_background_jobs(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
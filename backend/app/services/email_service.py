@@ -7,6 +7,7 @@ from fastapi_mail import ConnectionConfig, FastMail, MessageSchema
 from jinja2 import Environment, select_autoescape, FileSystemLoader
 from pydantic import BaseModel, EmailStr
 
+from config.metrics import emails_sent
 from config.settings import settings
 from domains.auth.models.users import User
 
@@ -71,9 +72,11 @@ class Email:
             # Send the email using FastMail
             fm = FastMail(conf)
             asyncio.run(fm.send_message(message, template_name=template_name))
+            emails_sent.inc(status="sent")
             return JSONResponse(status_code=200, content={"message": "Email has been sent."})
 
         except Exception as e:
+            emails_sent.inc(status="failed")
             # Log the exception or handle it appropriately
             print(f"Failed to send email: {str(e)}")
             return JSONResponse(status_code=500, content={"message": "Failed to send email."})
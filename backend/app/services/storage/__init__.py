@@ -0,0 +1,18 @@
+__all__ = [
+    "StorageBackend",
+    "UploadResult",
+    "GCSStorageBackend",
+    "LocalStorageBackend",
+    "get_storage_backend",
+    "get_backend_by_prefix",
+    "upload_file",
+    "upload_files",
+    "upload_files_async",
+]
+
+from .base import StorageBackend, UploadResult
+from .gcs import GCSStorageBackend
+from .local import LocalStorageBackend
+from .uploader import (
+    get_storage_backend, get_backend_by_prefix, upload_file, upload_files, upload_files_async
+)
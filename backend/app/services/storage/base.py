@@ -0,0 +1,91 @@
+import mimetypes
+import pathlib
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+
+from pydantic import BaseModel
+
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+# leading bytes of the document/image formats we accept for uploads
+_SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"PK\x03\x04", "application/zip"),
+)
+
+
+class UploadResult(BaseModel):
+    filename: str
+    key: Optional[str] = None
+    url: Optional[str] = None
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class StorageBackend(ABC):
+    """Interface every storage backend implements."""
+
+    # short code stored in front of keys written by File columns, e.g. "GS:images/a.png"
+    prefix: str = ""
+
+    @abstractmethod
+    def save(self, fileobj: BinaryIO, key: str, content_type: str) -> int:
+        """Stream fileobj to key and return the number of bytes written."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Return the public url for key."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open the object stored under key for reading, without loading it whole."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object stored under key."""
+
+
+def clean_filename(filename: str) -> str:
+    """Strip any directory components a client may have sent along with the file name."""
+    name = pathlib.PurePosixPath(str(filename).replace("\\", "/")).name
+    return name or "upload"
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def detect_content_type(filename: str, head: bytes = b"", declared: Optional[str] = None) -> str:
+    """
+    Work out the content type of an upload.
+
+    The file signature wins over the extension, and the extension wins over
+    whatever the client declared, since browsers frequently send generic types.
+    """
+    sniffed = sniff_content_type(head) if head else None
+    guessed, _ = mimetypes.guess_type(filename)
+
+    if sniffed == "application/zip" and guessed:
+        # docx/xlsx are zip containers, the extension is more specific
+        return guessed
+    if sniffed:
+        return sniffed
+    if guessed:
+        return guessed
+    if declared and declared not in (DEFAULT_CONTENT_TYPE, "image/*"):
+        return declared
+    return DEFAULT_CONTENT_TYPE
@@ -0,0 +1,49 @@
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO
+
+from config.settings import settings
+from services.storage.base import StorageBackend
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stores files on the local filesystem, used for development and tests."""
+
+    prefix = "LC"
+
+    def __init__(self, root: str = None, base_url: str = None):
+        self.root = Path(root or settings.LOCAL_STORAGE_ROOT).resolve()
+        self.base_url = base_url or settings.LOCAL_STORAGE_BASE_URL
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save(self, fileobj: BinaryIO, key: str, content_type: str) -> int:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary name first so readers never see a half written file
+        tmp_path = path.with_name(f".{path.name}.part")
+        with open(tmp_path, "wb") as destination:
+            shutil.copyfileobj(fileobj, destination, CHUNK_SIZE)
+            size = destination.tell()
+        os.replace(tmp_path, path)
+        return size
+
+    def url(self, key: str) -> str:
+        return self.base_url.rstrip("/") + "/" + key
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
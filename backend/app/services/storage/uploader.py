@@ -0,0 +1,111 @@
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, BinaryIO, List, Optional, Tuple
+
+from starlette.datastructures import UploadFile
+
+from config.logger import log
+from config.settings import settings
+from services.storage.base import StorageBackend, UploadResult, clean_filename, detect_content_type
+from services.storage.gcs import GCSStorageBackend
+from services.storage.local import LocalStorageBackend
+
+BACKENDS = {
+    "gcs": GCSStorageBackend,
+    "local": LocalStorageBackend,
+}
+
+# bounded pool shared by every upload so a burst of large forms cannot exhaust threads
+_executor = ThreadPoolExecutor(max_workers=settings.MAX_CONCURRENT_THREADS, thread_name_prefix="storage-upload")
+
+
+@lru_cache()
+def get_storage_backend(name: str = None) -> StorageBackend:
+    name = (name or settings.STORAGE_BACKEND).lower()
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown storage backend '{name}', expected one of {list(BACKENDS)}")
+
+
+def get_backend_by_prefix(prefix: str) -> Optional[StorageBackend]:
+    for name, backend_cls in BACKENDS.items():
+        if backend_cls.prefix == prefix:
+            return get_storage_backend(name)
+    return None
+
+
+def _open_source(source: Any) -> Tuple[str, BinaryIO, Optional[str]]:
+    """Normalise the accepted upload inputs to (filename, file object, declared content type)."""
+    if isinstance(source, UploadFile):
+        return source.filename, source.file, source.content_type
+    if isinstance(source, dict):
+        if source.get("file") is not None:
+            return source["filename"], source["file"], source.get("content_type")
+        # legacy form, content already read into memory by the caller
+        return source["filename"], BytesIO(source["content"]), source.get("content_type")
+    raise TypeError(f"Unsupported upload source: {type(source).__name__}")
+
+
+def upload_file(source: Any, folder: str, backend: StorageBackend = None) -> UploadResult:
+    """Upload a single file, retrying transient failures. Never raises, errors are reported on the result."""
+    backend = backend or get_storage_backend()
+    filename = getattr(source, "filename", None) or (source.get("filename") if isinstance(source, dict) else None)
+    result = UploadResult(filename=str(filename or ""))
+
+    try:
+        filename, fileobj, declared = _open_source(source)
+        filename = clean_filename(filename)
+        key = f"{folder.strip('/')}/{filename}" if folder else filename
+
+        head = fileobj.read(16)
+        fileobj.seek(0)
+        content_type = detect_content_type(filename, head=head, declared=declared)
+
+        delay = settings.RETRY_DELAY_BASE
+        for attempt in range(settings.MAX_RETRIES + 1):
+            try:
+                fileobj.seek(0)
+                size = backend.save(fileobj, key, content_type)
+                break
+            except Exception:
+                if attempt >= settings.MAX_RETRIES:
+                    raise
+                log.warning(f"Upload of {key} failed, retrying ({attempt + 1}/{settings.MAX_RETRIES})")
+                time.sleep(delay)
+                delay = delay * settings.RETRY_DELAY_MULTIPLIER
+
+        result.filename = filename
+        result.key = key
+        result.url = backend.url(key)
+        result.content_type = content_type
+        result.size = size
+    except Exception as e:
+        log.exception(f"Failed to upload {result.filename} to {type(backend).__name__}")
+        result.error = str(e) or type(e).__name__
+
+    return result
+
+
+def submit_upload(source: Any, folder: str, backend: StorageBackend = None) -> Future:
+    return _executor.submit(upload_file, source, folder, backend)
+
+
+def upload_files(files: List[Any], folder: str, backend: StorageBackend = None) -> List[UploadResult]:
+    """
+    Upload files concurrently on the shared pool.
+
+    Results are returned in the same order as the input, so the total time is
+    roughly that of the slowest file rather than the sum of all of them.
+    """
+    futures = [submit_upload(file, folder, backend) for file in files]
+    return [future.result() for future in futures]
+
+
+async def upload_files_async(files: List[Any], folder: str, backend: StorageBackend = None) -> List[UploadResult]:
+    """Same as upload_files, without blocking the event loop while the uploads run."""
+    futures = [asyncio.wrap_future(submit_upload(file, folder, backend)) for file in files]
+    return list(await asyncio.gather(*futures))
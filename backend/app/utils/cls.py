@@ -25,24 +25,20 @@ class ContentQueryChecker:
         self._actions = actions
     
     def __call__(self, func):
+        # Get the original signature, once at decoration time rather than per request
+        sig = signature(func)
+        orig_params = list(sig.parameters.values())
+        orig_param_names = frozenset(p.name for p in orig_params)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-
-            # if kwargs.get("sort"):
-            #     print(f"Sort values before processing: {kwargs['sort']}")
-
-            # Filter out dynamically added parameters, keeping only original params
-            orig_sig = signature(func)
-            orig_param_names = [p.name for p in orig_sig.parameters.values()]
+            # Filter out dynamically added parameters, keeping only original params;
+            # special_read compiles them from the query string through utils.query_spec
             filtered_kwargs = {k: v for k, v in kwargs.items() if k in orig_param_names}
-            
+
             # Pass only the original arguments to the function
             return func(*args, **filtered_kwargs)
         
-        # Get the original signature
-        sig = signature(func)
-        orig_params = list(sig.parameters.values())
-        
         # Separate keyword-only parameters (e.g., db)
         keyword_only_params = [p for p in orig_params if p.kind == Parameter.KEYWORD_ONLY]
         sort_str = f"^({'|'.join([f'{x[0]}|-{x[0]}' for x in self._cols])})(,({'|'.join([f'{x[0]}|-{x[0]}' for x in self._cols])}))*$" if self._cols else None
@@ -130,7 +126,9 @@ def str_to_datetime(value: str) -> datetime.datetime:
 from config.settings import settings
 import sqlalchemy.types as types
 # from cls import Upload
+import asyncio
 import pathlib
+from typing import Any, Dict
 
 
 class Upload:
@@ -142,10 +140,93 @@ class Upload:
     def _ext(self):
         return pathlib.Path(self.file.filename).suffix
 
+    def _check_size(self):
+        file_size = getattr(self.file, "size", None)
+        if self.size and file_size and file_size > self.size:
+            raise ValueError(f"{self.file.filename} exceeds the maximum size of {self.size} bytes")
+
+    def _stored_key(self, result) -> str:
+        from services.storage import get_storage_backend
+
+        if not result.ok:
+            raise ValueError(f"Failed to upload {result.filename}: {result.error}")
+        return f"{get_storage_backend().prefix}:{result.key}"
+
+    def save(self) -> str:
+        """Upload the file and return the key to store in the column."""
+        from services.storage import upload_file
+
+        self._check_size()
+        return self._stored_key(upload_file(self.file, self.upload_to))
+
+    def submit(self):
+        """Start the upload on the storage pool and return its future."""
+        from services.storage.uploader import submit_upload
+
+        self._check_size()
+        return submit_upload(self.file, self.upload_to)
+
+
+def is_upload(value) -> bool:
+    return hasattr(value, "filename") and hasattr(value, "file")
+
+
+def _pending_uploads(model, data: Dict[str, Any]) -> Dict[str, Upload]:
+    return {
+        column.name: Upload(data[column.name], upload_to=column.type.upload_to, size=column.type.size)
+        for column in model.__table__.columns
+        if isinstance(column.type, File) and is_upload(data.get(column.name))
+    }
+
+
+def stage_file_uploads(model, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    First phase of a write to a model with File columns.
+
+    Uploads every file in data concurrently and replaces it with the stored key,
+    so the ORM flush that follows only binds strings and never touches the network.
+    """
+    uploads = _pending_uploads(model, data)
+    if not uploads:
+        return data
+    futures = {name: upload.submit() for name, upload in uploads.items()}
+    return {**data, **{name: uploads[name]._stored_key(future.result()) for name, future in futures.items()}}
+
+
+def discard_staged_uploads(model, data: Dict[str, Any], staged: Dict[str, Any]) -> None:
+    """Delete the files stage_file_uploads stored for data, when the write that followed failed."""
+    from config.logger import log
+    from services.storage import get_backend_by_prefix
+
+    for name in _pending_uploads(model, data):
+        prefix, _, key = str(staged.get(name) or "").partition(":")
+        backend = get_backend_by_prefix(prefix)
+        if backend is None or not key:
+            continue
+        try:
+            backend.delete(key)
+        except Exception:
+            log.warning(f"Could not delete orphaned upload {prefix}:{key}", exc_info=True)
+
+
+async def stage_file_uploads_async(model, data: Dict[str, Any]) -> Dict[str, Any]:
+    uploads = _pending_uploads(model, data)
+    if not uploads:
+        return data
+    names = list(uploads)
+    results = await asyncio.gather(*(asyncio.wrap_future(uploads[name].submit()) for name in names))
+    return {**data, **{name: uploads[name]._stored_key(result) for name, result in zip(names, results)}}
+
 
 class File(types.TypeDecorator):
+    """
+    Column holding the storage key of an uploaded file ("GS:images/a.png").
+
+    Files must be uploaded with stage_file_uploads before the row is flushed,
+    binding only ever deals with plain strings which keeps the type cacheable.
+    """
     impl = types.String
-    cache_ok = False
+    cache_ok = True
 
     def __init__(self, *args, upload_to, size=None, **kwargs):
         super(File, self).__init__(*args, **kwargs)
@@ -155,14 +236,26 @@ class File(types.TypeDecorator):
     def process_bind_param(self, value, dialect):
         if not value:
             return None
-        file = Upload(value, upload_to=self.upload_to, size=self.size)
-        url = file.save()
-        return url
+        if is_upload(value):
+            raise ValueError(
+                f"{value.filename} has not been uploaded, call stage_file_uploads before saving the row"
+            )
+        return value
 
     def process_result_value(self, value, dialect):
         if value:
+            if "://" in value:
+                # rows written before File columns stored keys hold the full url
+                return value
             if value[:3] == 'S3:':
                 return settings.AWS_S3_CUSTOM_DOMAIN + value[3:]
-            return settings.BASE_URL + value[3:]
+
+            from services.storage import get_backend_by_prefix
+
+            backend = get_backend_by_prefix(value[:2]) if value[2:3] == ":" else None
+            if backend is not None:
+                return backend.url(value[3:])
+            # no known prefix, e.g. a bare file name written while the column was a String
+            return value
         else:
             return None
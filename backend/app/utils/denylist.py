@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, k bit positions taken from one SHA-256 digest."""
+
+    def __init__(self, size_bits: int = 1 << 20, hashes: int = 4):
+        self.size = size_bits
+        self.hashes = hashes
+        self._bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.sha256(key.encode()).digest()
+        for i in range(self.hashes):
+            yield int.from_bytes(digest[i * 4:i * 4 + 4], "big") % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenDenylist:
+    """
+    Revoked token ids (jti) of one process, each kept until the token's own expiry.
+
+    Lookups for tokens that were never revoked, nearly all of them, are answered by
+    the Bloom filter alone; a hit is confirmed against the exact set. Expired
+    entries are dropped by purge(), which rebuilds the filter from what is left.
+    """
+
+    def __init__(self, bloom_size_bits: int = 1 << 20):
+        self._bloom_size_bits = bloom_size_bits
+        self._bloom = BloomFilter(bloom_size_bits)
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        if not jti or expires_at <= time.time():
+            return
+        with self._lock:
+            self._expiry[jti] = max(expires_at, self._expiry.get(jti, 0))
+            self._bloom.add(jti)
+
+    def add_many(self, entries: Iterable[Tuple[str, float]]) -> None:
+        for jti, expires_at in entries:
+            self.add(jti, expires_at)
+
+    def __contains__(self, jti: str) -> bool:
+        if not jti or jti not in self._bloom:
+            return False
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def purge(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [jti for jti, expires_at in self._expiry.items() if expires_at <= now]
+            if not expired:
+                return 0
+            for jti in expired:
+                del self._expiry[jti]
+            bloom = BloomFilter(self._bloom_size_bits)
+            for jti in self._expiry:
+                bloom.add(jti)
+            self._bloom = bloom
+        return len(expired)
@@ -1,26 +1,24 @@
-from google.cloud import storage
-from config.settings import settings
+from typing import List
 
-def get_gcs_client():
-    credentials_info = settings.GCS_CREDENTIALS  # Already parsed as a dict
-    return storage.Client.from_service_account_info(credentials_info)
+from config.logger import log
+from services.storage import UploadResult, get_storage_backend, upload_files
 
-client = get_gcs_client()
 
 def upload_to_gcs(files: list, folder: str) -> dict:
-    bucket = client.get_bucket(settings.GCP_BUCKET_NAME)
+    """
+    Upload files to the configured storage backend and return {filename: public url}.
+
+    Files that failed to upload are logged and left out of the mapping,
+    use upload_with_results to get the per file outcome.
+    """
     public_urls = {}
+    for result in upload_with_results(files, folder):
+        if result.ok:
+            public_urls[result.filename] = result.url
+        else:
+            log.error(f"Failed to upload {result.filename}: {result.error}")
+    return public_urls
 
-    for file in files:
-        storage_path = f'appraisal/{folder}/{file["filename"]}'
-        blob = bucket.blob(storage_path)
-        try:
-            from io import BytesIO
-            file_content = BytesIO(file['content'])
-            blob.upload_from_file(file_content, content_type="image/*")
-            public_urls[file['filename']] = f'https://storage.googleapis.com/{settings.GCP_BUCKET_NAME}/{storage_path}'
-        except Exception as e:
-            # Log the error and continue processing next file
-            continue
 
-    return public_urls
+def upload_with_results(files: list, folder: str) -> List[UploadResult]:
+    return upload_files(files, f'appraisal/{folder}', backend=get_storage_backend())
@@ -0,0 +1,45 @@
+from typing import Optional
+
+from sqlalchemy import cast, func, literal, text
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.sql.elements import ColumnElement
+
+EMPTY_OBJECT = text("'{}'::jsonb")
+
+
+def as_jsonb(column) -> ColumnElement:
+    return cast(column, JSONB)
+
+
+def has_answer(data: ColumnElement, group_name: str, field_name: str) -> ColumnElement:
+    """data -> group_name has the key field_name; false, not an error, when the group is missing."""
+    return data[group_name].has_key(field_name)
+
+
+def set_answer(data: ColumnElement, group_name: str, field_name: str, answer) -> ColumnElement:
+    """
+    data with data -> group_name -> field_name replaced by answer. jsonb_set
+    does not create a missing group, guard the UPDATE with has_answer.
+    """
+    return func.jsonb_set(data, array([group_name, field_name]), literal(answer, JSONB))
+
+
+def merge_answers(data: ColumnElement, updates: dict) -> Optional[ColumnElement]:
+    """
+    data || {group: (data -> group) || answers, ...} for every group of updates,
+    so only those groups are rewritten and missing ones are added. None when
+    updates is empty.
+    """
+    merged_groups = []
+    for group_name, answers in updates.items():
+        merged_groups.extend((
+            group_name,
+            func.coalesce(data[group_name], EMPTY_OBJECT).op("||")(literal(dict(answers.items()), JSONB)),
+        ))
+    if not merged_groups:
+        return None
+
+    # NULL || anything is NULL, a document without answers yet starts from {}; a JSON
+    # column stores None as a JSON null unless none_as_null, fold that in too
+    stored = func.coalesce(func.nullif(data, text("'null'::jsonb")), EMPTY_OBJECT)
+    return stored.op("||")(func.jsonb_build_object(*merged_groups))
@@ -0,0 +1,183 @@
+import datetime
+import re
+import uuid
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from sqlalchemy import and_
+from sqlalchemy.sql.elements import ColumnElement
+from starlette.status import HTTP_400_BAD_REQUEST
+
+# query parameters with a meaning of their own, everything else is a column filter
+RESERVED_PARAMS = frozenset({"offset", "limit", "fields", "q", "sort"})
+
+# secrets never reach a filter, search, sort or field list: gte:/lt: comparisons and
+# ordering against them would leak the stored value one character at a time
+HIDDEN_COLUMNS = frozenset({"password", "reset_password_token", "token_hash"})
+
+_RANGE = re.compile(r"^(lt|lte|gt|gte):(.+)$")
+_YEAR = re.compile(r"^\d{4}$")
+_DATE = re.compile(r"^\d{4}-\d{1,2}-\d{1,2}$")
+
+
+class QuerySpec(NamedTuple):
+    """A query string reduced to plain values, independent of any model."""
+    filters: Tuple[Tuple[str, str], ...]
+    q: Tuple[str, ...]
+    sort: Tuple[Tuple[str, bool], ...]  # (field, descending)
+    fields: Tuple[str, ...]
+    offset: int
+    limit: int
+
+
+class CompiledQuery(NamedTuple):
+    """A QuerySpec turned into SQLAlchemy expressions for one model."""
+    where: Tuple[ColumnElement, ...]
+    order_by: Tuple[ColumnElement, ...]
+    fields: Tuple[str, ...]
+    offset: int
+    limit: int
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=detail)
+
+
+@lru_cache(maxsize=2048)
+def parse_query_string(query_string: str) -> QuerySpec:
+    """
+    Parse ?q=field:value&sort=name,-created_date&created_date=gte:2024-01-01
+    into a QuerySpec. Repeated keys are kept, so created_date=gte:..&created_date=lt:..
+    is a range.
+    """
+    filters, q, sort, fields = [], [], [], []
+    offset, limit = 0, 100
+    for key, value in parse_qsl(query_string, keep_blank_values=False):
+        if key == "q":
+            q.append(value)
+        elif key == "sort":
+            for item in value.split(","):
+                item = item.strip()
+                if item:
+                    sort.append((item.lstrip("-"), item.startswith("-")))
+        elif key == "fields":
+            fields.extend(item.strip() for item in value.split(",") if item.strip())
+        elif key in ("offset", "limit"):
+            try:
+                number = int(value)
+            except ValueError:
+                raise _bad_request(f"{key} must be an integer")
+            if number < 0 or (key == "limit" and number == 0):
+                raise _bad_request(f"Invalid {key}: {number}")
+            if key == "offset":
+                offset = number
+            else:
+                limit = number
+        else:
+            filters.append((key, value))
+    return QuerySpec(tuple(filters), tuple(q), tuple(sort), tuple(fields), offset, limit)
+
+
+def _python_type(column) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _parse_datetime(value: str) -> Tuple[datetime.datetime, datetime.datetime]:
+    """The [start, end) interval a year, a date or a timestamp stands for."""
+    if _YEAR.match(value):
+        start = datetime.datetime(int(value), 1, 1)
+        return start, start.replace(year=start.year + 1)
+    try:
+        if _DATE.match(value):
+            start = datetime.datetime.combine(datetime.date(*map(int, value.split("-"))), datetime.time())
+            return start, start + datetime.timedelta(days=1)
+        start = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise _bad_request(f"Invalid date: {value}")
+    return start, start + datetime.timedelta(microseconds=1)
+
+
+def _coerce(value: str, python_type: Optional[type]) -> Any:
+    try:
+        if python_type is uuid.UUID:
+            return uuid.UUID(value)
+        if python_type is bool:
+            return value.lower() in ("true", "1", "yes")
+        if python_type in (int, float):
+            return python_type(value)
+    except ValueError:
+        raise _bad_request(f"Invalid value: {value}")
+    return value
+
+
+def _filter(column, value: str) -> ColumnElement:
+    python_type = _python_type(column)
+    match = _RANGE.match(value)
+    op, raw = (match.group(1), match.group(2)) if match else (None, value)
+
+    if python_type in (datetime.datetime, datetime.date):
+        # dates compare as half-open ranges on the column itself so its index is usable
+        start, end = _parse_datetime(raw)
+        if python_type is datetime.date:
+            start, end = start.date(), end.date()
+        if op is None:
+            return and_(column >= start, column < end)
+        return {"gte": column >= start, "gt": column >= end, "lt": column < start, "lte": column < end}[op]
+
+    raw = _coerce(raw, python_type)
+    if op is None:
+        return column == raw
+    return {"gte": column >= raw, "gt": column > raw, "lt": column < raw, "lte": column <= raw}[op]
+
+
+def _search(model, columns: dict, term: str) -> ColumnElement:
+    # a bare term would be an ILIKE over every text column, a sequential scan of the
+    # table no index can serve; searches name their field
+    if ":" not in term:
+        raise _bad_request(f"Search terms must name a field, as in q=name:{term}")
+    field, value = term.split(":", 1)
+    column = columns.get(field)
+    if column is None or field in HIDDEN_COLUMNS:
+        raise _bad_request(f"Invalid search field: {field}")
+    if _python_type(column) is str:
+        return getattr(model, field).ilike(f"%{value}%")
+    return _filter(getattr(model, field), value)
+
+
+@lru_cache(maxsize=2048)
+def compile_query(model, query_string: str) -> CompiledQuery:
+    """
+    Compile a request query string into WHERE and ORDER BY expressions for model.
+
+    Cached per (model, query string), so a repeated listing request only pays for
+    a dict lookup. Parameters that are not columns of model are ignored, the
+    HIDDEN_COLUMNS are rejected.
+    """
+    spec = parse_query_string(query_string)
+    columns = {column.key: column for column in model.__table__.columns}
+
+    where = []
+    for field, value in spec.filters:
+        if field in HIDDEN_COLUMNS:
+            raise _bad_request(f"Invalid filter field: {field}")
+        if field in columns:
+            where.append(_filter(getattr(model, field), value))
+    where.extend(_search(model, columns, term) for term in spec.q)
+
+    order_by = []
+    for field, descending in spec.sort:
+        if field not in columns or field in HIDDEN_COLUMNS:
+            raise _bad_request(f"Invalid sort field: {field}")
+        column = getattr(model, field)
+        order_by.append(column.desc() if descending else column.asc())
+
+    for field in spec.fields:
+        if field not in columns or field in HIDDEN_COLUMNS:
+            raise _bad_request(f"Invalid field: {field}")
+
+    return CompiledQuery(tuple(where), tuple(order_by), spec.fields, spec.offset, spec.limit)
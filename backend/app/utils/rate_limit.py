@@ -0,0 +1,72 @@
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+
+class SlidingWindowLimiter:
+    """
+    In-memory sliding-window counter, e.g. failed logins per IP or per username.
+
+    Keys are spread over independent shards, each with its own lock, so concurrent
+    requests for different keys rarely contend. A key keeps at most limit + 1
+    timestamps, which bounds memory however hard it is hammered. The counts are per
+    process: with several workers each one enforces the limit on its own share.
+    """
+
+    def __init__(self, limit: int, window_seconds: float, shards: int = 16):
+        self.limit = limit
+        self.window = window_seconds
+        self._shards: List[Tuple[threading.Lock, Dict[str, Deque[float]]]] = [
+            (threading.Lock(), {}) for _ in range(shards)
+        ]
+
+    def _shard(self, key: str) -> Tuple[threading.Lock, Dict[str, Deque[float]]]:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    @staticmethod
+    def _trim(hits: Deque[float], now: float, window: float) -> None:
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+
+    def hit(self, key: str) -> int:
+        """Record one event for key and return how many fall in the current window."""
+        now = time.monotonic()
+        lock, entries = self._shard(key)
+        with lock:
+            hits = entries.get(key)
+            if hits is None:
+                hits = entries[key] = deque(maxlen=self.limit + 1)
+            self._trim(hits, now, self.window)
+            hits.append(now)
+            return len(hits)
+
+    def count(self, key: str) -> int:
+        now = time.monotonic()
+        lock, entries = self._shard(key)
+        with lock:
+            hits = entries.get(key)
+            if not hits:
+                return 0
+            self._trim(hits, now, self.window)
+            return len(hits)
+
+    def is_limited(self, key: str) -> bool:
+        return self.count(key) >= self.limit
+
+    def reset(self, key: str) -> None:
+        lock, entries = self._shard(key)
+        with lock:
+            entries.pop(key, None)
+
+    def cleanup(self) -> int:
+        """Forget keys without events in the window, call periodically."""
+        now = time.monotonic()
+        removed = 0
+        for lock, entries in self._shards:
+            with lock:
+                for key in [key for key, hits in entries.items() if not hits or hits[-1] <= now - self.window]:
+                    del entries[key]
+                    removed += 1
+        return removed
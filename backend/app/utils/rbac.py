@@ -2,12 +2,13 @@ from typing import Annotated, List, Union
 from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy import text
+from sqlalchemy import func, text
 from config.settings import settings
 from domains.auth.models.users import User
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError 
 from config.logger import log
+from domains.auth.services.revocation import is_token_revoked
 from domains.auth.models.role_permissions import Role
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -23,7 +24,7 @@ def get_current_user_db():
 
 
 def get_user_by_email(username: str, db: Session):
-    return db.query(User).filter(User.email == username).first()
+    return db.query(User).filter(func.lower(User.email) == username.strip().lower()).first()
 
 def get_user_by_id(id: str, db: Session):
     return db.query(User).filter(User.id == id).first()
@@ -41,6 +42,9 @@ def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db:
         username: str = payload.get("sub")
     except JWTError:
         raise credentials_exception
+    # logged out tokens are rejected from memory, no extra query
+    if is_token_revoked(payload):
+        raise credentials_exception
     user = get_user_by_email(username=username, db=db)
     if user is None:
         raise credentials_exception
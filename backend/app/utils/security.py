@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -6,10 +7,11 @@ from fastapi.exceptions import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from config.settings import settings
+from domains.auth.services.revocation import is_token_revoked
 from domains.auth.models.users import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -20,7 +22,7 @@ class Security:
 
     @staticmethod
     def get_user_by_email(username: str, db: Session):
-        user = db.execute(select(User).where(User.email == username))
+        user = db.execute(select(User).where(func.lower(User.email) == username.strip().lower()))
         user = user.scalars().first()
         if not user:
             return False
@@ -53,7 +55,8 @@ class Security:
             expire = datetime.utcnow() + expires_delta
         else:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
+        # jti identifies the token for revocation
+        to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
         encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
 
@@ -87,6 +90,8 @@ class Security:
 
         except JWTError:
             raise credentials_exception
+        if is_token_revoked(payload):
+            raise credentials_exception
         user = User(email=username)
         if user is None:
             raise credentials_exception